@@ -10,6 +10,7 @@ from django.core.files.base import ContentFile
 from rest_framework import serializers
 
 from utils.generals import get_model
+from apps.person.tasks import generate_profile_thumbnails
 
 Profile = get_model('person', 'Profile')
 
@@ -49,7 +50,7 @@ class ProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Profile
-        exclude = ('user', 'id', 'create_at', 'update_at',)
+        exclude = ('user', 'id', 'create_at', 'update_at', 'picture_thumbnails',)
 
     def get_url(self, obj):
         request = self.context.get('request')
@@ -60,8 +61,22 @@ class ProfileSerializer(serializers.ModelSerializer):
     def to_representation(self, value):
         ret = super().to_representation(value)
         ret['gender_display'] = value.get_gender_display()
+        ret['picture_thumbnails'] = self.get_picture_thumbnails(value)
         return ret
 
+    def get_picture_thumbnails(self, obj):
+        # {"48": {"webp": "url", "jpeg": "url"}}, empty until celery done
+        request = self.context.get('request')
+        storage = obj.picture.storage
+        thumbnails = dict()
+
+        for size, formats in (obj.picture_thumbnails or {}).items():
+            thumbnails[size] = {
+                fmt: request.build_absolute_uri(storage.url(path))
+                for fmt, path in formats.items()
+            }
+        return thumbnails
+
     def to_internal_value(self, data):
         # accept File and Base64
         picture = data.get('picture', None)
@@ -104,6 +119,9 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         # only execute if update has picture
         if has_picture or picture_has_removed:
+            # resize in background after file stored
+            transaction.on_commit(lambda: generate_profile_thumbnails.delay(instance.id))
+
             # cropped picture
             if picture:
                 fsize = picture.size
@@ -140,7 +158,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         first_name = validated_data.pop('first_name', None)
         if first_name:
             instance.user.first_name = first_name
-            instance.user.save()
+            instance.user.save(update_fields=['first_name'])
 
         # this is real profile instance
         update_fields = list()
@@ -38,6 +38,8 @@ from utils.generals import get_model
 from utils.pagination import build_result_pagination
 from apps.person.utils.permissions import IsCurrentUserOrReject
 from apps.person.utils.auth import validate_username
+from apps.person.utils.authentication import user_claims
+from apps.person.utils.availability import USERNAME, EMAIL, MSISDN, is_possibly_taken
 from apps.person.utils.constants import PASSWORD_RECOVERY
 
 User = get_user_model()
@@ -186,7 +188,6 @@ class UserApiView(viewsets.ViewSet):
 
     # Sub-action check email available
     @method_decorator(never_cache)
-    @transaction.atomic
     @action(methods=['post'], detail=False, permission_classes=[AllowAny],
             url_path='check-email', url_name='check-email')
     def check_email(self, request):
@@ -211,6 +212,18 @@ class UserApiView(viewsets.ViewSet):
         except ValidationError as e:
             raise NotAcceptable(detail=_(u" ".join(e.messages)))
 
+        # Never registered nor sent verify code, answered without database
+        if not is_possibly_taken(EMAIL, email):
+            return Response(
+                {
+                    'detail': _(u"Email tersedia!"),
+                    'is_used_before': False,
+                    'is_available': True,
+                    'email': email
+                },
+                status=response_status.HTTP_200_OK
+            )
+
         try:
             Account.objects.get(Q(user__account__email=Case(When(user__account__email__isnull=False, then=Value(email))))
                                 | Q(email=Case(When(email__isnull=False, then=Value(email)))),
@@ -236,7 +249,6 @@ class UserApiView(viewsets.ViewSet):
 
     # Sub-action check msisdn available
     @method_decorator(never_cache)
-    @transaction.atomic
     @action(methods=['post'], detail=False, permission_classes=[AllowAny],
             url_path='check-msisdn', url_name='check-msisdn')
     def check_msisdn(self, request):
@@ -255,6 +267,18 @@ class UserApiView(viewsets.ViewSet):
         if not msisdn:
             raise NotFound(_(u"Masukkan MSISDN"))
 
+        # Never registered nor sent verify code, answered without database
+        if not is_possibly_taken(MSISDN, msisdn):
+            return Response(
+                {
+                    'detail': _(u"MSISDN tersedia!"),
+                    'is_used_before': False,
+                    'is_available': True,
+                    'msisdn': msisdn
+                },
+                status=response_status.HTTP_200_OK
+            )
+
         try:
             Account.objects.get(msisdn=msisdn, is_msisdn_verified=True)
             raise NotAcceptable(_(u"MSISDN `{msisdn}` sudah digunakan."
@@ -348,7 +372,7 @@ class UserApiView(viewsets.ViewSet):
         except ValidationError as e:
             raise NotAcceptable(detail=_(" ".join(e.messages)))
 
-        if User.objects.filter(username=username).exists():
+        if is_possibly_taken(USERNAME, username) and User.objects.filter(username=username).exists():
             raise NotAcceptable(detail=_(u"Nama pengguna `{username}` "
                                          "sudah digunakan.".format(username=username)))
         return Response({'detail': _(u"Nama pengguna tersedia!")},
@@ -485,7 +509,7 @@ class UserApiView(viewsets.ViewSet):
 
         # set password
         user.set_password(password2)
-        user.save()
+        user.save(update_fields=['password'])
 
         return Response({'detail': _(u"Password berhasil diperbarui. "
                                      "Silahkan masuk dengan password baru")},
@@ -509,7 +533,8 @@ class UserApiView(viewsets.ViewSet):
                 "password2": "string"
             }
         """
-        user = request.user
+        # request.user built from token claims, never saved back
+        user = User.objects.select_for_update().get(pk=request.user.pk)
         data = request.data
         password = data.get('password')
         password1 = data.get('password1')
@@ -534,7 +559,7 @@ class UserApiView(viewsets.ViewSet):
 
         # set password
         user.set_password(password2)
-        user.save()
+        user.save(update_fields=['password'])
 
         return Response({'detail': _(u"Password berhasil diperbarui. "
                                      "Silahkan masuk dengan password baru")},
@@ -551,6 +576,15 @@ class UserApiView(viewsets.ViewSet):
 
 
 class TokenObtainPairSerializerExtend(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+
+        # Used by StatelessJWTAuthentication, no query to get user
+        for key, value in user_claims(user).items():
+            token[key] = value
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         if self.user:
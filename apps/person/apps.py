@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, m2m_changed
 
 
 class PersonConfig(AppConfig):
@@ -8,12 +8,23 @@ class PersonConfig(AppConfig):
   def ready(self):
     from django.conf import settings
     from utils.generals import get_model
-    from .signals import user_save_handler, verifycodecode_save_handler
+    from .signals import (
+      user_save_handler, account_save_handler, user_groups_changed_handler,
+      verifycodecode_save_handler
+    )
 
+    User = get_model('person', 'User')
+    Account = get_model('person', 'Account')
     VerifyCode = get_model('person', 'VerifyCode')
 
     post_save.connect(user_save_handler, sender=settings.AUTH_USER_MODEL,
                       dispatch_uid='user_save_signal')
 
+    post_save.connect(account_save_handler, sender=Account,
+                      dispatch_uid='account_save_signal')
+
+    m2m_changed.connect(user_groups_changed_handler, sender=User.groups.through,
+                        dispatch_uid='user_groups_changed_signal')
+
     post_save.connect(verifycodecode_save_handler, sender=VerifyCode,
                       dispatch_uid='verifycodecode_save_signal')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.person.utils.availability import IDENTIFIER_KINDS, rebuild_filter
+
+
+class Command(BaseCommand):
+	help = "Reseed username, email and msisdn availability filter from database"
+
+	def add_arguments(self, parser):
+		parser.add_argument('kinds', nargs='*', choices=IDENTIFIER_KINDS)
+
+	def handle(self, *args, **kwargs):
+		kinds = kwargs.get('kinds') or IDENTIFIER_KINDS
+		for kind in kinds:
+			rebuild_filter(kind)
+			print("Rebuild %s filter." % kind)
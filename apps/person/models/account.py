@@ -68,6 +68,9 @@ class AbstractProfile(models.Model):
     picture_original = models.ImageField(upload_to=_UPLOAD_TO, max_length=500,
                                          null=True, blank=True)
 
+    # Filled by celery, format {"48": {"webp": "path", "jpeg": "path"}}
+    picture_thumbnails = models.JSONField(default=dict, blank=True)
+
     class Meta:
         abstract = True
         app_label = 'person'
@@ -81,3 +84,13 @@ class AbstractProfile(models.Model):
     @property
     def first_name(self):
         return self.user.first_name
+
+    def delete_picture_thumbnails(self, save=True):
+        storage = self.picture.storage
+        for formats in self.picture_thumbnails.values():
+            for path in formats.values():
+                storage.delete(path)
+
+        self.picture_thumbnails = dict()
+        if save:
+            self.save(update_fields=['picture_thumbnails'])
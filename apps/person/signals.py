@@ -4,6 +4,8 @@ from django.contrib.auth.models import Group
 
 from utils.generals import get_model
 from .utils.constants import DEFAULT_GROUP
+from .utils.authentication import invalidate_user_cache
+from .utils.availability import USERNAME, EMAIL, MSISDN, mark_taken
 
 # Celery task
 from apps.person.tasks import send_verifycode_email
@@ -14,6 +16,9 @@ Profile = get_model('person', 'Profile')
 
 @transaction.atomic
 def user_save_handler(sender, instance, created, **kwargs):
+    invalidate_user_cache(instance.id)
+    mark_taken(USERNAME, instance.username)
+
     if created:
         account = getattr(instance, 'account', None)
         if account is None:
@@ -49,8 +54,25 @@ def user_save_handler(sender, instance, created, **kwargs):
             Profile.objects.create(user=instance)
 
 
+@transaction.atomic
+def account_save_handler(sender, instance, created, **kwargs):
+    invalidate_user_cache(instance.user_id)
+    mark_taken(EMAIL, instance.email)
+    mark_taken(MSISDN, instance.msisdn)
+
+
+def user_groups_changed_handler(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_user_cache(instance.id)
+
+
 @transaction.atomic
 def verifycodecode_save_handler(sender, instance, created, **kwargs):
+    # is_used_before of check email/msisdn also answered by the filter
+    if created:
+        mark_taken(EMAIL, instance.email)
+        mark_taken(MSISDN, instance.msisdn)
+
     # create tasks
     # run only on resend and created
     if instance.is_used == False and instance.is_verified == False:
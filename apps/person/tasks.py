@@ -1,6 +1,9 @@
+import os
 import logging
 import smtplib
 
+from PIL import Image, UnidentifiedImageError
+
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 from django.core.mail import BadHeaderError, EmailMultiAlternatives
@@ -8,6 +11,10 @@ from django.core.mail import BadHeaderError, EmailMultiAlternatives
 # Celery config
 from celery import shared_task
 
+from utils.generals import get_model
+from utils.images import THUMBNAIL_FORMATS, prepare_image, make_thumbnail
+from apps.person.utils.constants import PROFILE_THUMBNAIL_SIZES
+
 
 @shared_task
 def send_verifycode_email(data):
@@ -58,3 +65,47 @@ def send_verifycode_email(data):
                 logging.warning(_(u"Invalid header found"))
     else:
         logging.warning(_(u"Tried to send email to non-existing VerifyCode Code"))
+
+
+@shared_task
+def generate_profile_thumbnails(profile_id):
+    logging.info(_(u"Generate profile thumbnails run"))
+
+    Profile = get_model('person', 'Profile')
+
+    try:
+        profile = Profile.objects.select_related('user').get(id=profile_id)
+    except Profile.DoesNotExist:
+        logging.warning(_(u"Profile not found"))
+        return
+
+    # old thumbnails always replaced
+    profile.delete_picture_thumbnails(save=False)
+
+    if profile.picture:
+        storage = profile.picture.storage
+        dirname = os.path.join(os.path.dirname(profile.picture.name), 'thumbnails')
+        thumbnails = dict()
+
+        try:
+            with profile.picture.open('rb') as f:
+                image = Image.open(f)
+                image.load()
+        except (UnidentifiedImageError, OSError) as e:
+            logging.error('Open profile picture failed: %s' % e)
+            image = None
+
+        if image is not None:
+            image = prepare_image(image)
+            for size in PROFILE_THUMBNAIL_SIZES:
+                formats = dict()
+                for fmt in THUMBNAIL_FORMATS:
+                    name = '%s_%s.%s' % (profile.user.username, size, fmt)
+                    path = storage.save(os.path.join(dirname, name), make_thumbnail(image, size, fmt))
+                    formats[fmt] = path
+                thumbnails[str(size)] = formats
+
+        profile.picture_thumbnails = thumbnails
+
+    profile.save(update_fields=['picture_thumbnails'])
+    logging.info(_(u"Profile thumbnails success"))
@@ -1,6 +1,22 @@
-from django.test import TestCase
+import io
+import threading
+
+from PIL import Image
+
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth.models import Group
+
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 
 from utils.generals import get_model
+from utils.images import THUMBNAIL_FORMATS, prepare_image, make_thumbnail
+from apps.person.utils.constants import PROFILE_THUMBNAIL_SIZES, DEFAULT_GROUP
+from apps.person.utils.availability import EMAIL, MSISDN, rebuild_filter
+from apps.person.utils.authentication import (
+    StatelessJWTAuthentication, build_user, get_cached_claims, user_claims
+)
 
 User = get_model('person', 'User')
 Account = get_model('person', 'Account')
@@ -36,3 +52,150 @@ class AccountTestCase(TestCase):
 
         self.assertEqual(passcode_valid_email, True)
         self.assertEqual(passcode_valid_msisdn, True)
+
+
+class StatelessAuthenticationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('authuser', 'auth@email.com', '123456')
+
+    def test_build_user_from_claims(self):
+        claims = user_claims(self.user)
+        user = build_user(self.user.id, claims)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.uuid, self.user.uuid)
+        self.assertEqual(user.username, self.user.username)
+        self.assertIn('email', user.get_deferred_fields())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user.is_authenticated, True)
+
+    def test_cache_invalidated_on_save(self):
+        self.assertEqual(get_cached_claims(self.user.id)['username'], 'authuser')
+
+        self.user.username = 'authuser2'
+        self.user.save()
+
+        self.assertEqual(get_cached_claims(self.user.id)['username'], 'authuser2')
+
+    def token(self):
+        return dict(user_claims(self.user), user_id=self.user.id)
+
+    def test_demoted_user_lose_token_claims(self):
+        self.user.is_staff = True
+        self.user.save()
+        token = self.token()
+
+        self.user.is_staff = False
+        self.user.save()
+
+        user = StatelessJWTAuthentication().get_user(token)
+        self.assertEqual(user.is_staff, False)
+
+    def test_inactive_or_password_changed_rejected(self):
+        token = self.token()
+
+        self.user.set_password('654321')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            StatelessJWTAuthentication().get_user(token)
+
+        token = self.token()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            StatelessJWTAuthentication().get_user(token)
+
+
+class AvailabilityTestCase(TestCase):
+    def setUp(self):
+        # Flushed by other TransactionTestCase, self registration need it
+        Group.objects.get_or_create(name=DEFAULT_GROUP)
+        User.objects.create_user('availuser', 'avail@email.com', '123456')
+        rebuild_filter(EMAIL)
+        rebuild_filter(MSISDN)
+
+    def test_miss_without_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('person_v1:user-check-email'), {'email': 'free@email.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['is_available'], True)
+        self.assertEqual(response.data['is_used_before'], False)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('person_v1:user-check-msisdn'), {'msisdn': '0899000111'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['is_available'], True)
+
+
+class UserCacheCommitTestCase(TransactionTestCase):
+    def setUp(self):
+        # Flushed by other TransactionTestCase, self registration need it
+        Group.objects.get_or_create(name=DEFAULT_GROUP)
+        self.user = User.objects.create_user('commituser', 'commit@email.com', '123456')
+
+    def read_claims(self):
+        # Other request, own connection only see committed row
+        result = []
+
+        def read():
+            try:
+                result.append(get_cached_claims(self.user.id))
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_read_before_commit_not_kept(self):
+        self.assertTrue(get_cached_claims(self.user.id)['is_active'])
+
+        with transaction.atomic():
+            self.user.is_active = False
+            self.user.save()
+            # Old row put back to cache before commit
+            self.assertTrue(self.read_claims()['is_active'])
+
+        self.assertFalse(get_cached_claims(self.user.id)['is_active'])
+
+
+class ThumbnailTestCase(SimpleTestCase):
+    def open(self, image, **kwargs):
+        buffer = io.BytesIO()
+        image.save(buffer, **kwargs)
+        buffer.seek(0)
+        image = Image.open(buffer)
+        image.load()
+        return image
+
+    def test_sizes_and_formats(self):
+        image = prepare_image(self.open(Image.new('RGB', (300, 200), (0, 128, 0)), format='PNG'))
+
+        for size in PROFILE_THUMBNAIL_SIZES:
+            for fmt, name in THUMBNAIL_FORMATS.items():
+                thumbnail = Image.open(make_thumbnail(image, size, fmt))
+                self.assertEqual(thumbnail.format, name)
+                self.assertEqual(thumbnail.size, (size, size))
+                self.assertEqual(thumbnail.mode, 'RGB')
+
+    def test_exif_orientation_applied_and_dropped(self):
+        # Left red right blue, EXIF say rotate 90 clockwise: red on top
+        image = Image.new('RGB', (60, 30), (255, 0, 0))
+        image.paste((0, 0, 255), (30, 0, 60, 30))
+        exif = image.getexif()
+        exif[0x0112] = 6
+        image = prepare_image(self.open(image, format='JPEG', exif=exif))
+
+        for fmt in THUMBNAIL_FORMATS:
+            thumbnail = Image.open(make_thumbnail(image, 16, fmt))
+            top, bottom = thumbnail.getpixel((15, 0)), thumbnail.getpixel((0, 15))
+            self.assertGreater(top[0], top[2])
+            self.assertGreater(bottom[2], bottom[0])
+            self.assertEqual(len(thumbnail.getexif()), 0)
+
+    def test_transparent_jpeg_on_white(self):
+        image = prepare_image(self.open(Image.new('RGBA', (20, 20), (0, 0, 0, 0)), format='PNG'))
+        thumbnail = Image.open(make_thumbnail(image, 16, 'jpeg'))
+        self.assertGreater(min(thumbnail.getpixel((8, 8))), 240)
@@ -0,0 +1,152 @@
+import time
+import uuid
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.base import DEFERRED
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# Fields carried inside the access token, everything else stays deferred
+# and loaded lazily by django only when a view really touch it
+USER_CLAIM_FIELDS = ['uuid', 'username', 'is_active', 'is_staff', 'is_superuser']
+USER_CLAIM_GROUPS = 'groups'
+# Digest of claims and password, token claims trusted only when it match
+# current one. Password changed revoke the token
+USER_CLAIM_VERSION = 'auth_version'
+USER_CLAIM_KEY = 'auth_key'
+
+USER_CACHE_PREFIX = 'person_auth_user'
+USER_CACHE_TIMEOUT = 60 * 5
+
+# In-process cache, keep short because other workers can't invalidate it
+USER_LOCAL_CACHE_TIMEOUT = 30
+_LOCAL_CACHE = dict()
+
+
+def user_cache_key(user_id):
+    return '%s_%s' % (USER_CACHE_PREFIX, user_id)
+
+
+def _digest(*values):
+    return hashlib.sha256(repr(values).encode('utf-8')).hexdigest()[:16]
+
+
+def user_claims(user):
+    """Claims added to token, also the value stored to cache"""
+    claims = {field: getattr(user, field) for field in USER_CLAIM_FIELDS}
+    claims['uuid'] = str(claims['uuid'])
+    claims[USER_CLAIM_GROUPS] = sorted(user.groups.values_list('name', flat=True))
+    claims[USER_CLAIM_KEY] = _digest(user.password)
+    claims[USER_CLAIM_VERSION] = _digest(claims[USER_CLAIM_KEY], claims[USER_CLAIM_GROUPS],
+                                         *[claims[field] for field in USER_CLAIM_FIELDS])
+    return claims
+
+
+def _delete_user_cache(user_id):
+    _LOCAL_CACHE.pop(user_id, None)
+    cache.delete(user_cache_key(user_id))
+
+
+def invalidate_user_cache(user_id):
+    """
+    Delete now and again after commit, request read the old row before
+    commit would put it back to cache for USER_CACHE_TIMEOUT
+    """
+    _delete_user_cache(user_id)
+    transaction.on_commit(lambda: _delete_user_cache(user_id))
+
+
+def get_local_claims(user_id):
+    item = _LOCAL_CACHE.get(user_id)
+    if item is None:
+        return None
+
+    expire_at, claims = item
+    if expire_at < time.monotonic():
+        _LOCAL_CACHE.pop(user_id, None)
+        return None
+    return claims
+
+
+def set_local_claims(user_id, claims):
+    _LOCAL_CACHE[user_id] = (time.monotonic() + USER_LOCAL_CACHE_TIMEOUT, claims)
+
+
+def get_cached_claims(user_id):
+    """In-process first, then shared cache (redis), last database"""
+    claims = get_local_claims(user_id)
+    if claims is not None:
+        return claims
+
+    key = user_cache_key(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        try:
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except User.DoesNotExist:
+            return None
+
+        claims = user_claims(user)
+        cache.set(key, claims, USER_CACHE_TIMEOUT)
+
+    set_local_claims(user_id, claims)
+    return claims
+
+
+def build_user(user_id, claims):
+    """
+    Return real User instance without hit database,
+    only claims fields loaded so save() never overwrite other fields
+    """
+    data = {field: claims.get(field) for field in USER_CLAIM_FIELDS}
+    data[api_settings.USER_ID_FIELD] = user_id
+    data['uuid'] = uuid.UUID(str(data['uuid']))
+
+    field_names = []
+    values = []
+    for field in User._meta.concrete_fields:
+        if field.attname in data:
+            field_names.append(field.attname)
+            values.append(data[field.attname])
+        else:
+            values.append(DEFERRED)
+
+    return User.from_db('default', field_names, values)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Same as JWTAuthentication but build user from signed token claims.
+    Token claims checked every request against the short-TTL user cache,
+    so deactivated or demoted user lose access when the cache expire
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = get_cached_claims(user_id)
+        if claims is None:
+            raise AuthenticationFailed(_("User not found"), code='user_not_found')
+
+        if not claims.get('is_active'):
+            raise AuthenticationFailed(_("User is inactive"), code='user_inactive')
+
+        # Token issued before password changed
+        key = validated_token.get(USER_CLAIM_KEY)
+        if key is not None and key != claims.get(USER_CLAIM_KEY):
+            raise AuthenticationFailed(_("Token is no longer valid"), code='token_revoked')
+
+        # Stale token claims (username, staff flags) replaced by current one
+        if validated_token.get(USER_CLAIM_VERSION) == claims.get(USER_CLAIM_VERSION):
+            claims = {field: validated_token[field] for field in USER_CLAIM_FIELDS}
+        return build_user(user_id, claims)
@@ -0,0 +1,73 @@
+import logging
+
+from redis.exceptions import RedisError
+
+from django.contrib.auth import get_user_model
+
+from utils.bloom import BloomFilter
+from utils.generals import get_model
+
+logger = logging.getLogger(__name__)
+
+USERNAME = 'username'
+EMAIL = 'email'
+MSISDN = 'msisdn'
+IDENTIFIER_KINDS = [USERNAME, EMAIL, MSISDN]
+
+_FILTERS = {kind: BloomFilter('person_taken_%s' % kind) for kind in IDENTIFIER_KINDS}
+
+
+def normalize_identifier(value):
+    return str(value).strip().lower()
+
+
+def mark_taken(kind, *values):
+    """Called from signals, filter only grow so false positive go to database"""
+    values = [normalize_identifier(v) for v in values if v]
+    if not values:
+        return
+
+    try:
+        _FILTERS[kind].add_many(values)
+    except RedisError as e:
+        logger.warning('Mark %s taken failed: %s', kind, e)
+
+
+def is_possibly_taken(kind, value):
+    """
+    False mean definitely available, no need to query.
+    Filter not built yet or redis down always return True
+    """
+    bloom = _FILTERS[kind]
+    try:
+        if not bloom.exists():
+            return True
+        return bloom.contains(normalize_identifier(value))
+    except RedisError as e:
+        logger.warning('Check %s availability failed: %s', kind, e)
+        return True
+
+
+def taken_identifiers(kind):
+    """Value of account and of pending verify code (is_used_before)"""
+    User = get_user_model()
+    Account = get_model('person', 'Account')
+    VerifyCode = get_model('person', 'VerifyCode')
+
+    if kind == USERNAME:
+        querysets = [User.objects.values_list('username', flat=True)]
+    else:
+        querysets = [
+            Account.objects.filter(**{'%s__isnull' % kind: False}).values_list(kind, flat=True),
+            VerifyCode.objects.filter(is_used=False, is_expired=False, **{'%s__isnull' % kind: False})
+            .values_list(kind, flat=True)
+        ]
+
+    for values in querysets:
+        for value in values.iterator():
+            if value:
+                yield normalize_identifier(value)
+
+
+def rebuild_filter(kind):
+    _FILTERS[kind].rebuild(taken_identifiers(kind))
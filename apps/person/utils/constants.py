@@ -6,6 +6,10 @@ ASSISTANT = 'Assistant'
 DEFAULT_GROUP = CUSTOMER
 
 
+# Profile picture thumbnail, square in pixel
+PROFILE_THUMBNAIL_SIZES = [48, 96, 256]
+
+
 VerifyCode_SESSION_FIELDS = ['uuid', 'token', 'challenge', 'msisdn', 'email', 'info']
 EMAIL_VALIDATION = 'email_validation'
 MSISDN_VALIDATION = 'msisdn_validation'
@@ -31,6 +31,15 @@ ShippingMethod = get_model('shopping', 'ShippingMethod')
 Assign = get_model('shopping', 'Assign')
 AssignTracking = get_model('shopping', 'AssignTracking')
 AssignLog = get_model('shopping', 'AssignLog')
+PaymentNotification = get_model('shopping', 'PaymentNotification')
+DeliveryRoute = get_model('shopping', 'DeliveryRoute')
+DeliverySlot = get_model('shopping', 'DeliverySlot')
+SpendingProduct = get_model('shopping', 'SpendingProduct')
+SpendingLocation = get_model('shopping', 'SpendingLocation')
+ExportJob = get_model('shopping', 'ExportJob')
+ProductRelation = get_model('shopping', 'ProductRelation')
+ProductHabit = get_model('shopping', 'ProductHabit')
+ProductPrice = get_model('shopping', 'ProductPrice')
 
 
 class ShareExtend(admin.ModelAdmin):
@@ -166,6 +175,7 @@ class ProductExtend(admin.ModelAdmin):
     model = Product
     inlines = [ProductMetricInline, ProductRateInline, ProductAttachmentInline,]
     search_fields = ['name',]
+    raw_id_fields = ['canonical',]
 
     def get_queryset(self, request):
         qs = super().get_queryset(request) \
@@ -214,6 +224,20 @@ class OrderExtend(admin.ModelAdmin):
     inlines = [AssignInline,]
     readonly_fields = ['customer',]
 
+    def save_formset(self, request, form, formset, change):
+        # Staff recorded as actor in AssignLog
+        for inline_form in formset.forms:
+            inline_form.instance.log_actor = request.user
+        super().save_formset(request, form, formset, change)
+
+
+class AssignExtend(admin.ModelAdmin):
+    model = Assign
+
+    def save_model(self, request, obj, form, change):
+        obj.log_actor = request.user
+        super().save_model(request, obj, form, change)
+
 
 admin.site.register(Category)
 admin.site.register(Brand)
@@ -240,6 +264,15 @@ admin.site.register(Invoice)
 admin.site.register(InvoiceLine)
 admin.site.register(ShippingAddress)
 admin.site.register(ShippingMethod)
-admin.site.register(Assign)
+admin.site.register(Assign, AssignExtend)
 admin.site.register(AssignTracking)
 admin.site.register(AssignLog)
+admin.site.register(PaymentNotification)
+admin.site.register(DeliveryRoute)
+admin.site.register(DeliverySlot)
+admin.site.register(SpendingProduct)
+admin.site.register(SpendingLocation)
+admin.site.register(ExportJob)
+admin.site.register(ProductRelation)
+admin.site.register(ProductHabit)
+admin.site.register(ProductPrice)
@@ -0,0 +1,57 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+
+from utils.generals import get_model
+from apps.shopping.utils.constants import TRACKING_BATCH_MAX_POINTS
+
+Assign = get_model('shopping', 'Assign')
+AssignTracking = get_model('shopping', 'AssignTracking')
+AssignLog = get_model('shopping', 'AssignLog')
+
+
+class AssignSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='shopping_api:assistant:assign-detail',
+                                               lookup_field='uuid', read_only=True)
+    order = serializers.SlugRelatedField(slug_field='number', read_only=True)
+
+    class Meta:
+        model = Assign
+        fields = ('uuid', 'url', 'order', 'started_at', 'complete_at',
+                  'is_ongoing', 'is_complete', 'create_at',)
+
+
+class TrackingPointSerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    recorded_at = serializers.DateTimeField()
+    location = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+    def to_point(self, data):
+        # Compact form stored in redis buffer
+        return [data['latitude'], data['longitude'], data['recorded_at'].timestamp(),
+                data.get('location')]
+
+
+class TrackingBatchSerializer(serializers.Serializer):
+    points = TrackingPointSerializer(many=True, allow_empty=False)
+
+    def validate_points(self, value):
+        if len(value) > TRACKING_BATCH_MAX_POINTS:
+            raise serializers.ValidationError(
+                _("Maksimal {} titik per kiriman".format(TRACKING_BATCH_MAX_POINTS)))
+        return value
+
+
+class AssignTrackingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AssignTracking
+        fields = ('latitude', 'longitude', 'geohash', 'recorded_at', 'location',)
+
+
+class AssignLogSerializer(serializers.ModelSerializer):
+    actor = serializers.SlugRelatedField(slug_field='username', read_only=True)
+
+    class Meta:
+        model = AssignLog
+        fields = ('uuid', 'create_at', 'actor', 'column', 'old_value', 'new_value', 'event',)
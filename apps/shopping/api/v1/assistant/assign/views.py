@@ -0,0 +1,150 @@
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination, CursorPagination
+
+from utils.generals import get_model
+from utils.pagination import build_result_pagination
+from utils.mixin.viewsets import ViewSetGetObjMixin
+from apps.shopping.utils.constants import TRACKING_FLUSH_SIZE
+from apps.shopping.utils.tracking import buffer_points, publish_live_location
+from apps.shopping.tasks import flush_assign_tracking
+from .serializers import (
+    AssignSerializer,
+    TrackingPointSerializer,
+    TrackingBatchSerializer,
+    AssignTrackingSerializer,
+    AssignLogSerializer
+)
+
+Assign = get_model('shopping', 'Assign')
+AssignTracking = get_model('shopping', 'AssignTracking')
+AssignLog = get_model('shopping', 'AssignLog')
+
+# Define to avoid used ...().paginate__
+_PAGINATOR = LimitOffsetPagination()
+
+
+class AssignLogPagination(CursorPagination):
+    # Keyset on (assign, create_at), page cost same however deep
+    ordering = ('-create_at', '-id')
+    page_size = 50
+
+
+class AssignApiView(ViewSetGetObjMixin, viewsets.ViewSet):
+    """
+    Assign for logged in assistant
+
+    POST trackings/ send GPS points in batch, one request every
+    few seconds or when back online
+
+        {
+            "points": [
+                {"latitude": -6.2, "longitude": 106.8, "recorded_at": "iso datetime"}
+            ]
+        }
+
+    GET trackings/?bbox=south,west,north,east list stored points
+    GET logs/ change history, follow `next` link for older page
+    """
+    lookup_field = 'uuid'
+    permission_classes = (IsAuthenticated,)
+
+    def queryset(self):
+        query = Assign.objects \
+            .prefetch_related('order', 'assistant') \
+            .select_related('order', 'assistant') \
+            .filter(Q(assistant_id=self.request.user.id) | Q(customer_id=self.request.user.id))
+
+        return query
+
+    def list(self, request, format=None):
+        context = {'request': request}
+        queryset = self.queryset().filter(assistant_id=request.user.id)
+        queryset_paginator = _PAGINATOR.paginate_queryset(queryset, request)
+        serializer = AssignSerializer(queryset_paginator, many=True, context=context)
+        results = build_result_pagination(self, _PAGINATOR, serializer)
+        return Response(results, status=response_status.HTTP_200_OK)
+
+    def retrieve(self, request, uuid=None, format=None):
+        context = {'request': request}
+        queryset = self.get_object(uuid=uuid)
+        serializer = AssignSerializer(queryset, many=False, context=context)
+        return Response(serializer.data, status=response_status.HTTP_200_OK)
+
+    def get_bbox(self):
+        bbox = self.request.query_params.get('bbox')
+        if not bbox:
+            return None
+
+        try:
+            south, west, north, east = [float(x) for x in bbox.split(',')]
+        except ValueError:
+            raise NotAcceptable(detail=_("Format bbox: south,west,north,east"))
+
+        if south > north or west > east:
+            raise NotAcceptable(detail=_("Format bbox: south,west,north,east"))
+        return south, west, north, east
+
+    @method_decorator(never_cache)
+    @action(methods=['get', 'post'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='trackings', url_name='trackings')
+    def trackings(self, request, uuid=None):
+        instance = self.get_object(uuid=uuid)
+
+        if request.method == 'POST':
+            if instance.assistant_id != request.user.id or instance.is_complete:
+                raise NotAcceptable(detail=_("Tidak bisa mengirim lokasi"))
+
+            serializer = TrackingBatchSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            points = [TrackingPointSerializer().to_point(x) for x in serializer.validated_data['points']]
+            length = buffer_points(instance.id, points)
+            if length >= TRACKING_FLUSH_SIZE:
+                flush_assign_tracking.delay(instance.id)
+
+            # Customer watching live only need the newest one
+            if instance.is_ongoing:
+                publish_live_location(instance.uuid, max(points, key=lambda x: x[2]))
+
+            return Response({'received': len(points)}, status=response_status.HTTP_202_ACCEPTED)
+
+        context = {'request': request}
+        queryset = AssignTracking.objects.filter(assign_id=instance.id).order_by('recorded_at')
+        bbox = self.get_bbox()
+        if bbox:
+            queryset = queryset.within(*bbox)
+
+        queryset_paginator = _PAGINATOR.paginate_queryset(queryset, request)
+        serializer = AssignTrackingSerializer(queryset_paginator, many=True, context=context)
+        results = build_result_pagination(self, _PAGINATOR, serializer)
+        return Response(results, status=response_status.HTTP_200_OK)
+
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='logs', url_name='logs')
+    def logs(self, request, uuid=None):
+        context = {'request': request}
+        instance = self.get_object(uuid=uuid)
+        queryset = AssignLog.objects \
+            .select_related('actor') \
+            .filter(assign_id=instance.id)
+
+        paginator = AssignLogPagination()
+        queryset_paginator = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = AssignLogSerializer(queryset_paginator, many=True, context=context)
+        return Response({
+            'previous': paginator.get_previous_link(),
+            'next': paginator.get_next_link(),
+            'results': serializer.data,
+        }, status=response_status.HTTP_200_OK)
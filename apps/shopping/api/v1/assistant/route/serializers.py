@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from utils.generals import get_model
+
+DeliveryRoute = get_model('shopping', 'DeliveryRoute')
+OrderDelivery = get_model('shopping', 'OrderDelivery')
+
+
+class RouteStopSerializer(serializers.ModelSerializer):
+    order = serializers.SlugRelatedField(slug_field='number', read_only=True)
+
+    class Meta:
+        model = OrderDelivery
+        fields = ('uuid', 'order', 'route_sequence', 'route_eta', 'recipient_name', 'msisdn',
+                  'street_1', 'street_2', 'city', 'postal_code', 'latitude', 'longitude',)
+
+
+class DeliveryRouteSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='shopping_api:assistant:delivery_route-detail',
+                                               lookup_field='uuid', read_only=True)
+    stops = RouteStopSerializer(source='order_delivery', many=True, read_only=True)
+
+    class Meta:
+        model = DeliveryRoute
+        fields = ('uuid', 'url', 'start_at', 'distance', 'duration', 'stops',)
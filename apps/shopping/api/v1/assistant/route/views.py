@@ -0,0 +1,56 @@
+import datetime
+
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.pagination import LimitOffsetPagination
+
+from utils.generals import get_model
+from utils.pagination import build_result_pagination
+from utils.mixin.viewsets import ViewSetGetObjMixin
+from apps.shopping.utils.constants import ROUTE_WINDOW_MINUTES
+from .serializers import DeliveryRouteSerializer
+
+DeliveryRoute = get_model('shopping', 'DeliveryRoute')
+OrderDelivery = get_model('shopping', 'OrderDelivery')
+
+# Define to avoid used ...().paginate__
+_PAGINATOR = LimitOffsetPagination()
+
+
+class DeliveryRouteApiView(ViewSetGetObjMixin, viewsets.ViewSet):
+    """
+    Route of logged in courier, stops in visit order with ETA.
+    List only current and upcoming route
+    """
+    lookup_field = 'uuid'
+    permission_classes = (IsAuthenticated,)
+
+    def queryset(self):
+        stops = OrderDelivery.objects \
+            .select_related('order') \
+            .order_by('route_sequence')
+
+        query = DeliveryRoute.objects \
+            .prefetch_related(Prefetch('order_delivery', queryset=stops)) \
+            .filter(courier_id=self.request.user.id)
+
+        return query
+
+    def list(self, request, format=None):
+        context = {'request': request}
+        current = timezone.now() - datetime.timedelta(minutes=ROUTE_WINDOW_MINUTES)
+        queryset = self.queryset().filter(start_at__gte=current).order_by('start_at')
+        queryset_paginator = _PAGINATOR.paginate_queryset(queryset, request)
+        serializer = DeliveryRouteSerializer(queryset_paginator, many=True, context=context)
+        results = build_result_pagination(self, _PAGINATOR, serializer)
+        return Response(results, status=response_status.HTTP_200_OK)
+
+    def retrieve(self, request, uuid=None, format=None):
+        context = {'request': request}
+        queryset = self.get_object(uuid=uuid)
+        serializer = DeliveryRouteSerializer(queryset, many=False, context=context)
+        return Response(serializer.data, status=response_status.HTTP_200_OK)
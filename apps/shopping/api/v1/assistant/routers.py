@@ -0,0 +1,15 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .assign.views import AssignApiView
+from .route.views import DeliveryRouteApiView
+
+# Create a router and register our viewsets with it.
+router = DefaultRouter(trailing_slash=True)
+router.register('assigns', AssignApiView, basename='assign')
+router.register('delivery-routes', DeliveryRouteApiView, basename='delivery_route')
+
+# The API URLs are now determined automatically by the router.
+urlpatterns = [
+    path('', include(router.urls)),
+]
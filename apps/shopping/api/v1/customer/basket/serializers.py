@@ -15,14 +15,19 @@ from rest_framework.exceptions import NotFound, ValidationError
 
 from utils.generals import get_model, quantity_format
 from utils.mixin.validators import CleanValidateMixin
+from utils.mixin.values import ValuesListSerializer
 from utils.mixin.api import (
     CreatableSlugRelatedField, DynamicFieldsModelSerializer, 
     ExcludeFieldsModelSerializer, 
     ListSerializerUpdateMappingField, 
     WritetableFieldPutMethod
 )
+from apps.shopping.utils.canonical import resolve_product
+from apps.shopping.utils.habit import habit_suggestions
+from apps.shopping.utils.pricing import estimate_basket_amounts
 from ..purchased.serializers import PurchasedSerializer, PurchasedStuffSerializer
 from ..order.serializers import OrderSerializer
+from ..media.serializers import AttachmentModelSerializer
 
 Basket = get_model('shopping', 'Basket')
 BasketAttachment = get_model('shopping', 'BasketAttachment')
@@ -33,6 +38,15 @@ Share = get_model('shopping', 'Share')
 Product = get_model('shopping', 'Product')
 
 
+class CanonicalProductField(CreatableSlugRelatedField):
+    """Near duplicate name ('Telor' for 'Telur') use existing canonical product"""
+    def to_internal_value(self, data):
+        request = self.context.get('request')
+        if not isinstance(data, str) or not data.strip():
+            self.fail('invalid')
+        return resolve_product(data.strip(), user=request.user)
+
+
 def validate_attachment(file):
     name, ext = os.path.splitext(file.name)
     fsize = file.size / 1000
@@ -134,7 +148,7 @@ class StuffListSerializer(ListSerializerUpdateMappingField, serializers.ListSeri
     pass
 
 
-class StuffAttachmentSerializer(CleanValidateMixin, serializers.ModelSerializer):
+class StuffAttachmentSerializer(CleanValidateMixin, AttachmentModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     stuff = serializers.SlugRelatedField(slug_field='uuid', queryset=Stuff.objects.all())
 
@@ -157,7 +171,7 @@ class StuffSerializer(CleanValidateMixin, WritetableFieldPutMethod, DynamicField
                                                lookup_field='uuid', read_only=True)
     user = serializers.SlugRelatedField(slug_field='uuid', queryset=get_user_model().objects.all(),
                                         default=serializers.CurrentUserDefault())
-    product = CreatableSlugRelatedField(slug_field='name', queryset=Product.objects.all())
+    product = CanonicalProductField(slug_field='name', queryset=Product.objects.all())
     basket = serializers.SlugRelatedField(slug_field='uuid', queryset=Basket.objects.all())
     first_name = serializers.CharField(source='user.first_name', read_only=True)
     purchased_stuff = PurchasedStuffSerializer(required=False, exclude_fields=['stuff', 'purchased'])
@@ -227,7 +241,7 @@ class StuffSerializer(CleanValidateMixin, WritetableFieldPutMethod, DynamicField
 
 
 class BasketAttachmentSerializer(CleanValidateMixin, WritetableFieldPutMethod,
-                                 serializers.ModelSerializer):
+                                 AttachmentModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     basket = serializers.SlugRelatedField(slug_field='uuid', queryset=Basket.objects.all())
 
@@ -260,6 +274,8 @@ class BasketSerializer(DynamicFieldsModelSerializer, ExcludeFieldsModelSerialize
                             exclude_fields=['basket', 'circle', 'msisdn', 'username',
                                             'sort', 'user', 'create_at', 'update_at', 'id'])
     order = OrderSerializer(read_only=True, many=False, fields=['uuid', 'order_schedule'])
+    # Fill new basket with product user usually buy around now
+    is_suggested = serializers.BooleanField(write_only=True, required=False, default=False)
 
     first_name = serializers.CharField(read_only=True, source='user.first_name')
     count_stuff = serializers.IntegerField(read_only=True)
@@ -270,6 +286,8 @@ class BasketSerializer(DynamicFieldsModelSerializer, ExcludeFieldsModelSerialize
     count_amount = serializers.IntegerField(read_only=True)
     count_share = serializers.IntegerField(read_only=True)
     count_attachment = serializers.IntegerField(read_only=True)
+    # set by estimate_baskets, from expected price of every stuff
+    estimated_amount = serializers.IntegerField(read_only=True)
     
     is_creator = serializers.SerializerMethodField(read_only=True)
     is_share_with_you = serializers.BooleanField(read_only=True)
@@ -297,8 +315,17 @@ class BasketSerializer(DynamicFieldsModelSerializer, ExcludeFieldsModelSerialize
     @transaction.atomic
     def create(self, validated_data):
         stuffs = validated_data.pop('stuff', None)
+        is_suggested = validated_data.pop('is_suggested', False)
         instance = Basket.objects.create(**validated_data)
 
+        # stuff given by client win over suggestion
+        if is_suggested and not stuffs and instance:
+            stuffs = [
+                {'user': instance.user, 'product_id': x['product_id'], 'name': x['name'],
+                 'quantity': x['quantity'], 'metric': x['metric']}
+                for x in habit_suggestions(instance.user.id)
+            ]
+
         # create stuffs
         if stuffs and instance:
             stuffs_obj = []
@@ -327,3 +354,55 @@ class BasketSerializer(DynamicFieldsModelSerializer, ExcludeFieldsModelSerialize
             instance.save()
 
         return super().update(instance, validated_data)
+
+
+class StuffValuesSerializer(ValuesListSerializer):
+    """StuffSerializer output from values() row, for list"""
+    serializer_class = StuffSerializer
+    computed_fields = {'is_creator': (['user'], 'get_is_creator')}
+    extra_values = ['uuid', 'quantity', 'metric']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metric_display = self.choices_display(Stuff, 'metric')
+
+    def get_is_creator(self, row):
+        request = self.context.get('request')
+        return request.user.id == row[self.prefix + 'user']
+
+    def extra_representation(self, ret, row):
+        request = self.context.get('request')
+        quantity = row[self.prefix + 'quantity']
+        metric = row[self.prefix + 'metric']
+
+        if request.method == 'PUT':
+            ret['uuid'] = row[self.prefix + 'uuid']
+
+        ret['quantity'] = quantity_format(quantity) if quantity else quantity
+        ret['metric_display'] = self.metric_display.get(metric, metric)
+        return ret
+
+
+class BasketValuesSerializer(ValuesListSerializer):
+    """BasketSerializer output from values() row, for list"""
+    serializer_class = BasketSerializer
+    computed_fields = {
+        'estimated_amount': (['id'], 'get_estimated_amount'),
+        'is_creator': (['user'], 'get_is_creator'),
+        'is_order_ongoing': (['order__is_ongoing'], 'get_is_order_ongoing'),
+    }
+
+    def prepare(self, rows):
+        basket_ids = [x['id'] for x in rows]
+        self.estimated_amounts = dict(zip(basket_ids, estimate_basket_amounts(basket_ids)))
+
+    def get_estimated_amount(self, row):
+        return self.estimated_amounts.get(row['id'])
+
+    def get_is_creator(self, row):
+        request = self.context.get('request')
+        return request.user.id == row['user']
+
+    def get_is_order_ongoing(self, row):
+        # Basket without order is not ongoing
+        return row['order__is_ongoing'] or False
@@ -21,11 +21,23 @@ from rest_framework.parsers import MultiPartParser
 
 from utils.generals import get_model
 from utils.pagination import build_result_pagination
+from apps.shopping.utils.constants import (
+    IMPORT_MAX_LINES,
+    RECOMMENDATION_LIMIT,
+    RECOMMENDATION_MAX_LIMIT,
+    HABIT_SUGGESTION_LIMIT
+)
+from apps.shopping.utils.importer import parse_text, parse_csv, import_stuffs
+from apps.shopping.utils.recommendation import recommend_for_products
+from apps.shopping.utils.habit import habit_suggestions
+from apps.shopping.utils.pricing import estimate_baskets, estimate_amounts
 from .serializers import (
     BasketAttachmentSerializer, 
     BasketSerializer, 
+    BasketValuesSerializer,
     StuffAttachmentSerializer, 
     StuffSerializer, 
+    StuffValuesSerializer,
     ShareSerializer
 )
 
@@ -35,6 +47,7 @@ Stuff = get_model('shopping', 'Stuff')
 StuffAttachment = get_model('shopping', 'StuffAttachment')
 Share = get_model('shopping', 'Share')
 PurchasedStuff = get_model('shopping', 'PurchasedStuff')
+Product = get_model('shopping', 'Product')
 
 # Define to avoid used ...().paginate__
 _PAGINATOR = LimitOffsetPagination()
@@ -126,9 +139,10 @@ class BasketApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet
         # Calculate total ampunt
         summary = queryset.aggregate(total_amount=Sum('count_amount'))
 
-        queryset_paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = BasketSerializer(queryset_paginator, many=True, context=context,
-                                      exclude_fields=['share', 'purchased', 'stuff', 'order'])
+        # Rendered from values() row, same output as BasketSerializer
+        serializer = BasketValuesSerializer(context=context,
+                                            exclude_fields=['share', 'purchased', 'stuff', 'order'])
+        serializer.instance = _PAGINATOR.paginate_queryset(serializer.values(queryset), request)
         pagination_result = build_result_pagination(self, _PAGINATOR, serializer)
         pagination_result['summary'] = summary
         return Response(pagination_result, status=response_status.HTTP_200_OK)
@@ -136,6 +150,7 @@ class BasketApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet
     def retrieve(self, request, uuid=None, format=None):
         context = {'request': request}
         queryset = self.get_object(uuid=uuid)
+        estimate_baskets([queryset])
         serializer = BasketSerializer(queryset, many=False, context=context)
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
@@ -250,14 +265,70 @@ class BasketApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet
     def check_purchased_stuff(self, request, uuid=None):
         queryset = PurchasedStuff.objects.filter(basket__uuid=uuid, is_found=True)
         total = queryset.count()
+
+        # Expected amount of item without price, from product rate history
+        rows = queryset.filter(amount=0, stuff__product__isnull=False) \
+            .annotate(item_id=Coalesce('stuff__product__canonical_id', 'stuff__product_id')) \
+            .values_list('item_id', 'metric', 'quantity', 'location')
         amount_empty = queryset.filter(amount=0).count()
 
         return Response({
             'detail': _("{} item belum ada harga".format(amount_empty)),
             'total': total,
-            'amount_empty': amount_empty
+            'amount_empty': amount_empty,
+            'amount_estimated': int(round(estimate_amounts(rows).sum()))
         }, status=response_status.HTTP_200_OK)
 
+    # Product user usually buy around now, for new basket
+    # POST basket with "is_suggested": true to create them as stuff
+    # ?limit=30
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=False,
+            permission_classes=[IsAuthenticated],
+            url_path='suggestions',
+            url_name='suggestions')
+    def suggestions(self, request, format=None):
+        try:
+            limit = int(request.query_params.get('limit', HABIT_SUGGESTION_LIMIT))
+        except ValueError:
+            raise NotAcceptable(detail=_("Limit tidak valid"))
+        limit = max(1, min(limit, HABIT_SUGGESTION_LIMIT))
+
+        results = [
+            {k: v for k, v in x.items() if k != 'product_id'}
+            for x in habit_suggestions(request.user.id, limit=limit)
+        ]
+        return Response(results, status=response_status.HTTP_200_OK)
+
+    # Frequently bought together with stuff in basket
+    # ?limit=10
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='recommendations',
+            url_name='recommendations')
+    def recommendations(self, request, uuid=None):
+        try:
+            limit = int(request.query_params.get('limit', RECOMMENDATION_LIMIT))
+        except ValueError:
+            raise NotAcceptable(detail=_("Limit tidak valid"))
+        limit = max(1, min(limit, RECOMMENDATION_MAX_LIMIT))
+
+        basket = self.get_object(uuid=uuid)
+        product_ids = Stuff.objects \
+            .filter(basket_id=basket.id, product__isnull=False) \
+            .annotate(item_id=Coalesce('product__canonical_id', 'product_id')) \
+            .values_list('item_id', flat=True)
+
+        scores = recommend_for_products(set(product_ids), limit=limit)
+        products = Product.objects.in_bulk([x[0] for x in scores])
+
+        results = [
+            {'uuid': products[x].uuid, 'name': products[x].name, 'score': score}
+            for x, score in scores if x in products
+        ]
+        return Response(results, status=response_status.HTTP_200_OK)
+
     # List attachment
     @method_decorator(never_cache)
     @transaction.atomic
@@ -402,9 +473,9 @@ class StuffApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet)
         except ValidationError as e:
             raise ValidationErrorResponse(detail=str(e))
 
-        queryset_paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = StuffSerializer(queryset_paginator, many=True, context=context,
-                                     exclude_fields=['basket'])
+        # Rendered from values() row, same output as StuffSerializer
+        serializer = StuffValuesSerializer(context=context, exclude_fields=['basket'])
+        serializer.instance = _PAGINATOR.paginate_queryset(serializer.values(queryset), request)
         pagination_result = build_result_pagination(self, _PAGINATOR, serializer)
         pagination_result['summary'] = summary
         return Response(pagination_result, status=response_status.HTTP_200_OK)
@@ -471,6 +542,44 @@ class StuffApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet)
             return Response(serializer.data, status=response_status.HTTP_200_OK)
         return Response(serializer.errors, status=response_status.HTTP_406_NOT_ACCEPTABLE)
 
+    # Many stuff at once from pasted list or csv
+    # {"basket": "uuid", "content": "2 kg beras\ntelur x10", "type": "text / csv"}
+    @method_decorator(never_cache)
+    @transaction.atomic
+    @action(methods=['post'], detail=False,
+            permission_classes=[IsAuthenticated],
+            url_path='import', url_name='import')
+    def bulk_import(self, request, format=None):
+        context = {'request': request}
+        content = request.data.get('content') or ''
+        content_type = request.data.get('type', 'text')
+
+        try:
+            basket = Basket.objects.get(uuid=request.data.get('basket'))
+        except ObjectDoesNotExist:
+            raise NotFound()
+        except ValidationError as e:
+            raise ValidationErrorResponse(detail=str(e))
+
+        items = parse_csv(content) if content_type == 'csv' else parse_text(content)
+        if not items:
+            raise NotAcceptable(detail=_("Tidak ada item yang bisa dibaca"))
+
+        if len(items) > IMPORT_MAX_LINES:
+            raise NotAcceptable(detail=_("Maksimal {} item sekali import".format(IMPORT_MAX_LINES)))
+
+        # Same permission as adding one stuff, checked once for all
+        try:
+            Stuff(basket=basket, user=request.user, quantity=1).clean(request=request)
+        except ValidationError as e:
+            raise NotAcceptable(detail=' '.join(e.messages))
+
+        objs = import_stuffs(basket, request.user, items)
+        queryset = self.queryset().filter(uuid__in=[x.uuid for x in objs])
+        serializer = StuffSerializer(queryset, many=True, context=context, exclude_fields=['basket'])
+        return Response({'count': len(objs), 'results': serializer.data},
+                        status=response_status.HTTP_201_CREATED)
+
     # List attachment
     @method_decorator(never_cache)
     @transaction.atomic
@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+from utils.generals import get_model
+
+ExportJob = get_model('shopping', 'ExportJob')
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='shopping_api:customer:export_job-detail',
+                                               lookup_field='uuid', read_only=True)
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    expire_at = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = ('uuid', 'url', 'user', 'dataset', 'output', 'is_gzip', 'status', 'size',
+                  'create_at', 'complete_at', 'expire_at',)
+        read_only_fields = ('status',)
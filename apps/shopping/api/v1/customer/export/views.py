@@ -0,0 +1,140 @@
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.exceptions import NotAcceptable, NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from rest_framework.views import APIView
+
+from utils.generals import get_model
+from utils.sendfile import sendfile
+from utils.mixin.viewsets import ViewSetGetObjMixin
+from apps.shopping.tasks import export_history
+from apps.shopping.utils.constants import EXPORT_CSV, EXPORT_NDJSON, EXPORT_DONE
+from apps.shopping.utils.export import (
+    EXPORT_DATASETS,
+    export_stream,
+    export_filename,
+    export_content_type
+)
+from .serializers import ExportJobSerializer
+
+User = get_model('person', 'User')
+ExportJob = get_model('shopping', 'ExportJob')
+
+
+def export_owner(request):
+    """Own history, staff may export other user with ?user=<uuid>"""
+    user_uuid = request.query_params.get('user')
+    if not user_uuid or str(request.user.uuid) == user_uuid:
+        return request.user
+
+    if not request.user.is_staff:
+        raise NotFound()
+
+    try:
+        return User.objects.get(uuid=user_uuid)
+    except (User.DoesNotExist, ValidationError):
+        raise NotFound()
+
+
+class ExportApiView(APIView):
+    """
+    GET whole history streamed, no pagination
+
+    Param:
+
+        ?output=csv / ndjson (default csv)
+        ?gzip=1
+        ?user=<uuid> (staff only)
+    """
+    permission_classes = (IsAuthenticated,)
+
+    @method_decorator(never_cache)
+    def get(self, request, dataset=None, format=None):
+        if dataset not in EXPORT_DATASETS:
+            raise NotFound()
+
+        output = request.query_params.get('output', EXPORT_CSV)
+        if output not in (EXPORT_CSV, EXPORT_NDJSON):
+            raise NotAcceptable(detail=_("Format export tidak didukung"))
+
+        is_gzip = request.query_params.get('gzip') in ('1', 'true')
+        owner = export_owner(request)
+
+        response = StreamingHttpResponse(export_stream(dataset, owner.id, output=output, is_gzip=is_gzip),
+                                         content_type=export_content_type(output, is_gzip))
+        response['Content-Disposition'] = 'attachment; filename="%s"' % export_filename(dataset, output, is_gzip)
+        # Front proxy must not hold whole body before send
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class ExportJobApiView(ViewSetGetObjMixin, viewsets.ViewSet):
+    """
+    Export written to file by worker, for very large history
+
+    Param:
+
+        {
+            "dataset": "baskets / stuffs / purchased-stuffs",
+            "output": "csv / ndjson",
+            "is_gzip": true
+        }
+
+    Poll detail until status done then GET download/
+    """
+    lookup_field = 'uuid'
+    permission_classes = (IsAuthenticated,)
+
+    def queryset(self):
+        query = ExportJob.objects \
+            .select_related('user', 'owner') \
+            .filter(user_id=self.request.user.id)
+
+        return query
+
+    def retrieve(self, request, uuid=None, format=None):
+        context = {'request': request}
+        queryset = self.get_object(uuid=uuid)
+        serializer = ExportJobSerializer(queryset, many=False, context=context)
+        return Response(serializer.data, status=response_status.HTTP_200_OK)
+
+    @method_decorator(never_cache)
+    @transaction.atomic
+    def create(self, request, format=None):
+        context = {'request': request}
+        owner = export_owner(request)
+        serializer = ExportJobSerializer(data=request.data, many=False, context=context)
+        if serializer.is_valid(raise_exception=True):
+            try:
+                instance = serializer.save(owner=owner)
+            except Exception as e:
+                raise NotAcceptable(detail=str(e))
+
+            transaction.on_commit(lambda: export_history.delay(instance.id))
+            return Response(serializer.data, status=response_status.HTTP_202_ACCEPTED)
+        return Response(serializer.errors, status=response_status.HTTP_403_FORBIDDEN)
+
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='download', url_name='download')
+    def download(self, request, uuid=None):
+        instance = self.get_object(uuid=uuid)
+        if instance.status != EXPORT_DONE or not instance.file:
+            raise NotAcceptable(detail=_("Export belum selesai"))
+
+        if instance.is_expired:
+            raise NotFound()
+
+        response = sendfile(request._request, instance.file.name)
+        response['Content-Disposition'] = 'attachment; filename="%s"' \
+            % export_filename(instance.dataset, instance.output, instance.is_gzip)
+        return response
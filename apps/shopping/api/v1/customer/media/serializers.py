@@ -0,0 +1,19 @@
+from django.db import models
+
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+
+class AttachmentFileField(serializers.FileField):
+    """Url of the protected media endpoint, file never exposed at MEDIA_URL"""
+    def to_representation(self, value):
+        if not value:
+            return None
+
+        request = self.context.get('request')
+        return reverse('shopping_api:customer:media', kwargs={'name': value.name}, request=request)
+
+
+class AttachmentModelSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = dict(serializers.ModelSerializer.serializer_field_mapping)
+    serializer_field_mapping[models.FileField] = AttachmentFileField
@@ -0,0 +1,51 @@
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from utils.generals import get_model
+from utils.sendfile import sendfile
+
+BasketAttachment = get_model('shopping', 'BasketAttachment')
+StuffAttachment = get_model('shopping', 'StuffAttachment')
+PurchasedStuffAttachment = get_model('shopping', 'PurchasedStuffAttachment')
+ProductAttachment = get_model('shopping', 'ProductAttachment')
+
+
+class AttachmentMediaApiView(APIView):
+    """
+    GET attachment file by storage name, eg; blobs/ab/cd/abcd...ef.jpg
+
+    Only creator basket or user basket shared to can download,
+    product attachment open for all authenticated user.
+    The transfer itself handled by front proxy (see utils.sendfile)
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def is_allowed(self, name):
+        user_id = self.request.user.id
+        file_query = Q(file=name) | Q(image=name)
+
+        if ProductAttachment.objects.filter(file_query).exists():
+            return True
+
+        checks = (
+            (BasketAttachment, 'basket'),
+            (StuffAttachment, 'stuff__basket'),
+            (PurchasedStuffAttachment, 'purchased__basket'),
+        )
+
+        for model, basket in checks:
+            owner_query = Q(**{'%s__user_id' % basket: user_id}) \
+                | Q(**{'%s__share__to_user_id' % basket: user_id})
+            if model.objects.filter(file_query, owner_query).exists():
+                return True
+        return False
+
+    # Cache-Control private set by sendfile, content addressed file never change
+    def get(self, request, name=None, format=None):
+        # Not found instead forbidden, don't leak which file exist
+        if not name or not self.is_allowed(name):
+            raise NotFound()
+        return sendfile(request._request, name)
@@ -1,23 +1,34 @@
+import datetime
+
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotAcceptable, ValidationError as ValidationErrorResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.decorators import action
 
 from utils.generals import get_model
 from utils.pagination import build_result_pagination
 from utils.mixin.viewsets import ViewSetDestroyObjMixin, ViewSetGetObjMixin
-from apps.shopping.utils.constants import ACCEPT, DONE, WAITING
+from apps.shopping.utils.constants import (
+    ACCEPT, DONE, WAITING,
+    SLOT_CAPACITY, SLOT_MINUTES, SLOT_AVAILABILITY_MAX_DAYS
+)
+from apps.shopping.utils.slots import day_slots
 from .serializers import OrderSerializer, OrderLineSerializer, OrderScheduleSerializer
 
 Order = get_model('shopping', 'Order')
 OrderSchedule = get_model('shopping', 'OrderSchedule')
 OrderLine = get_model('shopping', 'OrderLine')
+DeliverySlot = get_model('shopping', 'DeliverySlot')
 
 # Define to avoid used ...().paginate__
 _PAGINATOR = LimitOffsetPagination()
@@ -181,6 +192,44 @@ class OrderScheduleApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.
         serializer = OrderScheduleSerializer(queryset, many=False, context=context)
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
+    # Remaining capacity of every slot for next days
+    # ?days=7 (default 7, max SLOT_AVAILABILITY_MAX_DAYS)
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=False,
+            permission_classes=[IsAuthenticated],
+            url_path='availability', url_name='availability')
+    def availability(self, request):
+        try:
+            days = int(request.query_params.get('days', 7))
+        except ValueError:
+            raise NotAcceptable(detail=_("Jumlah hari tidak valid"))
+
+        days = max(1, min(days, SLOT_AVAILABILITY_MAX_DAYS))
+        first_date = timezone.localdate() + datetime.timedelta(days=1)
+        dates = [first_date + datetime.timedelta(days=x) for x in range(days)]
+        slots_by_date = [(x, day_slots(x)) for x in dates]
+
+        # One query for all days, slot without row still full capacity
+        slots = DeliverySlot.objects \
+            .filter(start_at__gte=slots_by_date[0][1][0], start_at__lte=slots_by_date[-1][1][-1]) \
+            .values_list('start_at', 'capacity', 'reserved')
+        existing = {x[0]: (x[1], x[2]) for x in slots}
+
+        results = []
+        for date, starts in slots_by_date:
+            items = []
+            for start_at in starts:
+                capacity, reserved = existing.get(start_at, (SLOT_CAPACITY, 0))
+                items.append({
+                    'start_at': start_at,
+                    'end_at': start_at + datetime.timedelta(minutes=SLOT_MINUTES),
+                    'capacity': capacity,
+                    'remaining': max(0, capacity - reserved),
+                })
+            results.append({'date': date, 'slots': items})
+
+        return Response(results, status=response_status.HTTP_200_OK)
+
     @transaction.atomic
     def partial_update(self, request, uuid=None):
         context = {'request': request}
@@ -8,7 +8,8 @@ from django.template.defaultfilters import slugify
 
 from rest_framework import serializers
 
-from utils.generals import get_model
+from utils.generals import get_model, quantity_format
+from utils.mixin.values import ValuesListSerializer
 from utils.mixin.api import (
     DynamicFieldsModelSerializer, 
     ExcludeFieldsModelSerializer, 
@@ -16,6 +17,7 @@ from utils.mixin.api import (
     WritetableFieldPutMethod
 )
 from utils.mixin.validators import CleanValidateMixin
+from ..media.serializers import AttachmentModelSerializer
 
 Purchased = get_model('shopping', 'Purchased')
 PurchasedStuff = get_model('shopping', 'PurchasedStuff')
@@ -74,7 +76,7 @@ class PurchasedSerializer(CleanValidateMixin, WritetableFieldPutMethod, DynamicF
         return instance
 
 
-class PurchasedStuffAttachmentSerializer(CleanValidateMixin, serializers.ModelSerializer):
+class PurchasedStuffAttachmentSerializer(CleanValidateMixin, AttachmentModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     purchased_stuff = serializers.SlugRelatedField(slug_field='uuid', queryset=PurchasedStuff.objects.all())
 
@@ -115,3 +117,26 @@ class PurchasedStuffSerializer(CleanValidateMixin, WritetableFieldPutMethod, Exc
         ret['quantity'] = instance.quantity_format
         ret['metric_display'] = instance.get_metric_display()
         return ret
+
+
+class PurchasedStuffValuesSerializer(ValuesListSerializer):
+    """PurchasedStuffSerializer output from values() row, for list"""
+    serializer_class = PurchasedStuffSerializer
+    computed_fields = {'is_creator': (['user'], 'get_is_creator')}
+    extra_values = ['quantity', 'metric']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metric_display = self.choices_display(PurchasedStuff, 'metric')
+
+    def get_is_creator(self, row):
+        request = self.context.get('request')
+        return request.user.id == row[self.prefix + 'user']
+
+    def extra_representation(self, ret, row):
+        quantity = row[self.prefix + 'quantity']
+        metric = row[self.prefix + 'metric']
+
+        ret['quantity'] = quantity_format(quantity) if quantity else quantity
+        ret['metric_display'] = self.metric_display.get(metric, metric)
+        return ret
@@ -5,6 +5,10 @@ from .basket.views import StuffApiView, BasketApiView, ShareApiView
 from .purchased.views import PurchasedApiView, PurchasedStuffApiView
 from .circle.views import CircleApiView
 from .order.views import OrderApiView, OrderLineApiView, OrderScheduleApiView
+from .upload.views import UploadSessionApiView
+from .media.views import AttachmentMediaApiView
+from .spending.views import SpendingApiView
+from .export.views import ExportApiView, ExportJobApiView
 
 # Create a router and register our viewsets with it.
 router = DefaultRouter(trailing_slash=True)
@@ -17,8 +21,13 @@ router.register('shares', ShareApiView, basename='share')
 router.register('orders', OrderApiView, basename='order')
 router.register('order-lines', OrderLineApiView, basename='order_line')
 router.register('order-schedules', OrderScheduleApiView, basename='order_schedule')
+router.register('upload-sessions', UploadSessionApiView, basename='upload_session')
+router.register('spendings', SpendingApiView, basename='spending')
+router.register('export-jobs', ExportJobApiView, basename='export_job')
 
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     path('', include(router.urls)),
+    path('media/<path:name>', AttachmentMediaApiView.as_view(), name='media'),
+    path('exports/<str:dataset>/', ExportApiView.as_view(), name='export'),
 ]
@@ -0,0 +1,108 @@
+import datetime
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.decorators import action
+
+from utils.generals import get_model
+from apps.shopping.utils.constants import (
+    SPENDING_MONTHS,
+    SPENDING_MAX_MONTHS,
+    SPENDING_TOP_LIMIT,
+    SPENDING_TOP_MAX_LIMIT
+)
+
+SpendingProduct = get_model('shopping', 'SpendingProduct')
+SpendingLocation = get_model('shopping', 'SpendingLocation')
+
+
+class SpendingApiView(viewsets.ViewSet):
+    """
+    Read from rollup table, never from purchased stuff
+
+    Param:
+
+        ?month=2021-05 (one month)
+        ?months=12 (last months include current, default SPENDING_MONTHS)
+        ?limit=10 (top items and top locations only)
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def period(self):
+        month = self.request.query_params.get('month')
+        if month:
+            try:
+                first = datetime.datetime.strptime(month, '%Y-%m').date()
+            except ValueError:
+                raise NotAcceptable(detail=_("Format bulan harus YYYY-MM"))
+            return first, first
+
+        try:
+            months = int(self.request.query_params.get('months', SPENDING_MONTHS))
+        except ValueError:
+            raise NotAcceptable(detail=_("Jumlah bulan tidak valid"))
+
+        months = max(1, min(months, SPENDING_MAX_MONTHS))
+        last = timezone.localdate().replace(day=1)
+        index = last.year * 12 + last.month - 1 - (months - 1)
+        return datetime.date(index // 12, index % 12 + 1, 1), last
+
+    def limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', SPENDING_TOP_LIMIT))
+        except ValueError:
+            raise NotAcceptable(detail=_("Limit tidak valid"))
+        return max(1, min(limit, SPENDING_TOP_MAX_LIMIT))
+
+    def queryset(self, model):
+        first, last = self.period()
+        return model.objects \
+            .filter(user_id=self.request.user.id, month__gte=first, month__lte=last) \
+            .order_by()
+
+    def top(self, model, column):
+        items = self.queryset(model) \
+            .values(column) \
+            .annotate(total_amount=Sum('amount'), total_count=Sum('count')) \
+            .order_by('-total_amount')[:self.limit()]
+
+        return [
+            {column: x[column], 'amount': x['total_amount'], 'count': x['total_count']}
+            for x in items
+        ]
+
+    # Spent per month
+    @method_decorator(never_cache)
+    def list(self, request, format=None):
+        months = self.queryset(SpendingProduct) \
+            .values('month') \
+            .annotate(total_amount=Sum('amount'), total_count=Sum('count')) \
+            .order_by('-month')
+
+        results = [
+            {'month': x['month'].strftime('%Y-%m'), 'amount': x['total_amount'], 'count': x['total_count']}
+            for x in months
+        ]
+        return Response(results, status=response_status.HTTP_200_OK)
+
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=False,
+            permission_classes=[IsAuthenticated],
+            url_path='products', url_name='products')
+    def products(self, request, format=None):
+        return Response(self.top(SpendingProduct, 'name'), status=response_status.HTTP_200_OK)
+
+    @method_decorator(never_cache)
+    @action(methods=['get'], detail=False,
+            permission_classes=[IsAuthenticated],
+            url_path='locations', url_name='locations')
+    def locations(self, request, format=None):
+        return Response(self.top(SpendingLocation, 'location'), status=response_status.HTTP_200_OK)
@@ -0,0 +1,59 @@
+import os
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import serializers
+
+from utils.generals import get_model
+from apps.shopping.utils.constants import UPLOAD_BASKET, UPLOAD_STUFF, UPLOAD_PURCHASED_STUFF
+from ..basket.serializers import BasketAttachmentSerializer, StuffAttachmentSerializer
+from ..purchased.serializers import PurchasedStuffAttachmentSerializer
+
+UploadSession = get_model('shopping', 'UploadSession')
+
+# Final attachment created by existing serializer, so permission
+# and file validation still same as single request upload
+ATTACHMENT_SERIALIZERS = {
+    UPLOAD_BASKET: (BasketAttachmentSerializer, 'basket'),
+    UPLOAD_STUFF: (StuffAttachmentSerializer, 'stuff'),
+    UPLOAD_PURCHASED_STUFF: (PurchasedStuffAttachmentSerializer, 'purchased_stuff'),
+}
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='shopping_api:customer:upload_session-detail',
+                                               lookup_field='uuid', read_only=True)
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    total_chunks = serializers.IntegerField(read_only=True)
+    expire_at = serializers.DateTimeField(read_only=True)
+    received_chunks = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        exclude = ('id',)
+        read_only_fields = ('status',)
+
+    def get_received_chunks(self, obj):
+        # Client only send chunk not in this list when resume
+        return list(obj.upload_chunk.values_list('index', flat=True))
+
+    def validate_filename(self, value):
+        name, ext = os.path.splitext(value)
+        if ext not in ('.jpeg', '.jpg', '.png'):
+            raise serializers.ValidationError(_("Jenis file tidak diperbolehkan"))
+        return value
+
+    def validate_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError(_("Ukuran file tidak valid"))
+
+        if value / 1000 > 5000:
+            raise serializers.ValidationError(_("Ukuran file maksimal 5 MB"))
+        return value
+
+    def validate_checksum(self, value):
+        if value:
+            value = value.lower()
+            if len(value) != 64:
+                raise serializers.ValidationError(_("Checksum harus SHA-256 hex"))
+        return value
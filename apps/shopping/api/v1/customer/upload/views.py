@@ -0,0 +1,175 @@
+import hashlib
+
+from django.db import transaction, IntegrityError
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.decorators import action
+
+from utils.generals import get_model
+from utils.mixin.viewsets import ViewSetDestroyObjMixin, ViewSetGetObjMixin
+from apps.shopping.utils.constants import UPLOAD_OPEN, UPLOAD_COMPLETE
+from .serializers import UploadSessionSerializer, ATTACHMENT_SERIALIZERS
+
+UploadSession = get_model('shopping', 'UploadSession')
+UploadChunk = get_model('shopping', 'UploadChunk')
+
+
+class UploadSessionApiView(ViewSetGetObjMixin, ViewSetDestroyObjMixin, viewsets.ViewSet):
+    """
+    Resumable upload for basket, stuff and purchased stuff attachment
+
+    1. POST create session
+
+        {
+            "target": "basket / stuff / purchased_stuff",
+            "target_uuid": "uuid4",
+            "name": "string",
+            "filename": "receipt.jpg",
+            "size": 1234567,
+            "checksum": "sha256 hex (optional)"
+        }
+
+    2. PUT chunks/<index>/ raw bytes with header X-Chunk-Checksum: sha256 hex
+    3. GET session to see received_chunks when resume
+    4. POST assemble/ create attachment
+    """
+    lookup_field = 'uuid'
+    permission_classes = (IsAuthenticated,)
+
+    def queryset(self):
+        query = UploadSession.objects \
+            .prefetch_related('user', 'upload_chunk') \
+            .select_related('user') \
+            .filter(user_id=self.request.user.id)
+
+        return query
+
+    def check_session_open(self, instance):
+        if instance.status != UPLOAD_OPEN:
+            raise NotAcceptable(detail=_("Upload sudah selesai"))
+
+        if instance.is_expired:
+            raise NotAcceptable(detail=_("Sesi upload kadaluarsa"))
+
+    def retrieve(self, request, uuid=None, format=None):
+        context = {'request': request}
+        queryset = self.get_object(uuid=uuid)
+        serializer = UploadSessionSerializer(queryset, many=False, context=context)
+        return Response(serializer.data, status=response_status.HTTP_200_OK)
+
+    @method_decorator(never_cache)
+    @transaction.atomic
+    def create(self, request, format=None):
+        context = {'request': request}
+        serializer = UploadSessionSerializer(data=request.data, many=False, context=context)
+        if serializer.is_valid(raise_exception=True):
+            try:
+                serializer.save()
+            except Exception as e:
+                raise NotAcceptable(detail=str(e))
+            return Response(serializer.data, status=response_status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=response_status.HTTP_403_FORBIDDEN)
+
+    # Receive one chunk, request body is raw bytes
+    @method_decorator(never_cache)
+    @transaction.atomic
+    @action(methods=['put'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='chunks/(?P<index>[0-9]+)',
+            url_name='chunk')
+    def chunk(self, request, uuid=None, index=None):
+        instance = self.get_object(uuid=uuid)
+        self.check_session_open(instance)
+
+        index = int(index)
+        if index >= instance.total_chunks:
+            raise NotAcceptable(detail=_("Chunk index diluar batas"))
+
+        # Chunk size fixed so body always small
+        content = request.body
+        if len(content) != instance.expected_chunk_size(index):
+            raise NotAcceptable(detail=_("Ukuran chunk harus {} byte".format(instance.expected_chunk_size(index))))
+
+        checksum = hashlib.sha256(content).hexdigest()
+        if checksum != request.META.get('HTTP_X_CHUNK_CHECKSUM', '').lower():
+            raise NotAcceptable(detail=_("Checksum chunk tidak sama"))
+
+        # Retry same chunk just replace the old one
+        path = instance.chunk_path(index)
+        default_storage.delete(path)
+        path = default_storage.save(path, ContentFile(content))
+
+        try:
+            with transaction.atomic():
+                UploadChunk.objects.update_or_create(
+                    upload_session=instance, index=index,
+                    defaults={'size': len(content), 'checksum': checksum, 'path': path}
+                )
+        except IntegrityError:
+            # Parallel retry for same index, the other one win
+            pass
+
+        return Response({
+            'index': index,
+            'received': instance.upload_chunk.count(),
+            'total_chunks': instance.total_chunks
+        }, status=response_status.HTTP_200_OK)
+
+    # Join all chunks then create attachment
+    @method_decorator(never_cache)
+    @transaction.atomic
+    @action(methods=['post'], detail=True,
+            permission_classes=[IsAuthenticated],
+            url_path='assemble',
+            url_name='assemble')
+    def assemble(self, request, uuid=None):
+        context = {'request': request}
+        instance = self.get_object(uuid=uuid, is_update=True)
+        self.check_session_open(instance)
+
+        received = list(instance.upload_chunk.values_list('index', flat=True))
+        if received != list(range(instance.total_chunks)):
+            missing = sorted(set(range(instance.total_chunks)) - set(received))
+            return Response({
+                'detail': _("Chunk belum lengkap"),
+                'missing_chunks': missing
+            }, status=response_status.HTTP_406_NOT_ACCEPTABLE)
+
+        file, checksum = instance.assemble()
+
+        try:
+            if instance.checksum and instance.checksum != checksum:
+                raise NotAcceptable(detail=_("Checksum file tidak sama"))
+
+            serializer_class, parent_field = ATTACHMENT_SERIALIZERS[instance.target]
+            data = {
+                parent_field: str(instance.target_uuid),
+                'name': instance.name,
+                'description': instance.description,
+                'image': file
+            }
+
+            serializer = serializer_class(data=data, context=context)
+            if serializer.is_valid(raise_exception=True):
+                try:
+                    attachment = serializer.save()
+                except ValidationError as e:
+                    return Response({'detail': _(u" ".join(e.messages))}, status=response_status.HTTP_406_NOT_ACCEPTABLE)
+        finally:
+            file.close()
+
+        instance.status = UPLOAD_COMPLETE
+        instance.attachment_uuid = attachment.uuid
+        instance.save(update_fields=['status', 'attachment_uuid'])
+        instance.delete_chunks()
+
+        return Response(serializer.data, status=response_status.HTTP_201_CREATED)
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import PaymentNotificationApiView
+
+urlpatterns = [
+    path('notifications/', PaymentNotificationApiView.as_view(), name='notification'),
+]
@@ -0,0 +1,59 @@
+import json
+
+from django.db import transaction, IntegrityError
+from django.utils.translation import gettext_lazy as _
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+
+from rest_framework import status as response_status
+from rest_framework.exceptions import NotAcceptable, PermissionDenied
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.generals import get_model
+from apps.shopping.tasks import process_payment_notifications
+
+PaymentNotification = get_model('shopping', 'PaymentNotification')
+
+
+class PaymentNotificationApiView(APIView):
+    """
+    Midtrans HTTP notification (webhook)
+
+    Only verify signature and store the raw payload then answer 200,
+    invoice updated later by worker. Duplicate or retried notification
+    answered 200 too so the gateway stop sending it.
+    """
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    @method_decorator(never_cache)
+    def post(self, request, format=None):
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            raise NotAcceptable(detail=_("Format notifikasi tidak valid"))
+
+        if not isinstance(payload, dict) or not PaymentNotification.verify_signature(payload):
+            raise PermissionDenied(detail=_("Signature tidak valid"))
+
+        order_id = str(payload['order_id'])
+
+        try:
+            with transaction.atomic():
+                PaymentNotification.objects.create(
+                    order_id=order_id,
+                    transaction_id=payload.get('transaction_id'),
+                    transaction_status=payload.get('transaction_status', ''),
+                    status_code=str(payload['status_code']),
+                    fraud_status=payload.get('fraud_status'),
+                    gross_amount=str(payload['gross_amount']),
+                    payload=payload
+                )
+                transaction.on_commit(lambda: process_payment_notifications.delay(order_id))
+        except IntegrityError:
+            # Already stored, nothing new to apply
+            pass
+
+        return Response({'detail': _("OK")}, status=response_status.HTTP_200_OK)
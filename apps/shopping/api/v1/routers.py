@@ -2,8 +2,12 @@ from django.urls import path, include
 
 from .customer import routers as customer_routers
 from .master import routers as master_routers
+from .assistant import routers as assistant_routers
+from .payment import routers as payment_routers
 
 urlpatterns = [
     path('customer/', include((customer_routers, 'customer'))),
     path('master/', include((master_routers, 'master'))),
+    path('assistant/', include((assistant_routers, 'assistant'))),
+    path('payment/', include((payment_routers, 'payment'))),
 ]
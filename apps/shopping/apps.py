@@ -13,18 +13,37 @@ class ShoppingConfig(AppConfig):
             purchased_stuff_save_handler, 
             share_delete_handler,
             purchased_stuff_delete_handler,
+            product_save_handler,
+            basket_habit_handler,
+            spending_save_handler,
+            spending_delete_handler,
             order_save_handler,
             order_delete_handler,
+            order_schedule_delete_handler,
             order_line_save_handler,
-            assign_save_handler
+            assign_save_handler,
+            assign_log_handler,
+            order_line_log_handler,
+            attachment_pre_save_handler,
+            attachment_save_handler,
+            attachment_delete_handler
         )
 
+        Product = get_model('shopping', 'Product')
+        Basket = get_model('shopping', 'Basket')
         Purchased = get_model('shopping', 'Purchased')
         PurchasedStuff = get_model('shopping', 'PurchasedStuff')
         Share = get_model('shopping', 'Share')
         Order = get_model('shopping', 'Order')
+        OrderSchedule = get_model('shopping', 'OrderSchedule')
         OrderLine = get_model('shopping', 'OrderLine')
         Assign = get_model('shopping', 'Assign')
+        attachments = [
+            get_model('shopping', 'BasketAttachment'),
+            get_model('shopping', 'StuffAttachment'),
+            get_model('shopping', 'PurchasedStuffAttachment'),
+            get_model('shopping', 'ProductAttachment'),
+        ]
 
         post_save.connect(purchased_save_handler, sender=Purchased,
                           dispatch_uid='purchased_save_signal')
@@ -37,6 +56,26 @@ class ShoppingConfig(AppConfig):
         post_save.connect(assign_save_handler, sender=Assign,
                           dispatch_uid='assign_save_signal')
 
+        # Column change of assign written to AssignLog by worker
+        post_save.connect(assign_log_handler, sender=Assign,
+                          dispatch_uid='assign_log_signal')
+        post_save.connect(order_line_log_handler, sender=OrderLine,
+                          dispatch_uid='order_line_log_signal')
+
+        # Trigram index of product name for deduplication
+        post_save.connect(product_save_handler, sender=Product,
+                          dispatch_uid='product_save_signal')
+
+        # Purchase habit of basket owner, for next basket suggestion
+        post_save.connect(basket_habit_handler, sender=Basket,
+                          dispatch_uid='basket_habit_signal')
+
+        # Spending rollup per user, month, item and location
+        post_save.connect(spending_save_handler, sender=PurchasedStuff,
+                          dispatch_uid='spending_save_signal')
+        post_delete.connect(spending_delete_handler, sender=PurchasedStuff,
+                            dispatch_uid='spending_delete_signal')
+
         post_delete.connect(share_delete_handler, sender=Share,
                             dispatch_uid='share_delete_signal')
         post_delete.connect(purchased_stuff_delete_handler, sender=PurchasedStuff,
@@ -45,3 +84,15 @@ class ShoppingConfig(AppConfig):
                             dispatch_uid='order_delete_signal')
         post_delete.connect(purchased_delete_handler, sender=Purchased,
                             dispatch_uid='purchased_delete_signal')
+        post_delete.connect(order_schedule_delete_handler, sender=OrderSchedule,
+                            dispatch_uid='order_schedule_delete_signal')
+
+        # Content addressed file reference count
+        for attachment in attachments:
+            name = attachment._meta.model_name
+            pre_save.connect(attachment_pre_save_handler, sender=attachment,
+                             dispatch_uid='%s_pre_save_signal' % name)
+            post_save.connect(attachment_save_handler, sender=attachment,
+                              dispatch_uid='%s_save_signal' % name)
+            post_delete.connect(attachment_delete_handler, sender=attachment,
+                                dispatch_uid='%s_delete_signal' % name)
@@ -1,6 +1,17 @@
 import json
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from utils.generals import get_model
+from apps.shopping.utils.constants import LIVE_LOCATION_INTERVAL
+from apps.shopping.utils.tracking import live_location_group, get_live_location
+
+Assign = get_model('shopping', 'Assign')
+
 
 class BasketConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -49,3 +60,75 @@ class BasketConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps({
             'entry': entry
         }))
+
+
+class AssignLocationConsumer(AsyncWebsocketConsumer):
+    """
+    Live position of assistant while assign is ongoing, read only.
+    Only newest position kept for each subscriber and sent at most
+    once every `interval` second, so slow client never get a backlog
+    """
+    interval = LIVE_LOCATION_INTERVAL
+
+    @database_sync_to_async
+    def get_assign(self, assign_uuid, user):
+        return Assign.objects \
+            .filter(Q(customer_id=user.id) | Q(assistant_id=user.id)) \
+            .filter(uuid=assign_uuid, is_ongoing=True) \
+            .only('id', 'uuid') \
+            .first()
+
+    async def get_last_location(self, assign_uuid):
+        return await sync_to_async(get_live_location)(assign_uuid)
+
+    async def connect(self):
+        self.assign_uuid = self.scope['url_route']['kwargs']['assign_uuid']
+        self.assign_group = live_location_group(self.assign_uuid)
+        self.latest = None
+        self.has_latest = asyncio.Event()
+        self.sender = None
+
+        user = self.scope.get('user')
+        if user is None or user.is_anonymous or not await self.get_assign(self.assign_uuid, user):
+            # Reject the connection
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(self.assign_group, self.channel_name)
+        await self.accept()
+        self.sender = asyncio.ensure_future(self.send_latest())
+
+        # Last known point so map not empty until next update
+        location = await self.get_last_location(self.assign_uuid)
+        if location:
+            self.set_latest(location)
+
+    async def disconnect(self, close_code):
+        if self.sender is not None:
+            self.sender.cancel()
+
+        await self.channel_layer.group_discard(self.assign_group, self.channel_name)
+
+    # Subscriber not allowed to send anything
+    async def receive(self, text_data=None, bytes_data=None):
+        pass
+
+    def set_latest(self, location):
+        # Replace position not sent yet
+        if self.latest is None or location['recorded_at'] >= self.latest['recorded_at']:
+            self.latest = location
+            self.has_latest.set()
+
+    async def send_latest(self):
+        while True:
+            await self.has_latest.wait()
+            self.has_latest.clear()
+            location, self.latest = self.latest, None
+
+            if location:
+                await self.send(text_data=json.dumps({'location': location}))
+                await asyncio.sleep(self.interval)
+
+    # Receive position from group
+    async def assign_location_handler(self, event):
+        self.set_latest(event['location'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.shopping.utils.habit import count_pending_baskets
+
+
+class Command(BaseCommand):
+	help = "Count completed baskets not yet in product habit, oldest first"
+
+	def handle(self, *args, **kwargs):
+		total = count_pending_baskets()
+		print("Count %s baskets." % total)
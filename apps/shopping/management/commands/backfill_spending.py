@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from utils.generals import get_model
+from apps.shopping.utils.spending import rebuild_spending
+
+User = get_model('person', 'User')
+
+
+class Command(BaseCommand):
+	help = "Rebuild spending rollup from purchased stuff history, some users at a time"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--chunk', type=int, default=200,
+							help="Number of users rebuilt in one transaction")
+
+	def handle(self, *args, **kwargs):
+		chunk = kwargs['chunk']
+		last_id, users, rows = 0, 0, 0
+
+		while True:
+			user_ids = list(User.objects.filter(id__gt=last_id).order_by('id')
+							.values_list('id', flat=True)[:chunk])
+			if not user_ids:
+				break
+
+			rows += rebuild_spending(user_ids)
+			users += len(user_ids)
+			last_id = user_ids[-1]
+			print("Rebuild %s users, %s rows." % (users, rows))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from utils.generals import get_model
+from utils.renderers import ORJSONRenderer
+from apps.shopping.api.v1.customer.basket.views import BasketApiView, StuffApiView
+
+User = get_model('person', 'User')
+
+ENDPOINTS = [
+	('baskets', BasketApiView, 'shopping_api:customer:basket-list'),
+	('stuffs', StuffApiView, 'shopping_api:customer:stuff-list'),
+]
+
+
+def measure(renderer, data, repeat):
+	started = time.perf_counter()
+	for _ in range(repeat):
+		content = renderer.render(data)
+	return (time.perf_counter() - started) / repeat * 1000, len(content)
+
+
+class Command(BaseCommand):
+	help = "Time rendering of list endpoint response, stdlib json against orjson"
+
+	def add_arguments(self, parser):
+		parser.add_argument('user', help="Username or uuid, list rendered as this user")
+		parser.add_argument('--limit', type=int, default=100)
+		parser.add_argument('--repeat', type=int, default=50)
+
+	def handle(self, *args, **kwargs):
+		user = User.objects.filter(Q(username=kwargs['user']) | Q(uuid__iexact=kwargs['user'])).first()
+		if user is None:
+			raise CommandError("User %s not found" % kwargs['user'])
+
+		factory = APIRequestFactory()
+		print("%-18s %6s %10s %10s %10s %8s" % ('endpoint', 'rows', 'bytes', 'json ms', 'orjson ms', 'speedup'))
+
+		for name, viewset, url_name in ENDPOINTS:
+			request = factory.get(reverse(url_name), {'limit': kwargs['limit']})
+			force_authenticate(request, user=user)
+			response = viewset.as_view({'get': 'list'})(request)
+			if response.status_code != 200:
+				print("%-18s failed %s" % (name, response.status_code))
+				continue
+
+			before, size = measure(JSONRenderer(), response.data, kwargs['repeat'])
+			after, _size = measure(ORJSONRenderer(), response.data, kwargs['repeat'])
+			print("%-18s %6s %10s %10.2f %10.2f %7.1fx" % (name, len(response.data.get('results', [])),
+														   size, before, after, before / after))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from utils.generals import get_model
+from utils.renderers import ORJSONRenderer
+from apps.shopping.utils.pricing import estimate_baskets
+from apps.shopping.api.v1.customer.basket.views import BasketApiView, StuffApiView
+from apps.shopping.api.v1.customer.basket.serializers import (
+	BasketSerializer,
+	BasketValuesSerializer,
+	StuffSerializer,
+	StuffValuesSerializer
+)
+
+User = get_model('person', 'User')
+
+# name, view, serializer, values serializer, kwargs, queryset as in list
+ENDPOINTS = [
+	('baskets', BasketApiView, BasketSerializer, BasketValuesSerializer,
+	 {'exclude_fields': ['share', 'purchased', 'stuff', 'order']},
+	 lambda view: view.queryset().order_by('sorted', '-create_at')),
+	('stuffs', StuffApiView, StuffSerializer, StuffValuesSerializer,
+	 {'exclude_fields': ['basket']},
+	 lambda view: view.queryset()),
+]
+
+
+def measure(func, repeat):
+	started = time.perf_counter()
+	for _ in range(repeat):
+		data = func()
+	return (time.perf_counter() - started) / repeat * 1000, data
+
+
+class Command(BaseCommand):
+	help = "Time list page query and serialize, model serializer against values() plan"
+
+	def add_arguments(self, parser):
+		parser.add_argument('user', help="Username or uuid, list serialized as this user")
+		parser.add_argument('--limit', type=int, default=100)
+		parser.add_argument('--repeat', type=int, default=20)
+
+	def handle(self, *args, **kwargs):
+		user = User.objects.filter(Q(username=kwargs['user']) | Q(uuid__iexact=kwargs['user'])).first()
+		if user is None:
+			raise CommandError("User %s not found" % kwargs['user'])
+
+		request = Request(APIRequestFactory().get('/'))
+		request.user = user
+		context = {'request': request}
+		limit = kwargs['limit']
+		renderer = ORJSONRenderer()
+
+		print("%-10s %6s %14s %12s %8s %6s" % ('endpoint', 'rows', 'serializer ms', 'values ms', 'speedup', 'same'))
+
+		for name, viewset, serializer_class, values_class, serializer_kwargs, get_queryset in ENDPOINTS:
+			view = viewset()
+			view.request = request
+			queryset = get_queryset(view)
+
+			def serialize():
+				instances = list(queryset[:limit])
+				if serializer_class is BasketSerializer:
+					estimate_baskets(instances)
+				return serializer_class(instances, many=True, context=context, **serializer_kwargs).data
+
+			def render_values():
+				serializer = values_class(context=context, **serializer_kwargs)
+				serializer.instance = list(serializer.values(queryset)[:limit])
+				return serializer.data
+
+			before, data = measure(serialize, kwargs['repeat'])
+			after, values_data = measure(render_values, kwargs['repeat'])
+			same = renderer.render(data) == renderer.render(values_data)
+			print("%-10s %6s %14.2f %12.2f %7.1fx %6s" % (name, len(data), before, after,
+													   before / after, 'yes' if same else 'NO'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.shopping.utils.recommendation import build_recommendations
+
+
+class Command(BaseCommand):
+	help = "Count product bought together in completed basket, write related product"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--full', action='store_true',
+							help="Count every completed basket again from zero")
+
+	def handle(self, *args, **kwargs):
+		total = build_recommendations(full=kwargs['full'])
+		if total is None:
+			print("Other build in progress.")
+		else:
+			print("Write %s relations." % total)
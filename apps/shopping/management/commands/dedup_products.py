@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from utils.generals import get_model
+from utils.trigram import normalize
+from apps.shopping.utils.canonical import index_products, find_duplicates, merge_products
+from apps.shopping.utils.constants import PRODUCT_MERGE_THRESHOLD, PRODUCT_MERGE_BATCH_SIZE
+
+Product = get_model('shopping', 'Product')
+
+
+class Command(BaseCommand):
+	help = "Merge near duplicate products (by name trigram) to one canonical product, " \
+		   "print for review unless --apply"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--threshold', type=float, default=PRODUCT_MERGE_THRESHOLD)
+		parser.add_argument('--batch', type=int, default=PRODUCT_MERGE_BATCH_SIZE,
+							help="Rows re-pointed in one transaction")
+		parser.add_argument('--apply', action='store_true',
+							help="Merge printed clusters, without it only printed for review")
+		parser.add_argument('--reindex', action='store_true',
+							help="Fill normalized name and trigram index first")
+
+	def handle(self, *args, **kwargs):
+		if kwargs['reindex']:
+			self.reindex(kwargs['batch'])
+
+		clusters = find_duplicates(threshold=kwargs['threshold'])
+		names = dict(Product.objects.filter(id__in=[x for c in clusters for x in [c[0], *c[1]]])
+					 .values_list('id', 'name'))
+
+		moved = 0
+		for canonical_id, duplicate_ids in clusters:
+			print("%s <- %s" % (names.get(canonical_id), ', '.join(names.get(x, '') for x in duplicate_ids)))
+			if kwargs['apply']:
+				moved += merge_products(canonical_id, duplicate_ids, batch_size=kwargs['batch'])
+
+		print("Merge %s products to %s, move %s rows." % (
+			sum(len(x[1]) for x in clusters), len(clusters), moved))
+
+	def reindex(self, batch):
+		last_id = 0
+		while True:
+			products = list(Product.objects.filter(id__gt=last_id).order_by('id')[:batch])
+			if not products:
+				break
+
+			for product in products:
+				product.normalized_name = normalize(product.name)[:255]
+			Product.objects.bulk_update(products, ['normalized_name'])
+			index_products(products)
+
+			last_id = products[-1].id
+			print("Index up to product %s." % last_id)
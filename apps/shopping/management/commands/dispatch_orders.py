@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.shopping.utils.dispatch import dispatch_orders
+
+
+class Command(BaseCommand):
+	help = "Match waiting orders to assistants now, same as periodic dispatch task"
+
+	def handle(self, *args, **kwargs):
+		count = dispatch_orders()
+		print("Create %s assign." % count)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.shopping.utils.pricing import refresh_prices
+
+
+class Command(BaseCommand):
+	help = "Merge product rate into expected product price"
+
+	def add_arguments(self, parser):
+		parser.add_argument('--full', action='store_true',
+							help="Recompute from whole rate history")
+
+	def handle(self, *args, **kwargs):
+		total = refresh_prices(full=kwargs['full'])
+		if total is None:
+			print("Other refresh in progress.")
+		else:
+			print("Merge %s rates." % total)
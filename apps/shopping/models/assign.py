@@ -2,10 +2,15 @@ import uuid
 from decimal import Decimal
 
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
+from utils.geo import geohash_encode, geohash_cover
 from utils.validators import non_python_keyword, identifier_validator
+from ..utils.constants import TRACKING_GEOHASH_PRECISION
+from ..utils.audit import ASSIGN_LOG_FIELDS, loaded_values
 
 
 class AbstractAssign(models.Model):
@@ -42,6 +47,13 @@ class AbstractAssign(models.Model):
 
     def __str__(self):
         return self.order.number
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # original value for AssignLog diff
+        instance._loaded_values = loaded_values(instance, ASSIGN_LOG_FIELDS)
+        return instance
     
     def save(self, *args, **kwargs):
         self.basket = self.order.basket
@@ -51,6 +63,18 @@ class AbstractAssign(models.Model):
         super().save(*args, **kwargs)
 
 
+class AssignTrackingQuerySet(models.query.QuerySet):
+    def within(self, south, west, north, east):
+        """Point inside bounding box, geohash prefix narrow it first by index"""
+        prefixes = Q()
+        for prefix in geohash_cover(south, west, north, east):
+            prefixes |= Q(geohash__startswith=prefix)
+
+        return self.filter(prefixes) \
+            .filter(latitude__gte=south, latitude__lte=north,
+                    longitude__gte=west, longitude__lte=east)
+
+
 class AbstractAssignTracking(models.Model):
     """ 
     Ketika assistant mulai belanja, record pertama digunakan sebagai
@@ -64,10 +88,14 @@ class AbstractAssignTracking(models.Model):
                                related_name='assign', db_index=True)
 
     location = models.TextField(null=True, blank=True)
-    latitude = models.DecimalField(max_digits=9, decimal_places=6, default=Decimal(0.0),
-                                   db_index=True)
-    longitude = models.DecimalField(max_digits=9, decimal_places=6, default=Decimal(0.0),
-                                    db_index=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, default=Decimal(0.0))
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, default=Decimal(0.0))
+    # bounding box search by prefix, see AssignTrackingQuerySet.within
+    geohash = models.CharField(max_length=12, null=True, blank=True, db_index=True)
+    # time on device, points from one batch inserted at same create_at
+    recorded_at = models.DateTimeField(null=True, blank=True)
+
+    objects = AssignTrackingQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -75,9 +103,18 @@ class AbstractAssignTracking(models.Model):
         ordering = ['-create_at']
         verbose_name = _("Assign Tracking")
         verbose_name_plural = _("Assign Trackings")
+        indexes = [
+            models.Index(fields=['assign', 'recorded_at'], name='assign_tracking_recorded_idx'),
+        ]
 
     def __str__(self):
-        return self.location
+        return self.location or self.geohash or ''
+
+    def save(self, *args, **kwargs):
+        if not self.geohash and self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(float(self.latitude), float(self.longitude),
+                                          TRACKING_GEOHASH_PRECISION)
+        super().save(*args, **kwargs)
 
 
 class AbstractAssignLog(models.Model):
@@ -89,7 +126,8 @@ class AbstractAssignLog(models.Model):
     )
 
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
-    create_at = models.DateTimeField(auto_now_add=True, null=True)
+    # time of the change, rows written later in batch by worker
+    create_at = models.DateTimeField(default=timezone.now, editable=False, null=True)
     update_at = models.DateTimeField(auto_now=True, null=True)
 
     actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
@@ -109,6 +147,9 @@ class AbstractAssignLog(models.Model):
         ordering = ['-create_at']
         verbose_name = _("Assign Log")
         verbose_name_plural = _("Assign Logs")
+        indexes = [
+            models.Index(fields=['assign', '-create_at', '-id'], name='assign_log_page_idx'),
+        ]
 
     def __str__(self):
         return self.new_value
@@ -10,6 +10,7 @@ from ..utils.constants import METRIC_CHOICES, GENERAL_STATUS, WAITING
 from utils.validators import non_python_keyword, identifier_validator
 from utils.generals import quantity_format
 from utils.mixin.generals import ModelDiffMixin
+from utils.files import content_addressed_storage
 
 
 class AbstractBasket(ModelDiffMixin, models.Model):
@@ -114,9 +115,9 @@ class AbstractBasketAttachment(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     file = models.FileField(upload_to='files/basket-attachment/', max_length=500,
-                            null=True, blank=True)
+                            storage=content_addressed_storage, null=True, blank=True)
     image = models.FileField(upload_to='images/basket-attachment/', max_length=500,
-                             null=True, blank=True)
+                             storage=content_addressed_storage, null=True, blank=True)
     mime = models.CharField(max_length=225, editable=False, null=True, blank=True)
 
     class Meta:
@@ -363,9 +364,9 @@ class AbstractStuffAttachment(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     file = models.FileField(upload_to='files/stuff-attachment/', max_length=500,
-                            null=True, blank=True)
+                            storage=content_addressed_storage, null=True, blank=True)
     image = models.FileField(upload_to='images/stuff-attachment/', max_length=500,
-                             null=True, blank=True)
+                             storage=content_addressed_storage, null=True, blank=True)
     mime = models.CharField(max_length=225)
     sort = models.IntegerField(default=1)
 
@@ -0,0 +1,59 @@
+import uuid
+
+from django.db import models, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from utils.files import BLOB_DIR
+
+
+class BlobQuerySet(models.query.QuerySet):
+    def acquire(self, name):
+        """One more attachment point to this file"""
+        if not name or not name.startswith(BLOB_DIR):
+            return
+
+        updated = self.filter(path=name).update(ref_count=F('ref_count') + 1,
+                                                update_at=timezone.now())
+        if not updated:
+            try:
+                with transaction.atomic():
+                    self.create(path=name, checksum=name.split('/')[-1].split('.')[0],
+                                ref_count=1)
+            except IntegrityError:
+                self.filter(path=name).update(ref_count=F('ref_count') + 1,
+                                              update_at=timezone.now())
+
+    def release(self, name):
+        if not name or not name.startswith(BLOB_DIR):
+            return
+
+        self.filter(path=name).update(ref_count=F('ref_count') - 1,
+                                      update_at=timezone.now())
+
+
+class AbstractBlob(models.Model):
+    """
+    File stored once by content hash, ref_count is number of attachment
+    use it. Blob with zero reference removed by collect_orphan_blobs task
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    path = models.CharField(max_length=500, unique=True)
+    checksum = models.CharField(max_length=64, db_index=True)
+    ref_count = models.IntegerField(default=0, db_index=True)
+
+    objects = BlobQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-create_at']
+        verbose_name = _("Blob")
+        verbose_name_plural = _("Blobs")
+
+    def __str__(self):
+        return self.path
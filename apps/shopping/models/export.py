@@ -0,0 +1,65 @@
+import uuid
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from apps.shopping.utils.constants import (
+    EXPORT_DATASET_CHOICES,
+    EXPORT_OUTPUT_CHOICES,
+    EXPORT_CSV,
+    EXPORT_STATUS,
+    EXPORT_PENDING,
+    EXPORT_EXPIRE_HOURS
+)
+
+
+class AbstractExportJob(models.Model):
+    """
+    Large history export written to file by worker,
+    downloaded later when status done
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    # Who request, owner is whose history (differ when staff export for user)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='export_job')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                              related_name='export_job_owner')
+
+    dataset = models.CharField(choices=EXPORT_DATASET_CHOICES, max_length=255)
+    output = models.CharField(choices=EXPORT_OUTPUT_CHOICES, default=EXPORT_CSV, max_length=255)
+    is_gzip = models.BooleanField(default=False)
+    status = models.CharField(choices=EXPORT_STATUS, default=EXPORT_PENDING, max_length=255,
+                              db_index=True)
+    file = models.FileField(upload_to='exports/', max_length=500, null=True, blank=True,
+                            editable=False)
+    size = models.BigIntegerField(default=0, editable=False)
+    complete_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-create_at']
+        verbose_name = _("Export Job")
+        verbose_name_plural = _("Export Jobs")
+
+    def __str__(self):
+        return '{} {}'.format(self.dataset, self.owner)
+
+    @property
+    def expire_at(self):
+        return self.create_at + datetime.timedelta(hours=EXPORT_EXPIRE_HOURS)
+
+    @property
+    def is_expired(self):
+        return timezone.now() >= self.expire_at
+
+    def delete(self, *args, **kwargs):
+        if self.file:
+            self.file.delete(save=False)
+        super().delete(*args, **kwargs)
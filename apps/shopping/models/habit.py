@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+from apps.shopping.utils.constants import METRIC_CHOICES, PIECE
+
+
+class AbstractProductHabit(models.Model):
+    """
+    How often a user buy a product, from their completed basket.
+    Interval is moving average of time between purchase, updated
+    one basket at a time by worker so never computed from history
+    """
+    update_at = models.DateTimeField(auto_now=True)
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='product_habit')
+    product = models.ForeignKey('shopping.Product', on_delete=models.CASCADE,
+                                related_name='product_habit')
+
+    # Last stuff bought, used as is when seeding new basket
+    name = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=15, decimal_places=5, default=1)
+    metric = models.CharField(max_length=15, choices=METRIC_CHOICES, default=PIECE)
+
+    count = models.IntegerField(default=0)
+    last_at = models.DateTimeField()
+    # in second, null until bought twice
+    interval = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-last_at']
+        verbose_name = _("Product Habit")
+        verbose_name_plural = _("Product Habits")
+        unique_together = ('user', 'product',)
+
+    def __str__(self):
+        return self.name
+
+
+class AbstractProductHabitBasket(models.Model):
+    """Basket already counted in ProductHabit, claimed before counting"""
+    create_at = models.DateTimeField(auto_now_add=True)
+    basket = models.OneToOneField('shopping.Basket', on_delete=models.CASCADE,
+                                  related_name='product_habit_basket')
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        verbose_name = _("Product Habit Basket")
+        verbose_name_plural = _("Product Habit Baskets")
+
+    def __str__(self):
+        return str(self.basket_id)
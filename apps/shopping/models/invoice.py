@@ -3,10 +3,10 @@ import uuid
 from django.db import models
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
-from django.utils import timezone
 
 from ..utils.constants import INVOICE_STATUS, SENT, METRIC_CHOICES
-from utils.generals import quantity_format, random_string
+from ..utils.numbering import invoice_number
+from utils.generals import quantity_format
 from utils.validators import non_python_keyword, identifier_validator
 
 
@@ -38,11 +38,7 @@ class AbstractInvoice(models.Model):
         self.assistant = self.order.assistant
 
         if not self.pk:
-            rand = random_string(8)
-            now = timezone.datetime.now()
-            timestamp = timezone.datetime.timestamp(now)
-            number = 'INV{}{}'.format(rand, int(timestamp))
-            self.number = number
+            self.number = invoice_number()
 
         super().save(*args, **kwargs)
 
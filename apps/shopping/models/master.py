@@ -8,7 +8,9 @@ from django.utils.translation import ugettext_lazy as _
 
 from ..utils.constants import METRIC_CHOICES
 from utils.generals import quantity_format
+from utils.trigram import normalize
 from utils.validators import non_python_keyword, identifier_validator
+from utils.files import content_addressed_storage
 
 
 class AbstractCategory(models.Model):
@@ -59,7 +61,12 @@ class AbstractProduct(models.Model):
     category = models.ForeignKey('shopping.Category', on_delete=models.SET_NULL,
                                  related_name='product', null=True, blank=True)
 
+    # Merged duplicate point to the product used instead
+    canonical = models.ForeignKey('self', on_delete=models.SET_NULL,
+                                  related_name='duplicate', null=True, blank=True)
+
     name = models.CharField(max_length=255, unique=True)
+    normalized_name = models.CharField(max_length=255, db_index=True, blank=True, editable=False)
     description = models.TextField(null=True, blank=True)
     is_enabled = models.BooleanField(default=True)
     is_catalog = models.BooleanField(default=False, db_index=True)
@@ -74,6 +81,64 @@ class AbstractProduct(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize(self.name)[:255]
+        super().save(*args, **kwargs)
+
+
+class AbstractProductTrigram(models.Model):
+    """
+    Inverted index of canonical product name,
+    candidate duplicate found by shared trigram
+    """
+    product = models.ForeignKey('shopping.Product', on_delete=models.CASCADE,
+                                related_name='product_trigram')
+    trigram = models.CharField(max_length=3, db_index=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        verbose_name = _("Product Trigram")
+        verbose_name_plural = _("Product Trigrams")
+        unique_together = ('product', 'trigram',)
+
+    def __str__(self):
+        return self.trigram
+
+
+class AbstractProductRelation(models.Model):
+    """
+    Product frequently bought together, best first by rank.
+    Rebuilt from completed basket by `build_recommendations`
+    """
+    product = models.ForeignKey('shopping.Product', on_delete=models.CASCADE,
+                                related_name='product_relation')
+    related = models.ForeignKey('shopping.Product', on_delete=models.CASCADE,
+                                related_name='related_relation')
+
+    # lift, how much more often bought together than by chance
+    score = models.FloatField(default=0)
+    # number of basket containing both
+    support = models.IntegerField(default=0)
+    rank = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['product', 'rank']
+        verbose_name = _("Product Relation")
+        verbose_name_plural = _("Product Relations")
+        unique_together = ('product', 'related',)
+
+    def __str__(self):
+        return '{} - {}'.format(self.product_id, self.related_id)
+
 
 class AbstractProductMetric(models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -150,6 +215,38 @@ class AbstractProductRate(models.Model):
         return super().save(*args, **kwargs)
 
 
+class AbstractProductPrice(models.Model):
+    """
+    Expected price per unit of product and metric, exponentially weighted
+    so recent ProductRate count more. Empty location is all location.
+    Sums kept as seen from rated_at so new rate merged without history
+    """
+    update_at = models.DateTimeField(auto_now=True)
+
+    product = models.ForeignKey('shopping.Product', on_delete=models.CASCADE,
+                                related_name='product_price')
+    metric = models.CharField(max_length=15, choices=METRIC_CHOICES)
+    location = models.CharField(max_length=255, blank=True, default='')
+
+    price = models.BigIntegerField(default=0)
+    value_sum = models.FloatField(default=0)
+    weight_sum = models.FloatField(default=0)
+    rated_at = models.DateTimeField()
+    count = models.IntegerField(default=0)
+    # update time of newest ProductRate merged, next refresh start after it
+    last_rate_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        verbose_name = _("Product Price")
+        verbose_name_plural = _("Product Prices")
+        unique_together = ('product', 'metric', 'location',)
+
+    def __str__(self):
+        return str(self.price)
+
+
 class AbstractProductAttachment(models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     create_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -161,9 +258,9 @@ class AbstractProductAttachment(models.Model):
     name = models.CharField(max_length=255, null=True, blank=True)
     description = models.TextField(null=True, blank=True)
     file = models.FileField(upload_to='files/product-attachment/', max_length=500,
-                            null=True, blank=True)
+                            storage=content_addressed_storage, null=True, blank=True)
     image = models.FileField(upload_to='images/product-attachment/', max_length=500,
-                             null=True, blank=True)
+                             storage=content_addressed_storage, null=True, blank=True)
     mime = models.CharField(max_length=225, editable=False)
     sort = models.IntegerField(default=1)
 
@@ -6,6 +6,15 @@ from .order import *
 from .invoice import *
 from .assign import *
 from .shipping import *
+from .upload import *
+from .blob import *
+from .payment import *
+from .sequence import *
+from .route import *
+from .slot import *
+from .spending import *
+from .export import *
+from .habit import *
 
 from utils.generals import is_model_registered
 
@@ -262,3 +271,138 @@ if not is_model_registered('shopping', 'AssignLog'):
             db_table = 'shopping_assign_log'
 
     __all__.append('AssignLog')
+
+
+# 29
+if not is_model_registered('shopping', 'UploadSession'):
+    class UploadSession(AbstractUploadSession):
+        class Meta(AbstractUploadSession.Meta):
+            db_table = 'shopping_upload_session'
+
+    __all__.append('UploadSession')
+
+
+# 30
+if not is_model_registered('shopping', 'UploadChunk'):
+    class UploadChunk(AbstractUploadChunk):
+        class Meta(AbstractUploadChunk.Meta):
+            db_table = 'shopping_upload_chunk'
+
+    __all__.append('UploadChunk')
+
+
+# 31
+if not is_model_registered('shopping', 'Blob'):
+    class Blob(AbstractBlob):
+        class Meta(AbstractBlob.Meta):
+            db_table = 'shopping_blob'
+
+    __all__.append('Blob')
+
+
+# 32
+if not is_model_registered('shopping', 'PaymentNotification'):
+    class PaymentNotification(AbstractPaymentNotification):
+        class Meta(AbstractPaymentNotification.Meta):
+            db_table = 'shopping_payment_notification'
+
+    __all__.append('PaymentNotification')
+
+
+# 33
+if not is_model_registered('shopping', 'NumberSequence'):
+    class NumberSequence(AbstractNumberSequence):
+        class Meta(AbstractNumberSequence.Meta):
+            db_table = 'shopping_number_sequence'
+
+    __all__.append('NumberSequence')
+
+
+# 34
+if not is_model_registered('shopping', 'DeliveryRoute'):
+    class DeliveryRoute(AbstractDeliveryRoute):
+        class Meta(AbstractDeliveryRoute.Meta):
+            db_table = 'shopping_delivery_route'
+
+    __all__.append('DeliveryRoute')
+
+
+# 35
+if not is_model_registered('shopping', 'DeliverySlot'):
+    class DeliverySlot(AbstractDeliverySlot):
+        class Meta(AbstractDeliverySlot.Meta):
+            db_table = 'shopping_delivery_slot'
+
+    __all__.append('DeliverySlot')
+
+
+# 36
+if not is_model_registered('shopping', 'SpendingProduct'):
+    class SpendingProduct(AbstractSpendingProduct):
+        class Meta(AbstractSpendingProduct.Meta):
+            db_table = 'shopping_spending_product'
+
+    __all__.append('SpendingProduct')
+
+
+# 37
+if not is_model_registered('shopping', 'SpendingLocation'):
+    class SpendingLocation(AbstractSpendingLocation):
+        class Meta(AbstractSpendingLocation.Meta):
+            db_table = 'shopping_spending_location'
+
+    __all__.append('SpendingLocation')
+
+
+# 38
+if not is_model_registered('shopping', 'ExportJob'):
+    class ExportJob(AbstractExportJob):
+        class Meta(AbstractExportJob.Meta):
+            db_table = 'shopping_export_job'
+
+    __all__.append('ExportJob')
+
+
+# 39
+if not is_model_registered('shopping', 'ProductTrigram'):
+    class ProductTrigram(AbstractProductTrigram):
+        class Meta(AbstractProductTrigram.Meta):
+            db_table = 'shopping_product_trigram'
+
+    __all__.append('ProductTrigram')
+
+
+# 40
+if not is_model_registered('shopping', 'ProductRelation'):
+    class ProductRelation(AbstractProductRelation):
+        class Meta(AbstractProductRelation.Meta):
+            db_table = 'shopping_product_relation'
+
+    __all__.append('ProductRelation')
+
+
+# 41
+if not is_model_registered('shopping', 'ProductHabit'):
+    class ProductHabit(AbstractProductHabit):
+        class Meta(AbstractProductHabit.Meta):
+            db_table = 'shopping_product_habit'
+
+    __all__.append('ProductHabit')
+
+
+# 42
+if not is_model_registered('shopping', 'ProductHabitBasket'):
+    class ProductHabitBasket(AbstractProductHabitBasket):
+        class Meta(AbstractProductHabitBasket.Meta):
+            db_table = 'shopping_product_habit_basket'
+
+    __all__.append('ProductHabitBasket')
+
+
+# 43
+if not is_model_registered('shopping', 'ProductPrice'):
+    class ProductPrice(AbstractProductPrice):
+        class Meta(AbstractProductPrice.Meta):
+            db_table = 'shopping_product_price'
+
+    __all__.append('ProductPrice')
@@ -2,14 +2,17 @@ import uuid
 from decimal import Decimal
 from datetime import timedelta
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 from ..utils.constants import NOMINAL, WAITING, GENERAL_STATUS, METRIC_CHOICES
-from utils.generals import quantity_format, random_string
+from ..utils.numbering import order_number
+from ..utils.slots import slot_start, is_open_slot
+from ..utils.audit import ORDER_LINE_LOG_FIELDS, loaded_values
+from utils.generals import quantity_format
 from utils.validators import non_python_keyword, identifier_validator
 
 
@@ -64,11 +67,7 @@ class AbstractOrder(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.pk:
-            rand = random_string(8)
-            now = timezone.datetime.now()
-            timestamp = timezone.datetime.timestamp(now)
-            number = '{}{}'.format(rand, int(timestamp))
-            self.number = number
+            self.number = order_number()
 
         # customer always creator of basket
         self.customer = self.basket.user
@@ -100,11 +99,41 @@ class AbstractOrderSchedule(models.Model):
     def __str__(self):
         return str(self.datetime)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def clean(self, *args, **kwargs):
         if self.datetime.date() < timezone.now().date() + timedelta(days=1):
             raise ValidationError(_("Tanggal tidak tersedia"))
+
+        if not is_open_slot(slot_start(self.datetime)):
+            raise ValidationError(_("Jam tidak tersedia"))
         return super().clean()
 
+    @transaction.atomic
+    def save(self, *args, **kwargs):
+        DeliverySlot = self._meta.apps.get_model('shopping', 'DeliverySlot')
+
+        old_datetime = None
+        if not self._state.adding:
+            old_datetime = getattr(self, '_loaded_values', {}).get('datetime')
+
+        # Slot released by post delete signal
+        new_slot = slot_start(self.datetime)
+        old_slot = slot_start(old_datetime) if old_datetime else None
+        if new_slot != old_slot:
+            if not DeliverySlot.objects.reserve(new_slot):
+                raise ValidationError(_("Jadwal pengiriman penuh, pilih jam lain"))
+
+            if old_slot:
+                DeliverySlot.objects.release(old_slot)
+
+        super().save(*args, **kwargs)
+        self._loaded_values = {'datetime': self.datetime}
+
 
 class AbstractOrderLine(models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -140,6 +169,13 @@ class AbstractOrderLine(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # original value for AssignLog diff
+        instance._loaded_values = loaded_values(instance, ORDER_LINE_LOG_FIELDS)
+        return instance
+
     @property
     def quantity_format(self):
         if self.quantity:
@@ -200,6 +236,12 @@ class AbstractOrderDelivery(models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6, default=Decimal(0.0),
                                     db_index=True, null=True, blank=True)
 
+    # filled by route planner, see apps.shopping.utils.routing
+    delivery_route = models.ForeignKey('shopping.DeliveryRoute', on_delete=models.SET_NULL,
+                                       null=True, blank=True, related_name='order_delivery')
+    route_sequence = models.PositiveSmallIntegerField(null=True, blank=True)
+    route_eta = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         abstract = True
         app_label = 'shopping'
@@ -0,0 +1,71 @@
+import uuid
+import hashlib
+
+from django.db import models
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import ugettext_lazy as _
+
+
+class PaymentNotificationQuerySet(models.query.QuerySet):
+    def pending(self):
+        return self.filter(is_processed=False)
+
+
+class AbstractPaymentNotification(models.Model):
+    """
+    Raw notification from Midtrans, append only. Gateway send same
+    notification many times, one row per (order_id, transaction_status, status_code)
+    and applied to invoice once by process_payment_notifications task
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    order_id = models.CharField(max_length=255, db_index=True)
+    transaction_id = models.CharField(max_length=255, null=True, blank=True)
+    transaction_status = models.CharField(max_length=255)
+    status_code = models.CharField(max_length=15)
+    fraud_status = models.CharField(max_length=255, null=True, blank=True)
+    gross_amount = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+
+    is_processed = models.BooleanField(default=False, db_index=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PaymentNotificationQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-create_at']
+        verbose_name = _("Payment Notification")
+        verbose_name_plural = _("Payment Notifications")
+        constraints = [
+            models.UniqueConstraint(fields=['order_id', 'transaction_status', 'status_code'],
+                                    name='unique_payment_notification')
+        ]
+
+    def __str__(self):
+        return '{} {}'.format(self.order_id, self.transaction_status)
+
+    @staticmethod
+    def signature(order_id, status_code, gross_amount, server_key=None):
+        """SHA512(order_id + status_code + gross_amount + server_key)"""
+        server_key = server_key or settings.MIDTRANS_SERVER_KEY
+        value = '{}{}{}{}'.format(order_id, status_code, gross_amount, server_key)
+        return hashlib.sha512(value.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def verify_signature(cls, payload, server_key=None):
+        # Without key anyone can compute the signature, reject all
+        server_key = server_key or settings.MIDTRANS_SERVER_KEY
+        if not server_key:
+            return False
+
+        try:
+            expected = cls.signature(payload['order_id'], payload['status_code'],
+                                     payload['gross_amount'], server_key=server_key)
+        except KeyError:
+            return False
+        return constant_time_compare(expected, str(payload.get('signature_key', '')))
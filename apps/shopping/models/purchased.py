@@ -9,6 +9,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from ..utils.constants import METRIC_CHOICES, NOMINAL
 from utils.validators import non_python_keyword, identifier_validator
+from utils.files import content_addressed_storage
 
 
 class AbstractPurchased(models.Model):
@@ -256,9 +257,9 @@ class AbstractPurchasedStuffAttachment(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True, blank=True)
     file = models.FileField(upload_to='files/purchased-stuff-attachment/', max_length=500,
-                            null=True, blank=True)
+                            storage=content_addressed_storage, null=True, blank=True)
     image = models.FileField(upload_to='images/purchased-stuff-attachment/', max_length=500,
-                             null=True, blank=True)
+                             storage=content_addressed_storage, null=True, blank=True)
     mime = models.CharField(max_length=225)
     sort = models.IntegerField(default=1)
 
@@ -0,0 +1,36 @@
+import uuid
+
+from django.db import models
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+
+
+class AbstractDeliveryRoute(models.Model):
+    """
+    Deliveries of one courier in one schedule window, stop order
+    and ETA saved in OrderDelivery.route_sequence and route_eta
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    courier = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                related_name='delivery_route')
+
+    start_at = models.DateTimeField(db_index=True)
+    distance = models.IntegerField(default=0, help_text=_("In meter"))
+    duration = models.IntegerField(default=0, help_text=_("In second"))
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-start_at']
+        verbose_name = _("Delivery Route")
+        verbose_name_plural = _("Delivery Routes")
+        constraints = [
+            models.UniqueConstraint(fields=['courier', 'start_at'],
+                                    name='unique_delivery_route_window')
+        ]
+
+    def __str__(self):
+        return '{} {}'.format(self.courier, self.start_at)
@@ -0,0 +1,43 @@
+from django.db import models, IntegrityError, transaction
+from django.db.models import F
+from django.utils.translation import ugettext_lazy as _
+
+
+class NumberSequenceQuerySet(models.query.QuerySet):
+    def lease(self, name, size):
+        """Reserve `size` numbers, return the first one"""
+        with transaction.atomic():
+            updated = self.filter(name=name).update(value=F('value') + size)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        self.create(name=name, value=size)
+                except IntegrityError:
+                    self.filter(name=name).update(value=F('value') + size)
+
+            # Row locked by update until commit
+            value = self.filter(name=name).values_list('value', flat=True).get()
+            return value - size + 1
+
+
+class AbstractNumberSequence(models.Model):
+    """
+    Last number leased for order, invoice, etc.
+    Read by block, see utils.sequence.BlockSequence
+    """
+    update_at = models.DateTimeField(auto_now=True)
+
+    name = models.CharField(max_length=255, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    objects = NumberSequenceQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['name']
+        verbose_name = _("Number Sequence")
+        verbose_name_plural = _("Number Sequences")
+
+    def __str__(self):
+        return self.name
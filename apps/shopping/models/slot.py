@@ -0,0 +1,66 @@
+import uuid
+
+from django.db import models, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from ..utils.constants import SLOT_CAPACITY
+
+
+class DeliverySlotQuerySet(models.query.QuerySet):
+    def reserve(self, start_at):
+        """
+        Take one place in slot, False when full.
+        Conditional update lock only the slot row, checkout
+        for other slot never wait each other
+        """
+        updated = self.filter(start_at=start_at, reserved__lt=F('capacity')) \
+            .update(reserved=F('reserved') + 1, update_at=timezone.now())
+        if updated:
+            return True
+
+        if self.filter(start_at=start_at).exists():
+            return False
+
+        # First order in this slot
+        try:
+            with transaction.atomic():
+                self.create(start_at=start_at, capacity=SLOT_CAPACITY, reserved=1)
+            return True
+        except IntegrityError:
+            return self.reserve(start_at)
+
+    def release(self, start_at):
+        self.filter(start_at=start_at, reserved__gt=0) \
+            .update(reserved=F('reserved') - 1, update_at=timezone.now())
+
+
+class AbstractDeliverySlot(models.Model):
+    """
+    Capacity of one schedule slot, row created when first order
+    reserve it, capacity changed by staff for busy day
+    """
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    start_at = models.DateTimeField(unique=True)
+    capacity = models.IntegerField(default=SLOT_CAPACITY)
+    reserved = models.IntegerField(default=0)
+
+    objects = DeliverySlotQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['start_at']
+        verbose_name = _("Delivery Slot")
+        verbose_name_plural = _("Delivery Slots")
+
+    def __str__(self):
+        return str(self.start_at)
+
+    @property
+    def remaining(self):
+        return max(0, self.capacity - self.reserved)
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.db import models, IntegrityError, transaction
+from django.db.models import F
+from django.utils.translation import ugettext_lazy as _
+
+
+class SpendingQuerySet(models.query.QuerySet):
+    def add(self, amount, count=1, defaults=None, **key):
+        """
+        Add to rollup row of key, row created with defaults when missing.
+        Negative amount and count used to take back old contribution
+        """
+        updated = self.filter(**key) \
+            .update(amount=F('amount') + amount, count=F('count') + count)
+        if updated or (amount <= 0 and count <= 0):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(amount=amount, count=count, **key, **(defaults or {}))
+        except IntegrityError:
+            self.add(amount, count=count, defaults=defaults, **key)
+
+
+class AbstractSpendingProduct(models.Model):
+    """
+    Found purchased stuff summed per basket owner, month and item name.
+    Kept up to date by purchased stuff signal, rebuilt by `backfill_spending`
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='spending_product')
+    product = models.ForeignKey('shopping.Product', on_delete=models.SET_NULL,
+                                related_name='spending_product', null=True, blank=True)
+
+    month = models.DateField()
+    name = models.CharField(max_length=255)
+    amount = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    objects = SpendingQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-month', '-amount']
+        verbose_name = _("Spending Product")
+        verbose_name_plural = _("Spending Products")
+        unique_together = ('user', 'month', 'name',)
+        indexes = [
+            models.Index(fields=['user', 'month', 'amount']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class AbstractSpendingLocation(models.Model):
+    """Same as SpendingProduct but per shop location"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='spending_location')
+
+    month = models.DateField()
+    location = models.CharField(max_length=255)
+    amount = models.BigIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    objects = SpendingQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-month', '-amount']
+        verbose_name = _("Spending Location")
+        verbose_name_plural = _("Spending Locations")
+        unique_together = ('user', 'month', 'location',)
+        indexes = [
+            models.Index(fields=['user', 'month', 'amount']),
+        ]
+
+    def __str__(self):
+        return self.location
@@ -0,0 +1,131 @@
+import os
+import math
+import uuid
+import hashlib
+import datetime
+
+from django.db import models
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from apps.shopping.utils.constants import (
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SESSION_EXPIRE_HOURS,
+    UPLOAD_TARGET_CHOICES,
+    UPLOAD_STATUS,
+    UPLOAD_OPEN
+)
+
+
+class AbstractUploadSession(models.Model):
+    """
+    Resumable upload, client send file in fixed size chunk
+    then assemble it to attachment when all chunk received
+    """
+    _UPLOAD_TO = 'uploads'
+
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    update_at = models.DateTimeField(auto_now=True)
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='upload_session')
+
+    target = models.CharField(choices=UPLOAD_TARGET_CHOICES, max_length=255)
+    target_uuid = models.UUIDField()
+    name = models.CharField(max_length=255)
+    description = models.TextField(null=True, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.IntegerField(default=UPLOAD_CHUNK_SIZE, editable=False)
+    checksum = models.CharField(max_length=64, null=True, blank=True,
+                                help_text=_("SHA-256 hex of full file"))
+    status = models.CharField(choices=UPLOAD_STATUS, default=UPLOAD_OPEN, max_length=255,
+                              db_index=True)
+    attachment_uuid = models.UUIDField(null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['-create_at']
+        verbose_name = _("Upload Session")
+        verbose_name_plural = _("Upload Sessions")
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def total_chunks(self):
+        return max(1, math.ceil(self.size / self.chunk_size))
+
+    @property
+    def expire_at(self):
+        return self.create_at + datetime.timedelta(hours=UPLOAD_SESSION_EXPIRE_HOURS)
+
+    @property
+    def is_expired(self):
+        return self.expire_at < timezone.now()
+
+    def chunk_path(self, index):
+        return os.path.join(self._UPLOAD_TO, str(self.uuid), '%06d.part' % index)
+
+    def expected_chunk_size(self, index):
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.total_chunks - 1)
+
+    def delete_chunks(self):
+        for chunk in self.upload_chunk.all():
+            default_storage.delete(chunk.path)
+        self.upload_chunk.all().delete()
+
+    def assemble(self):
+        """
+        Join chunks in order to temporary file on disk, return file and SHA-256.
+        Copy by small block so the full file never held in memory.
+        """
+        digest = hashlib.sha256()
+        file = TemporaryUploadedFile(self.filename, None, self.size, None)
+
+        for chunk in self.upload_chunk.order_by('index'):
+            with default_storage.open(chunk.path, 'rb') as part:
+                for block in iter(lambda: part.read(64 * 1024), b''):
+                    digest.update(block)
+                    file.write(block)
+
+        file.seek(0)
+        return file, digest.hexdigest()
+
+    def delete(self, *args, **kwargs):
+        kwargs.pop('request', None)
+        self.delete_chunks()
+        return super().delete(*args, **kwargs)
+
+
+class AbstractUploadChunk(models.Model):
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    upload_session = models.ForeignKey('shopping.UploadSession', on_delete=models.CASCADE,
+                                       related_name='upload_chunk')
+
+    index = models.IntegerField()
+    size = models.IntegerField()
+    checksum = models.CharField(max_length=64)
+    path = models.CharField(max_length=500)
+
+    class Meta:
+        abstract = True
+        app_label = 'shopping'
+        ordering = ['index']
+        verbose_name = _("Upload Chunk")
+        verbose_name_plural = _("Upload Chunks")
+        constraints = [
+            models.UniqueConstraint(fields=['upload_session', 'index'],
+                                    name='unique_upload_chunk_index')
+        ]
+
+    def __str__(self):
+        return str(self.index)
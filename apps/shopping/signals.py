@@ -1,12 +1,27 @@
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
 from utils.generals import get_model
+from apps.shopping.utils.slots import slot_start
+from apps.shopping.utils.audit import (
+    ASSIGN_LOG_FIELDS,
+    ORDER_LINE_LOG_FIELDS,
+    diff_entries,
+    enqueue_entries
+)
+from apps.shopping.utils.spending import update_spending
+from apps.shopping.utils.canonical import index_products
+from apps.shopping.tasks import count_habit_basket
 
 Purchased = get_model('shopping', 'Purchased')
 PurchasedStuff = get_model('shopping', 'PurchasedStuff')
 Product = get_model('shopping', 'Product')
 ProductRate = get_model('shopping', 'ProductRate')
 OrderLine = get_model('shopping', 'OrderLine')
+Blob = get_model('shopping', 'Blob')
+DeliverySlot = get_model('shopping', 'DeliverySlot')
+Assign = get_model('shopping', 'Assign')
+
+ATTACHMENT_FILE_FIELDS = ['file', 'image']
 
 
 @transaction.atomic
@@ -28,6 +43,22 @@ def stuff_save_handler(sender, instance, created, **kwargs):
             .get_or_create(name=instance.name, defaults={'user': instance.user})
 
 
+def product_save_handler(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if created or loaded.get('normalized_name') != instance.normalized_name \
+            or loaded.get('canonical_id') != instance.canonical_id:
+        index_products([instance])
+        instance._loaded_values = dict(loaded, normalized_name=instance.normalized_name,
+                                       canonical_id=instance.canonical_id)
+
+
+def basket_habit_handler(sender, instance, created, **kwargs):
+    # Counted by worker after commit, claim inside make repeat harmless
+    if instance.is_complete and (created or instance.get_field_diff('is_complete')):
+        basket_id = instance.id
+        transaction.on_commit(lambda: count_habit_basket.delay(basket_id))
+
+
 @transaction.atomic
 def purchased_save_handler(sender, instance, created, **kwargs):
     if created:
@@ -95,6 +126,16 @@ def purchased_stuff_delete_handler(sender, instance, using, **kwargs):
         instance.stuff.delete()
 
 
+@transaction.atomic
+def spending_save_handler(sender, instance, created, **kwargs):
+    update_spending(instance, created=created)
+
+
+@transaction.atomic
+def spending_delete_handler(sender, instance, using, **kwargs):
+    update_spending(instance, deleted=True)
+
+
 @transaction.atomic
 def order_save_handler(sender, instance, created, **kwargs):
     if created:
@@ -128,6 +169,12 @@ def order_delete_handler(sender, instance, using, **kwargs):
     basket.save()
 
 
+@transaction.atomic
+def order_schedule_delete_handler(sender, instance, using, **kwargs):
+    # Give back the place in delivery slot
+    DeliverySlot.objects.release(slot_start(instance.datetime))
+
+
 @transaction.atomic
 def order_line_save_handler(sender, instance, created, **kwargs):
     if not created:
@@ -178,3 +225,60 @@ def assign_save_handler(sender, instance, created, **kwargs):
     # update basket status
     instance.order.basket.is_complete = instance.is_complete
     instance.order.basket.save()
+
+
+def assign_log_handler(sender, instance, created, **kwargs):
+    # Actor set by admin or view, otherwise the assistant
+    actor = getattr(instance, 'log_actor', None)
+    actor_id = actor.id if actor else instance.assistant_id or instance.customer_id
+
+    entries = diff_entries(instance, ASSIGN_LOG_FIELDS, instance.id, actor_id, created=created)
+    enqueue_entries(entries)
+
+
+def order_line_log_handler(sender, instance, created, **kwargs):
+    entries = diff_entries(instance, ORDER_LINE_LOG_FIELDS, None, None,
+                           prefix='order_line.%s' % instance.uuid, created=created)
+    if not entries:
+        return
+
+    # Only line of assigned order logged
+    assign = Assign.objects.filter(order_id=instance.order_id) \
+        .values_list('id', 'assistant_id', 'customer_id') \
+        .first()
+    if assign is None:
+        return
+
+    actor = getattr(instance, 'log_actor', None)
+    for entry in entries:
+        entry['assign_id'] = assign[0]
+        entry['actor_id'] = actor.id if actor else assign[1] or assign[2]
+    enqueue_entries(entries)
+
+
+def attachment_pre_save_handler(sender, instance, **kwargs):
+    # Remember old file names, blob reference moved in post save
+    instance._blob_old_names = dict()
+    if instance.pk:
+        old = sender.objects.filter(pk=instance.pk).values(*ATTACHMENT_FILE_FIELDS).first()
+        if old:
+            instance._blob_old_names = old
+
+
+@transaction.atomic
+def attachment_save_handler(sender, instance, created, **kwargs):
+    old_names = getattr(instance, '_blob_old_names', dict())
+
+    for field in ATTACHMENT_FILE_FIELDS:
+        old_name = old_names.get(field) or None
+        new_name = getattr(instance, field).name or None
+
+        if old_name != new_name:
+            Blob.objects.acquire(new_name)
+            Blob.objects.release(old_name)
+
+
+@transaction.atomic
+def attachment_delete_handler(sender, instance, using, **kwargs):
+    for field in ATTACHMENT_FILE_FIELDS:
+        Blob.objects.release(getattr(instance, field).name)
@@ -0,0 +1,266 @@
+import logging
+import datetime
+import itertools
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+# Celery config
+from celery import shared_task
+
+from utils.generals import get_model
+from utils.files import content_addressed_storage
+from apps.shopping.utils.tracking import pending_assigns, flush_points
+from apps.shopping.utils.dispatch import dispatch_orders
+from apps.shopping.utils.routing import plan_routes
+from apps.shopping.utils.audit import flush_entries
+from apps.shopping.utils.export import write_export_job
+from apps.shopping.utils.recommendation import build_recommendations
+from apps.shopping.utils.habit import count_basket, count_pending_baskets
+from apps.shopping.utils.pricing import refresh_prices
+from apps.shopping.utils.constants import (
+    UPLOAD_SESSION_EXPIRE_HOURS,
+    BLOB_TMP_EXPIRE_HOURS,
+    EXPORT_PENDING,
+    EXPORT_FAILED,
+    EXPORT_EXPIRE_HOURS,
+    PAYMENT_TRANSITIONS,
+    PAYMENT_NOTIFICATION_MAX_AGE_HOURS,
+    INVOICE_STATUS_RANK
+)
+
+
+@shared_task
+def clean_upload_sessions():
+    logging.info(_(u"Clean expired upload sessions run"))
+
+    UploadSession = get_model('shopping', 'UploadSession')
+    expired_at = timezone.now() - datetime.timedelta(hours=UPLOAD_SESSION_EXPIRE_HOURS)
+    queryset = UploadSession.objects.filter(create_at__lt=expired_at)
+
+    for instance in queryset.iterator():
+        instance.delete()
+
+
+@shared_task
+def collect_orphan_blobs():
+    logging.info(_(u"Collect orphan blobs run"))
+
+    Blob = get_model('shopping', 'Blob')
+    attachments = [
+        get_model('shopping', 'BasketAttachment'),
+        get_model('shopping', 'StuffAttachment'),
+        get_model('shopping', 'PurchasedStuffAttachment'),
+        get_model('shopping', 'ProductAttachment'),
+    ]
+
+    # Grace time so file just written but not yet referenced stay
+    released_at = timezone.now() - datetime.timedelta(hours=1)
+    paths = Blob.objects.filter(ref_count__lte=0, update_at__lt=released_at) \
+        .values_list('path', flat=True)
+
+    for path in list(paths.iterator()):
+        with transaction.atomic():
+            blob = Blob.objects.select_for_update().filter(path=path, ref_count__lte=0).first()
+            if blob is None:
+                continue
+
+            # Counter can drift from bulk queries, make sure nothing use it
+            if any(x.objects.filter(Q(file=path) | Q(image=path)).exists() for x in attachments):
+                continue
+
+            # Same content saved again meanwhile, about to be referenced
+            if content_addressed_storage.exists(path) \
+                    and content_addressed_storage.get_modified_time(path) >= released_at:
+                continue
+
+            content_addressed_storage.delete(path)
+            blob.delete()
+
+    # Written file of attachment save rolled back never get a row
+    names = content_addressed_storage.blob_names()
+    while True:
+        chunk = list(itertools.islice(names, 1000))
+        if not chunk:
+            break
+
+        known = set(Blob.objects.filter(path__in=chunk).values_list('path', flat=True))
+        for path in chunk:
+            if path in known:
+                continue
+
+            try:
+                # Saved again (file replaced) or too fresh to be referenced yet
+                if content_addressed_storage.get_modified_time(path) >= released_at:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            if any(x.objects.filter(Q(file=path) | Q(image=path)).exists() for x in attachments):
+                continue
+
+            content_addressed_storage.delete(path)
+
+    tmp_at = timezone.now() - datetime.timedelta(hours=BLOB_TMP_EXPIRE_HOURS)
+    content_addressed_storage.clean_tmp(tmp_at)
+
+
+@shared_task
+def process_payment_notifications(order_id):
+    """
+    Apply stored notification of one order to its invoice, oldest first.
+    Invoice row locked so parallel worker for same order wait here,
+    notification marked processed in same transaction so applied once.
+    """
+    Invoice = get_model('shopping', 'Invoice')
+    PaymentNotification = get_model('shopping', 'PaymentNotification')
+
+    with transaction.atomic():
+        invoice = Invoice.objects.select_for_update() \
+            .filter(Q(number=order_id) | Q(order__number=order_id)) \
+            .first()
+
+        notifications = PaymentNotification.objects.pending() \
+            .select_for_update() \
+            .filter(order_id=order_id) \
+            .order_by('create_at', 'id')
+
+        # Invoice not committed yet, notification kept pending and retried
+        if invoice is None:
+            logging.warning(_(u"Invoice %s not found for payment notification"), order_id)
+            return
+
+        status = invoice.status
+        for notification in notifications:
+            transition = PAYMENT_TRANSITIONS.get(notification.transaction_status)
+
+            # Captured card still in fraud review is not paid yet
+            if notification.transaction_status == 'capture' and notification.fraud_status == 'challenge':
+                transition = PAYMENT_TRANSITIONS.get('pending')
+
+            if transition and transition[1] > INVOICE_STATUS_RANK.get(status, 0):
+                status = transition[0]
+
+            notification.is_processed = True
+            notification.processed_at = timezone.now()
+            notification.save(update_fields=['is_processed', 'processed_at', 'update_at'])
+
+        if status != invoice.status:
+            Invoice.objects.filter(id=invoice.id).update(status=status, update_at=timezone.now())
+
+
+@shared_task
+def process_pending_payment_notifications():
+    """Pick notification missed by the webhook, eg. broker down when received"""
+    logging.info(_(u"Process pending payment notifications run"))
+
+    PaymentNotification = get_model('shopping', 'PaymentNotification')
+    now = timezone.now()
+    queued_at = now - datetime.timedelta(minutes=5)
+    # Older one has no invoice to wait for, left pending for manual check
+    expired_at = now - datetime.timedelta(hours=PAYMENT_NOTIFICATION_MAX_AGE_HOURS)
+    order_ids = PaymentNotification.objects.pending() \
+        .filter(create_at__lt=queued_at, create_at__gte=expired_at) \
+        .values_list('order_id', flat=True) \
+        .distinct()
+
+    for order_id in list(order_ids):
+        process_payment_notifications.delay(order_id)
+
+
+@shared_task
+def flush_assign_tracking(assign_id):
+    flush_points(assign_id)
+
+
+@shared_task
+def flush_assign_trackings():
+    """Buffered GPS point of all active assign to database"""
+    for assign_id in pending_assigns():
+        try:
+            flush_points(assign_id)
+        except Exception as e:
+            logging.exception(_(u"Flush assign tracking %s failed: %s"), assign_id, e)
+
+
+@shared_task
+def dispatch_waiting_orders():
+    logging.info(_(u"Dispatch waiting orders run"))
+    dispatch_orders()
+
+
+@shared_task
+def plan_delivery_routes():
+    logging.info(_(u"Plan delivery routes run"))
+    plan_routes()
+
+
+@shared_task
+def flush_assign_logs():
+    flush_entries()
+
+
+@shared_task
+def export_history(job_id):
+    ExportJob = get_model('shopping', 'ExportJob')
+    job = ExportJob.objects.filter(id=job_id, status=EXPORT_PENDING).first()
+    if job is None:
+        return
+
+    try:
+        write_export_job(job)
+    except Exception as e:
+        logging.exception(_(u"Export job %s failed: %s"), job.uuid, e)
+        ExportJob.objects.filter(id=job.id).update(status=EXPORT_FAILED, update_at=timezone.now())
+
+
+@shared_task
+def clean_export_jobs():
+    logging.info(_(u"Clean expired export jobs run"))
+
+    ExportJob = get_model('shopping', 'ExportJob')
+    expired_at = timezone.now() - datetime.timedelta(hours=EXPORT_EXPIRE_HOURS)
+    queryset = ExportJob.objects.filter(create_at__lt=expired_at)
+
+    for instance in queryset.iterator():
+        instance.delete()
+
+
+@shared_task
+def update_recommendations():
+    """Count basket completed since last run"""
+    logging.info(_(u"Update recommendations run"))
+    build_recommendations()
+
+
+@shared_task
+def rebuild_recommendations():
+    logging.info(_(u"Rebuild recommendations run"))
+    build_recommendations(full=True)
+
+
+@shared_task
+def count_habit_basket(basket_id):
+    count_basket(basket_id)
+
+
+@shared_task
+def count_habit_baskets():
+    """Completed basket missed by signal, eg. broker down when completed"""
+    logging.info(_(u"Count habit baskets run"))
+    count_pending_baskets()
+
+
+@shared_task
+def update_product_prices():
+    """Merge product rate changed since last run"""
+    logging.info(_(u"Update product prices run"))
+    refresh_prices()
+
+
+@shared_task
+def rebuild_product_prices():
+    logging.info(_(u"Rebuild product prices run"))
+    refresh_prices(full=True)
@@ -1,3 +1,500 @@
-from django.test import TestCase
+import io
+import json
+import gzip
+import uuid
+import random
+import asyncio
+import datetime
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+from django.utils.translation import gettext_lazy
+
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from utils.generals import get_model
+from utils.sequence import BlockSequence, autonomous
+from utils.generals import LazyEncoder
+from utils.renderers import ORJSONRenderer, ORJSONParser
+from apps.shopping.consumers import AssignLocationConsumer
+from apps.shopping.tasks import process_payment_notifications
+from apps.shopping.utils.tracking import live_location_group
+from apps.shopping.utils.dispatch import match
+from apps.shopping.utils.audit import (
+    ASSIGN_LOG_FIELDS,
+    ORDER_LINE_LOG_FIELDS,
+    diff_entries,
+    loaded_values
+)
+from apps.shopping.utils.spending import contribution, rollup_changes
+from apps.shopping.utils.export import render_csv, render_ndjson, gzip_chunks
+from apps.shopping.utils.importer import parse_line, parse_csv, parse_quantity
+from apps.shopping.utils.habit import next_habit, habit_score
+from apps.shopping.api.v1.customer.basket.views import BasketApiView
+from apps.shopping.api.v1.customer.basket.serializers import (
+    BasketSerializer,
+    BasketValuesSerializer,
+    StuffSerializer,
+    StuffValuesSerializer
+)
+from apps.shopping.utils.pricing import estimate_baskets
+
+PaymentNotification = get_model('shopping', 'PaymentNotification')
+NumberSequence = get_model('shopping', 'NumberSequence')
+DeliverySlot = get_model('shopping', 'DeliverySlot')
+Assign = get_model('shopping', 'Assign')
+OrderLine = get_model('shopping', 'OrderLine')
+User = get_model('person', 'User')
+Basket = get_model('shopping', 'Basket')
+Order = get_model('shopping', 'Order')
+Product = get_model('shopping', 'Product')
+Stuff = get_model('shopping', 'Stuff')
+PurchasedStuff = get_model('shopping', 'PurchasedStuff')
+
 
 # Create your tests here.
+@override_settings(MIDTRANS_SERVER_KEY='server-key')
+class PaymentNotificationTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse('shopping_v1:payment:notification')
+        self.payload = {
+            'order_id': 'INV0001',
+            'transaction_id': 'abc',
+            'transaction_status': 'settlement',
+            'status_code': '200',
+            'gross_amount': '25000.00',
+        }
+        self.payload['signature_key'] = PaymentNotification.signature(
+            'INV0001', '200', '25000.00')
+
+    def post(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_duplicate_stored_once(self):
+        self.assertEqual(self.post(self.payload).status_code, 200)
+        self.assertEqual(self.post(self.payload).status_code, 200)
+        self.assertEqual(PaymentNotification.objects.filter(order_id='INV0001').count(), 1)
+
+    def test_invalid_signature(self):
+        payload = dict(self.payload, gross_amount='1.00')
+        self.assertEqual(self.post(payload).status_code, 403)
+        self.assertFalse(PaymentNotification.objects.exists())
+
+    def test_kept_pending_without_invoice(self):
+        self.assertEqual(self.post(self.payload).status_code, 200)
+        process_payment_notifications('INV0001')
+        self.assertTrue(PaymentNotification.objects.pending().filter(order_id='INV0001').exists())
+
+    @override_settings(MIDTRANS_SERVER_KEY='')
+    def test_rejected_without_server_key(self):
+        payload = dict(self.payload, signature_key=PaymentNotification.signature(
+            'INV0001', '200', '25000.00', server_key=''))
+        self.assertEqual(self.post(payload).status_code, 403)
+        self.assertFalse(PaymentNotification.objects.exists())
+
+
+class NumberSequenceTestCase(TransactionTestCase):
+    def lease(self, name, size):
+        return autonomous(NumberSequence.objects.lease, name, size)
+
+    def test_lease_block(self):
+        sequence = BlockSequence('test', self.lease, block_size=10)
+        values = [sequence.next() for _i in range(25)]
+
+        self.assertEqual(values, list(range(1, 26)))
+        self.assertEqual(NumberSequence.objects.get(name='test').value, 30)
+
+    def test_lease_kept_on_rollback(self):
+        try:
+            with transaction.atomic():
+                self.assertEqual(self.lease('test', 10), 1)
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(self.lease('test', 10), 11)
+
+
+class LoadAssignLocationConsumer(AssignLocationConsumer):
+    """Without database and redis, every assign ongoing"""
+    interval = 0.2
+
+    async def get_assign(self, assign_uuid, user):
+        return SimpleNamespace(uuid=assign_uuid)
+
+    async def get_last_location(self, assign_uuid):
+        return {'latitude': -6.2, 'longitude': 106.8, 'recorded_at': '2020-01-01T00:00:00.000000+00:00'}
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class AssignLocationLoadTestCase(SimpleTestCase):
+    ASSIGNS = 300
+    UPDATES = 20
+
+    def test_fan_out(self):
+        asyncio.run(self.run_load())
+
+    async def run_load(self):
+        application = URLRouter([
+            path('ws/assign/<uuid:assign_uuid>/location/', LoadAssignLocationConsumer.as_asgi()),
+        ])
+        channel_layer = get_channel_layer()
+        assigns = [uuid.uuid4() for _i in range(self.ASSIGNS)]
+        communicators = []
+
+        for assign_uuid in assigns:
+            communicator = WebsocketCommunicator(application, '/ws/assign/%s/location/' % assign_uuid)
+            communicator.scope['user'] = SimpleNamespace(id=1, is_anonymous=False)
+            connected, _subprotocol = await communicator.connect()
+            self.assertTrue(connected)
+            communicators.append(communicator)
+
+        # Last known point sent on subscribe
+        for communicator in communicators:
+            message = json.loads(await communicator.receive_from(timeout=5))
+            self.assertEqual(message['location']['latitude'], -6.2)
+
+        # Burst of position for every assign faster than throttle
+        for i in range(self.UPDATES):
+            await asyncio.gather(*[
+                channel_layer.group_send(live_location_group(x), {
+                    'type': 'assign_location_handler',
+                    'location': {
+                        'latitude': -6.2 + i * 0.001,
+                        'longitude': 106.8,
+                        'recorded_at': '2020-01-01T00:01:%02d.000000+00:00' % i
+                    }
+                })
+                for x in assigns
+            ])
+
+        # Superseded position dropped, newest one always delivered
+        for communicator in communicators:
+            received = []
+            while not await communicator.receive_nothing(timeout=0.5):
+                received.append(json.loads(await communicator.receive_from()))
+
+            self.assertLess(len(received), self.UPDATES)
+            self.assertEqual(received[-1]['location']['recorded_at'],
+                             '2020-01-01T00:01:%02d.000000+00:00' % (self.UPDATES - 1))
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+
+class DispatchMatchTestCase(SimpleTestCase):
+    def test_nearest_assistant(self):
+        pairs = match([-6.20, -6.30], [106.80, 106.90], [0, 0],
+                      [-6.30, -6.20], [106.90, 106.80], [0, 0])
+        self.assertEqual(sorted(pairs), [(0, 1), (1, 0)])
+
+    def test_constraints(self):
+        # Thousands of order in one run, no assistant over capacity or double booked
+        rand = random.Random(1)
+        orders, assistants = 3000, 400
+        order_time = [rand.randrange(0, 86400) for _i in range(orders)]
+        load = [rand.randrange(0, 3) for _i in range(assistants)]
+
+        pairs = match([-6.2 + rand.random() * 0.2 for _i in range(orders)],
+                      [106.7 + rand.random() * 0.2 for _i in range(orders)],
+                      order_time,
+                      [-6.2 + rand.random() * 0.2 for _i in range(assistants)],
+                      [106.7 + rand.random() * 0.2 for _i in range(assistants)],
+                      load, slot=3600, max_assign=5)
+
+        self.assertEqual(len({i for i, _j in pairs}), len(pairs))
+        by_assistant = dict()
+        for i, j in pairs:
+            by_assistant.setdefault(j, []).append(order_time[i])
+
+        for j, times in by_assistant.items():
+            self.assertLessEqual(len(times) + load[j], 5)
+            times.sort()
+            self.assertTrue(all(b - a >= 3600 for a, b in zip(times, times[1:])))
+
+
+class DeliverySlotTestCase(TransactionTestCase):
+    def test_concurrent_reserve(self):
+        start_at = timezone.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+        DeliverySlot.objects.create(start_at=start_at, capacity=5)
+        results = []
+
+        def checkout():
+            try:
+                with transaction.atomic():
+                    results.append(DeliverySlot.objects.reserve(start_at))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout) for _i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(DeliverySlot.objects.get(start_at=start_at).reserved, 5)
+
+    def test_release(self):
+        start_at = timezone.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+        self.assertTrue(DeliverySlot.objects.reserve(start_at))
+
+        DeliverySlot.objects.release(start_at)
+        DeliverySlot.objects.release(start_at)
+        self.assertEqual(DeliverySlot.objects.get(start_at=start_at).reserved, 0)
+
+
+class AssignLogDiffTestCase(SimpleTestCase):
+    def test_changed_column(self):
+        instance = Assign(assistant_id=1, is_ongoing=False)
+        instance._loaded_values = loaded_values(instance, ASSIGN_LOG_FIELDS)
+
+        instance.assistant_id = 2
+        instance.is_ongoing = True
+        entries = diff_entries(instance, ASSIGN_LOG_FIELDS, 10, 1)
+
+        self.assertEqual([(x['column'], x['old_value'], x['new_value']) for x in entries],
+                         [('assistant', '1', '2'), ('is_ongoing', 'False', 'True')])
+        self.assertEqual(diff_entries(instance, ASSIGN_LOG_FIELDS, 10, 1), [])
+
+    def test_same_decimal_not_logged(self):
+        instance = OrderLine(quantity=Decimal('2.00000'), price=1000)
+        instance._loaded_values = loaded_values(instance, ORDER_LINE_LOG_FIELDS)
+
+        instance.quantity = Decimal('2')
+        self.assertEqual(diff_entries(instance, ORDER_LINE_LOG_FIELDS, 10, 1), [])
+
+
+@override_settings(TIME_ZONE='Asia/Jakarta')
+class SpendingRollupTestCase(SimpleTestCase):
+    def test_month_in_local_time(self):
+        create_at = datetime.datetime(2021, 5, 31, 20, 0, tzinfo=datetime.timezone.utc)
+        item = contribution(1, create_at, ' Beras ', 5, 'Pasar', 10000, True)
+
+        self.assertEqual(item['month'], datetime.date(2021, 6, 1))
+        self.assertEqual(item['name'], 'Beras')
+        self.assertIsNone(contribution(1, create_at, 'Beras', 5, 'Pasar', 10000, False))
+
+    def test_changes(self):
+        create_at = timezone.now()
+        old = contribution(1, create_at, 'Beras', 5, 'Pasar', 10000, True)
+        new = contribution(1, create_at, 'Beras', 5, 'Indomaret', 12000, True)
+        changes = {(x[0], x[1][3]): (x[3], x[4]) for x in rollup_changes(old, new)}
+
+        # Same item only amount moved, location moved whole
+        self.assertEqual(changes, {
+            ('SpendingProduct', 'Beras'): (2000, 0),
+            ('SpendingLocation', 'Pasar'): (-10000, -1),
+            ('SpendingLocation', 'Indomaret'): (12000, 1),
+        })
+        self.assertEqual(rollup_changes(old, old), [])
+        self.assertEqual(len(rollup_changes(old, None)), 2)
+
+
+class ExportRenderTestCase(SimpleTestCase):
+    def setUp(self):
+        self.columns = ['uuid', 'name', 'quantity', 'create_at', 'is_found']
+        self.rows = [
+            (uuid.uuid4(), 'Beras, 5 kg', Decimal('2.50000'), timezone.now(), None)
+            for _i in range(1000)
+        ]
+
+    def test_csv_in_small_chunks(self):
+        chunks = list(render_csv(self.columns, iter(self.rows), buffer_size=1024))
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(lines[0], 'uuid,name,quantity,create_at,is_found')
+        self.assertEqual(len(lines), 1001)
+        self.assertTrue(lines[1].endswith(',"Beras, 5 kg",2.50000,%s,' % self.rows[0][3].isoformat()))
+
+    def test_ndjson_gzip(self):
+        chunks = gzip_chunks(render_ndjson(self.columns, iter(self.rows), buffer_size=1024))
+        lines = gzip.decompress(b''.join(chunks)).decode('utf-8').splitlines()
+
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(json.loads(lines[0])['uuid'], str(self.rows[0][0]))
+        self.assertEqual(json.loads(lines[0])['quantity'], '2.50000')
+
+
+class ImportParseTestCase(SimpleTestCase):
+    def test_line(self):
+        cases = {
+            '2 kg beras': ('beras', Decimal('2'), 'kg'),
+            'beras 2kg': ('beras', Decimal('2'), 'kg'),
+            '- telur x10': ('telur', Decimal('10'), 'piece'),
+            '1. minyak goreng 2 liter': ('minyak goreng', Decimal('2'), 'liter'),
+            '[ ] gula 1/2 kg': ('gula', Decimal('0.5'), 'kg'),
+            'Indomie goreng 5 bks': ('Indomie goreng', Decimal('5'), 'pack'),
+            '1,5 kg ayam': ('ayam', Decimal('1.5'), 'kg'),
+            'garam': ('garam', Decimal('1'), 'piece'),
+        }
+        for line, expected in cases.items():
+            self.assertEqual(parse_line(line), expected, line)
+        self.assertIsNone(parse_line('   '))
+
+    def test_csv_with_header(self):
+        items = parse_csv('nama;jumlah;satuan;catatan\nberas;2;kg;pulen\ntelur;10;butir;\n')
+        self.assertEqual(items, [
+            ('beras', Decimal('2'), 'kg', 'pulen'),
+            ('telur', Decimal('10'), 'piece', None),
+        ])
+
+    def test_quantity_out_of_range(self):
+        for value in ['-2', '0', '0,000001', '12345678901234567', '1/0', 'NaN', 'Infinity']:
+            self.assertIsNone(parse_quantity(value), value)
+        self.assertEqual(parse_quantity('9999999999'), Decimal('9999999999'))
+
+        items = parse_csv('beras;-2;kg\ngula;12345678901234567;kg\n')
+        self.assertEqual(items, [
+            ('beras', Decimal('1'), 'kg', None),
+            ('gula', Decimal('1'), 'kg', None),
+        ])
+
+
+class HabitTestCase(SimpleTestCase):
+    def test_interval(self):
+        start = timezone.now()
+        day = datetime.timedelta(days=1)
+
+        habit = next_habit(0, None, None, start)
+        self.assertEqual(habit, (1, start, None))
+
+        # Same trip, not counted again
+        self.assertEqual(next_habit(*habit, start + datetime.timedelta(hours=2)),
+                         (1, start + datetime.timedelta(hours=2), None))
+
+        habit = next_habit(*habit, start + 7 * day)
+        self.assertEqual(habit[0], 2)
+        self.assertEqual(habit[2], (7 * day).total_seconds())
+
+        habit = next_habit(*habit, start + 21 * day, alpha=0.5)
+        self.assertEqual(habit[2], (10.5 * day).total_seconds())
+
+    def test_score(self):
+        now = timezone.now()
+        week = datetime.timedelta(days=7).total_seconds()
+
+        self.assertEqual(habit_score(1, now, None, now), 0.0)
+        due = habit_score(4, now - datetime.timedelta(days=7), week, now)
+        early = habit_score(4, now - datetime.timedelta(days=2), week, now)
+        late = habit_score(4, now - datetime.timedelta(days=30), week, now)
+
+        self.assertAlmostEqual(due, 0.75)
+        self.assertLess(early, due)
+        self.assertLess(late, due)
+        self.assertGreater(habit_score(10, now - datetime.timedelta(days=7), week, now), due)
+
+
+class ORJSONRendererTestCase(SimpleTestCase):
+    def test_same_as_json_renderer(self):
+        data = {
+            'results': [
+                {'uuid': str(uuid.uuid4()), 'name': 'Teh \u00e9 "Botol"', 'count_stuff': 3,
+                 'amount': 12.5, 'is_complete': None, 'stuff': [{'quantity': '2.00000'}]}
+                for _i in range(50)
+            ],
+            'next': None,
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_types_as_lazy_encoder(self):
+        data = {
+            'uuid': uuid.uuid4(),
+            'quantity': Decimal('1.50000'),
+            'create_at': timezone.now(),
+            'date': datetime.date(2021, 1, 31),
+            'label': gettext_lazy("Buah"),
+        }
+        expected = json.loads(json.dumps(data, cls=LazyEncoder))
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), expected)
+
+    def test_parse(self):
+        content = '{"name": "gula", "quantity": 2}'.encode('utf-8')
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(content)), {'name': 'gula', 'quantity': 2})
+
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
+
+
+class ValuesListSerializerTestCase(SimpleTestCase):
+    def values_row(self, instance, paths):
+        # As queryset.values(), relation give its pk
+        row = dict()
+        for path in paths:
+            value = instance
+            for attr in path.split('__'):
+                value = getattr(value, attr, None)
+            row[path] = value.pk if isinstance(value, models.Model) else value
+        return row
+
+    def test_same_as_serializer(self):
+        user = User(id=1, uuid=uuid.uuid4(), first_name='Andi')
+        other = User(id=2, uuid=uuid.uuid4(), first_name='Budi')
+        basket = Basket(id=1, uuid=uuid.uuid4(), user=user, name='Dapur')
+
+        found = Stuff(id=1, uuid=uuid.uuid4(), user=user, basket=basket, product=Product(id=1, name='Gula'),
+                      name='Gula', quantity=Decimal('1.50000'), metric='kg',
+                      create_at=timezone.now(), update_at=timezone.now())
+        found.purchased_stuff = PurchasedStuff(id=1, uuid=uuid.uuid4(), user=other, basket=basket,
+                                               stuff=found, name='Gula', quantity=Decimal('2.00000'),
+                                               metric='kg', price=15000, amount=30000,
+                                               is_found=True, create_at=timezone.now(),
+                                               update_at=timezone.now())
+        looked = Stuff(id=2, uuid=uuid.uuid4(), user=other, basket=basket, product=None,
+                       name='Teh \u00e9 "Botol"', quantity=Decimal('3.00000'), metric='unknown',
+                       note='dingin', create_at=timezone.now(), update_at=timezone.now())
+        # Cached as not exist, no query
+        Stuff._meta.get_field('purchased_stuff').set_cached_value(looked, None)
+
+        request = Request(APIRequestFactory().get('/'))
+        request.user = user
+        context = {'request': request}
+
+        expected = StuffSerializer([found, looked], many=True, context=context, exclude_fields=['basket']).data
+        serializer = StuffValuesSerializer(context=context, exclude_fields=['basket'])
+        serializer.instance = [self.values_row(x, serializer.values_fields) for x in [found, looked]]
+
+        self.assertEqual(ORJSONRenderer().render(serializer.data), ORJSONRenderer().render(expected))
+        self.assertIsNone(serializer.data[1]['purchased_stuff'])
+
+
+class BasketValuesSerializerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('basketuser', 'basket@email.com', '123456')
+        ordered = Basket.objects.create(user=self.user, name='Dapur', location='Pasar Baru')
+        Basket.objects.create(user=self.user, name='Kamar "Mandi"', sort=2)
+        # Order save take number from sequence, not needed here
+        Order.objects.bulk_create([Order(basket=ordered, customer=self.user, number='0000000001',
+                                         is_ongoing=True)])
+
+    def test_same_as_serializer(self):
+        request = Request(APIRequestFactory().get('/'))
+        request.user = self.user
+        context = {'request': request}
+        exclude_fields = ['share', 'purchased', 'stuff', 'order']
+
+        view = BasketApiView()
+        view.request = request
+        queryset = view.queryset().order_by('sorted', '-create_at')
+
+        instances = estimate_baskets(queryset)
+        expected = BasketSerializer(instances, many=True, context=context, exclude_fields=exclude_fields).data
+        serializer = BasketValuesSerializer(context=context, exclude_fields=exclude_fields)
+        serializer.instance = list(serializer.values(queryset))
+
+        self.assertEqual(ORJSONRenderer().render(serializer.data), ORJSONRenderer().render(expected))
+        self.assertEqual([x['is_order_ongoing'] for x in serializer.data], [True, False])
@@ -0,0 +1,166 @@
+import json
+import logging
+import datetime
+from decimal import Decimal
+
+from dateutil import parser
+from redis.exceptions import RedisError
+
+from django.db import transaction, DataError, IntegrityError
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.redis import get_redis_connection
+
+BUFFER_KEY = 'assign_log:buffer'
+# Entry database refuse, kept for inspection instead retried forever
+DEAD_LETTER_KEY = 'assign_log:dead'
+FLUSH_BATCH_SIZE = 1000
+
+# Column tracked per model, change of other column not logged
+ASSIGN_LOG_FIELDS = ['assistant', 'started_at', 'complete_at', 'is_ongoing', 'is_complete']
+ORDER_LINE_LOG_FIELDS = ['quantity', 'metric', 'price', 'is_found', 'note']
+
+
+def _value(value):
+    # Same value must give same text whatever way it was set
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return format(value.normalize(), 'f')
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return value.astimezone(timezone.utc).isoformat()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def loaded_values(instance, fields):
+    deferred = instance.get_deferred_fields()
+    values = dict()
+    for field in fields:
+        attname = instance._meta.get_field(field).attname
+        if attname not in deferred:
+            values[field] = _value(getattr(instance, attname))
+    return values
+
+
+def diff_entries(instance, fields, assign_id, actor_id, prefix=None, created=False):
+    """
+    Log entry of changed column compared to value when loaded,
+    entry is dict ready for AssignLog
+    """
+    AssignLog = get_model('shopping', 'AssignLog')
+    old_values = {} if created else getattr(instance, '_loaded_values', None)
+    if old_values is None:
+        return []
+
+    now = timezone.now().isoformat()
+    new_values = loaded_values(instance, fields)
+    entries = []
+
+    for field in fields:
+        # Unknown old value (deferred when loaded) not logged
+        if field not in new_values or (not created and field not in old_values):
+            continue
+
+        old, new = old_values.get(field), new_values[field]
+        if old == new or (created and new is None):
+            continue
+
+        entries.append({
+            'assign_id': assign_id,
+            'actor_id': actor_id,
+            'column': '{}.{}'.format(prefix, field) if prefix else field,
+            'old_value': old,
+            'new_value': '' if new is None else new,
+            'event': AssignLog.ADDED if created else AssignLog.CHANGED,
+            'create_at': now,
+        })
+
+    instance._loaded_values = dict(getattr(instance, '_loaded_values', None) or {}, **new_values)
+    return entries
+
+
+def enqueue_entries(entries):
+    """
+    Queue after commit so rolled back change never logged and
+    the insert not done inside the hot transaction
+    """
+    if entries:
+        transaction.on_commit(lambda: push_entries(entries))
+
+
+def push_entries(entries):
+    try:
+        get_redis_connection().rpush(BUFFER_KEY, *[json.dumps(x) for x in entries])
+    except RedisError:
+        # Better slow than lost
+        logging.exception("Assign log buffer unavailable, write directly")
+        write_entries(entries)
+
+
+def write_entries(entries):
+    AssignLog = get_model('shopping', 'AssignLog')
+    objs = [
+        AssignLog(**dict(x, create_at=parser.isoparse(x['create_at'])))
+        for x in entries
+    ]
+    AssignLog.objects.bulk_create(objs, batch_size=500)
+
+
+def existing_entries(entries):
+    """
+    Entry whose assign and actor still exist, log of deleted one
+    would be deleted with it (cascade) so dropped
+    """
+    Assign = get_model('shopping', 'Assign')
+    User = get_model('person', 'User')
+
+    assign_ids = set(Assign.objects.filter(id__in={x['assign_id'] for x in entries})
+                     .values_list('id', flat=True))
+    actor_ids = set(User.objects.filter(id__in={x['actor_id'] for x in entries})
+                    .values_list('id', flat=True))
+    return [x for x in entries if x['assign_id'] in assign_ids and x['actor_id'] in actor_ids]
+
+
+def write_entries_each(raw):
+    """Insert one by one, entry with bad data moved to dead letter list"""
+    connection = get_redis_connection()
+    for item in raw:
+        try:
+            with transaction.atomic():
+                write_entries([json.loads(item)])
+        except (ValueError, TypeError, KeyError, DataError, IntegrityError):
+            logging.exception("Assign log entry rejected, moved to %s", DEAD_LETTER_KEY)
+            connection.rpush(DEAD_LETTER_KEY, item)
+
+
+def flush_entries(batch_size=FLUSH_BATCH_SIZE):
+    """Move buffered entry to database, return number taken from buffer"""
+    connection = get_redis_connection()
+    total = 0
+
+    while True:
+        pipe = connection.pipeline(transaction=True)
+        pipe.lrange(BUFFER_KEY, 0, batch_size - 1)
+        pipe.ltrim(BUFFER_KEY, batch_size, -1)
+        raw, _trimmed = pipe.execute()
+        if not raw:
+            return total
+
+        try:
+            entries = existing_entries([json.loads(x) for x in raw])
+            with transaction.atomic():
+                write_entries(entries)
+        except (ValueError, TypeError, KeyError, DataError, IntegrityError):
+            # One bad entry must not block the buffer
+            write_entries_each(raw)
+        except Exception:
+            # Database unavailable, retried next flush
+            connection.lpush(BUFFER_KEY, *reversed(raw))
+            raise
+
+        total += len(raw)
+        if len(raw) < batch_size:
+            return total
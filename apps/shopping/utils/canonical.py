@@ -0,0 +1,185 @@
+from django.db import transaction
+from django.db.models import Count
+
+from utils.generals import get_model
+from utils.trigram import normalize, trigrams, TrigramIndex
+from .constants import PRODUCT_DUPLICATE_THRESHOLD, PRODUCT_MERGE_THRESHOLD, PRODUCT_MERGE_BATCH_SIZE
+
+
+def _lookup_grams(grams):
+    # Single letter word start ('  s') shared by too many product to narrow anything
+    return [x for x in grams if not x.startswith('  ')]
+
+
+def index_products(products):
+    """Replace trigram row of products, merged duplicate not indexed"""
+    ProductTrigram = get_model('shopping', 'ProductTrigram')
+
+    ProductTrigram.objects.filter(product_id__in=[x.id for x in products]).delete()
+    objs = [
+        ProductTrigram(product_id=x.id, trigram=gram)
+        for x in products if x.canonical_id is None
+        for gram in trigrams(x.normalized_name or normalize(x.name))
+    ]
+    ProductTrigram.objects.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+
+
+def match_products(names, threshold=PRODUCT_DUPLICATE_THRESHOLD):
+    """
+    {name: canonical Product} for names already in catalog, by exact name,
+    by normalized name, then by trigram similarity. Three query whatever
+    number of names. Name without match not in result
+    """
+    Product = get_model('shopping', 'Product')
+    ProductTrigram = get_model('shopping', 'ProductTrigram')
+
+    result = dict()
+    queryset = Product.objects.select_related('canonical')
+
+    exact = {x.name.lower(): x for x in queryset.filter(name__in=names)}
+    normalized = {x: normalize(x) for x in names if x.lower() not in exact}
+    similar = {x.normalized_name: x for x in queryset.filter(normalized_name__in=set(normalized.values()))}
+
+    pending = dict()
+    for name in names:
+        product = exact.get(name.lower()) or similar.get(normalized.get(name))
+        if product is not None:
+            result[name] = product.canonical or product
+        elif normalized.get(name):
+            pending[name] = normalized[name]
+
+    if not pending:
+        return result
+
+    grams = set()
+    for value in pending.values():
+        grams.update(_lookup_grams(trigrams(value)))
+
+    candidate_ids = ProductTrigram.objects \
+        .filter(trigram__in=grams) \
+        .values_list('product_id', flat=True) \
+        .distinct()
+    candidates = {x.id: x for x in queryset.filter(id__in=candidate_ids, canonical__isnull=True)}
+
+    index = TrigramIndex()
+    for product in candidates.values():
+        index.add(product.id, product.normalized_name)
+
+    for name, value in pending.items():
+        found = index.search(value, threshold)
+        if found:
+            result[name] = candidates[found[0][0]]
+    return result
+
+
+def resolve_products(names, user=None):
+    """
+    {name lower: Product} for every name, routed to canonical product,
+    name never seen before created in bulk and indexed
+    """
+    Product = get_model('shopping', 'Product')
+    ProductTrigram = get_model('shopping', 'ProductTrigram')
+
+    names = list({x.lower(): x for x in names if x}.values())
+    matched = match_products(names)
+    result = {name.lower(): product for name, product in matched.items()}
+
+    missing = [x for x in names if x not in matched]
+    if missing:
+        # Parallel request creating same new name, let the other one win
+        Product.objects.bulk_create([Product(name=x, user=user, normalized_name=normalize(x)[:255])
+                                     for x in missing], batch_size=500, ignore_conflicts=True)
+        created = list(Product.objects.select_related('canonical').filter(name__in=missing))
+        indexed = set(ProductTrigram.objects.filter(product_id__in=[x.id for x in created])
+                      .values_list('product_id', flat=True).distinct())
+        index_products([x for x in created if x.id not in indexed])
+        result.update({x.name.lower(): x.canonical or x for x in created})
+
+    return result
+
+
+def resolve_product(name, user=None):
+    return resolve_products([name], user=user).get(name.lower())
+
+
+def find_duplicates(threshold=PRODUCT_MERGE_THRESHOLD, chunk_size=5000):
+    """
+    [(canonical id, [duplicate id])], most used product keep its place.
+    Whole catalog indexed in memory, each product compared only to
+    product sharing trigram with it
+    """
+    Product = get_model('shopping', 'Product')
+    Stuff = get_model('shopping', 'Stuff')
+
+    usage = dict(
+        Stuff.objects.filter(product__isnull=False)
+        .values('product_id').annotate(total=Count('id'))
+        .values_list('product_id', 'total')
+    )
+
+    index = TrigramIndex()
+    catalog = set()
+    rows = Product.objects.filter(canonical__isnull=True) \
+        .order_by('id') \
+        .values_list('id', 'normalized_name', 'is_catalog')
+    for product_id, normalized_name, is_catalog in rows.iterator(chunk_size=chunk_size):
+        if normalized_name:
+            index.add(product_id, normalized_name)
+        if is_catalog:
+            catalog.add(product_id)
+
+    # Curated catalog product first, then most used, then oldest
+    order = sorted(index.names.keys(), key=lambda x: (x not in catalog, -usage.get(x, 0), x))
+    merged, clusters = set(), []
+
+    for product_id in order:
+        if product_id in merged:
+            continue
+
+        duplicates = [
+            key for key, _score in index.search(index.names[product_id], threshold, exclude=product_id)
+            if key not in catalog
+        ]
+        if not duplicates:
+            continue
+
+        for key in duplicates:
+            index.remove(key)
+            merged.add(key)
+        clusters.append((product_id, sorted(duplicates)))
+
+    return clusters
+
+
+def _repoint(model, duplicate_ids, canonical_id, batch_size):
+    total = 0
+    queryset = model.objects.filter(product_id__in=duplicate_ids)
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+
+        with transaction.atomic():
+            total += model.objects.filter(id__in=ids).update(product_id=canonical_id)
+
+
+def merge_products(canonical_id, duplicate_ids, batch_size=PRODUCT_MERGE_BATCH_SIZE):
+    """
+    Keep duplicate as alias of canonical so its name resolve there,
+    then move Stuff and ProductRate of duplicates in small transaction.
+    Alias made first, row created meanwhile already use canonical.
+    Return number of row moved
+    """
+    Product = get_model('shopping', 'Product')
+    ProductTrigram = get_model('shopping', 'ProductTrigram')
+
+    with transaction.atomic():
+        # Earlier alias of duplicate follow it, chain never longer than one
+        Product.objects.filter(canonical_id__in=duplicate_ids).update(canonical_id=canonical_id)
+        Product.objects.filter(id__in=duplicate_ids).update(canonical_id=canonical_id, is_enabled=False)
+        ProductTrigram.objects.filter(product_id__in=duplicate_ids).delete()
+
+    total = 0
+    for model_name in ('Stuff', 'ProductRate', 'SpendingProduct'):
+        total += _repoint(get_model('shopping', model_name), duplicate_ids, canonical_id, batch_size)
+    return total
@@ -94,3 +94,176 @@ VEHICLE_CHOICE = (
     (CAR, _("Car")),
     (MOTORCYCLE, _("Motorcycle")),
 )
+
+
+# Resumable upload
+UPLOAD_CHUNK_SIZE = 512 * 1024
+UPLOAD_SESSION_EXPIRE_HOURS = 24
+
+UPLOAD_BASKET, UPLOAD_STUFF, UPLOAD_PURCHASED_STUFF = 'basket', 'stuff', 'purchased_stuff'
+UPLOAD_TARGET_CHOICES = (
+    (UPLOAD_BASKET, _("Basket")),
+    (UPLOAD_STUFF, _("Stuff")),
+    (UPLOAD_PURCHASED_STUFF, _("Purchased Stuff")),
+)
+
+# Temporary file of failed blob save removed by collect_orphan_blobs after
+BLOB_TMP_EXPIRE_HOURS = 24
+
+UPLOAD_OPEN, UPLOAD_COMPLETE = 'open', 'complete'
+UPLOAD_STATUS = (
+    (UPLOAD_OPEN, _("Open")),
+    (UPLOAD_COMPLETE, _("Complete")),
+)
+
+
+# Payment notification (Midtrans)
+# transaction_status mapped to invoice status, rank keep late or
+# out of order notification from moving invoice backward
+PAYMENT_TRANSITIONS = {
+    'pending': (SENT, 0),
+    'expire': (OVERDUE, 1),
+    'cancel': (OVERDUE, 1),
+    'deny': (OVERDUE, 1),
+    'failure': (OVERDUE, 1),
+    'capture': (PAID, 2),
+    'settlement': (PAID, 2),
+}
+
+INVOICE_STATUS_RANK = {SENT: 0, OVERDUE: 1, PAID: 2}
+# Notification without invoice retried until this old
+PAYMENT_NOTIFICATION_MAX_AGE_HOURS = 72
+
+
+# Order and invoice number, leased per process by block
+NUMBER_SEQUENCE_BLOCK_SIZE = 100
+ORDER_SEQUENCE, INVOICE_SEQUENCE = 'order', 'invoice'
+
+
+# Assistant GPS tracking
+TRACKING_GEOHASH_PRECISION = 9
+TRACKING_BATCH_MAX_POINTS = 500
+# point closer than this (meter) to previous one dropped
+TRACKING_STATIONARY_DISTANCE = 10
+# Douglas-Peucker tolerance in meter
+TRACKING_SIMPLIFY_TOLERANCE = 5
+# flush to database when buffer of one assign reach this size
+TRACKING_FLUSH_SIZE = 200
+
+# Live assistant location over websocket
+# minimum second between two message to one subscriber
+LIVE_LOCATION_INTERVAL = 2
+LIVE_LOCATION_TIMEOUT = 60 * 60
+
+
+# Automatic dispatch order to assistant
+# only order scheduled inside this window matched
+DISPATCH_HORIZON_HOURS = 24
+# two order of one assistant must be this far apart
+DISPATCH_SLOT_MINUTES = 120
+# maximum unfinished assign per assistant
+DISPATCH_MAX_ASSIGN = 5
+# assistant farther than this (meter) not considered
+DISPATCH_MAX_DISTANCE = 15000
+# score = distance km + workload * weight, lower better
+DISPATCH_WORKLOAD_WEIGHT = 2
+
+
+# Delivery route planner
+# deliveries of one courier scheduled in same window become one route
+ROUTE_WINDOW_MINUTES = 120
+ROUTE_HORIZON_HOURS = 24
+ROUTE_SPEED_KMH = 25
+ROUTE_STOP_MINUTES = 5
+
+
+# Delivery slot capacity, local time
+SLOT_MINUTES = 120
+SLOT_OPEN_HOUR = 8
+SLOT_CLOSE_HOUR = 20
+SLOT_CAPACITY = 20
+SLOT_AVAILABILITY_MAX_DAYS = 14
+
+
+# Spending analytics
+# months shown when no period given
+SPENDING_MONTHS = 12
+SPENDING_MAX_MONTHS = 36
+SPENDING_TOP_LIMIT = 10
+SPENDING_TOP_MAX_LIMIT = 100
+
+
+# History export
+EXPORT_BASKET, EXPORT_STUFF, EXPORT_PURCHASED_STUFF = 'baskets', 'stuffs', 'purchased-stuffs'
+EXPORT_DATASET_CHOICES = (
+    (EXPORT_BASKET, _("Basket")),
+    (EXPORT_STUFF, _("Stuff")),
+    (EXPORT_PURCHASED_STUFF, _("Purchased Stuff")),
+)
+
+EXPORT_CSV, EXPORT_NDJSON = 'csv', 'ndjson'
+EXPORT_OUTPUT_CHOICES = (
+    (EXPORT_CSV, _("CSV")),
+    (EXPORT_NDJSON, _("NDJSON")),
+)
+
+EXPORT_PENDING, EXPORT_DONE, EXPORT_FAILED = 'pending', 'done', 'failed'
+EXPORT_STATUS = (
+    (EXPORT_PENDING, _("Pending")),
+    (EXPORT_DONE, _("Done")),
+    (EXPORT_FAILED, _("Failed")),
+)
+
+# rows fetched from database at once
+EXPORT_CHUNK_SIZE = 2000
+# bytes collected before sent to client
+EXPORT_BUFFER_SIZE = 64 * 1024
+# file of export job deleted after this
+EXPORT_EXPIRE_HOURS = 48
+
+
+# Shopping list import, more line rejected
+IMPORT_MAX_LINES = 500
+
+
+# Product deduplication, trigram similarity (0 to 1) to treat as same product.
+# New name routed to existing product from DUPLICATE, existing product
+# merged by dedup_products only from MERGE (stricter, can't be undone)
+PRODUCT_DUPLICATE_THRESHOLD = 0.8
+PRODUCT_MERGE_THRESHOLD = 0.9
+PRODUCT_MERGE_BATCH_SIZE = 1000
+
+
+# Frequently bought together
+# related product kept per product
+RECOMMENDATION_TOP_K = 20
+# basket containing both before pair trusted
+RECOMMENDATION_MIN_SUPPORT = 3
+# bigger basket is stock up, not a combination
+RECOMMENDATION_MAX_BASKET_SIZE = 100
+# basket counted at once
+RECOMMENDATION_BATCH_SIZE = 5000
+RECOMMENDATION_LIMIT = 10
+RECOMMENDATION_MAX_LIMIT = 50
+
+
+# Next item suggestion from user purchase habit
+# weight of newest interval in moving average
+HABIT_INTERVAL_ALPHA = 0.3
+# basket closer than this is same shopping trip
+HABIT_MIN_GAP_HOURS = 12
+# bought less than this not a habit yet
+HABIT_MIN_COUNT = 2
+# 1 when exactly due, fade before and after
+HABIT_MIN_SCORE = 0.2
+HABIT_SUGGESTION_LIMIT = 30
+HABIT_CACHE_TIMEOUT = 60 * 60
+HABIT_BATCH_SIZE = 500
+
+
+# Expected price from product rate history
+# weight of a rate halved every this many days
+PRICE_HALF_LIFE_DAYS = 30
+# location estimate used only from this many rate, else all location
+PRICE_MIN_LOCATION_COUNT = 3
+PRICE_BATCH_SIZE = 5000
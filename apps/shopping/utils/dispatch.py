@@ -0,0 +1,178 @@
+import datetime
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models import Count, Q, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.geo import haversine_matrix
+from utils.redis import get_redis_connection
+from apps.person.utils.constants import ASSISTANT
+from .constants import (
+    WAITING,
+    DISPATCH_HORIZON_HOURS,
+    DISPATCH_SLOT_MINUTES,
+    DISPATCH_MAX_ASSIGN,
+    DISPATCH_MAX_DISTANCE,
+    DISPATCH_WORKLOAD_WEIGHT
+)
+
+DISPATCH_LOCK_KEY = 'dispatch_orders:lock'
+
+
+def match(order_lat, order_lng, order_time, assistant_lat, assistant_lng, assistant_load,
+          busy=(), slot=DISPATCH_SLOT_MINUTES * 60, max_assign=DISPATCH_MAX_ASSIGN,
+          max_distance=DISPATCH_MAX_DISTANCE, workload_weight=DISPATCH_WORKLOAD_WEIGHT):
+    """
+    Pick assistant for each order, earliest schedule first.
+
+    Coordinate NaN mean unknown, scored as max_distance.
+    order_time and busy time in epoch second, busy is list of
+    (assistant index, time) of unfinished assign.
+    Return list of (order index, assistant index)
+    """
+    order_time = np.asarray(order_time, dtype=float)
+    load = np.asarray(assistant_load, dtype=float).copy()
+    if not len(order_time) or not len(load):
+        return []
+
+    distance = haversine_matrix(order_lat, order_lng, assistant_lat, assistant_lng)
+    distance[np.isnan(distance)] = max_distance
+    cost_distance = distance / 1000
+    cost_distance[distance > max_distance] = np.inf
+
+    # Order too close in time to assistant other assign
+    conflict = np.zeros(distance.shape, dtype=bool)
+    for j, time in busy:
+        conflict[:, j] |= np.abs(order_time - time) < slot
+
+    result = []
+    for i in np.argsort(order_time, kind='stable'):
+        cost = cost_distance[i] + load * workload_weight
+        cost[conflict[i] | (load >= max_assign)] = np.inf
+
+        j = int(np.argmin(cost))
+        if not np.isfinite(cost[j]):
+            continue
+
+        result.append((int(i), j))
+        load[j] += 1
+        conflict[:, j] |= np.abs(order_time - order_time[i]) < slot
+    return result
+
+
+def _coordinate(value):
+    # Address without map pin saved as 0, 0
+    if value is None or float(value) == 0:
+        return np.nan
+    return float(value)
+
+
+def dispatch_orders(now=None):
+    """
+    Assign waiting orders scheduled in next DISPATCH_HORIZON_HOURS
+    to assistant, score by distance from assistant last tracking point
+    to delivery address, unfinished assign and schedule.
+    Return number of assign created
+    """
+    connection = get_redis_connection()
+    lock = connection.lock(DISPATCH_LOCK_KEY, timeout=60 * 10, blocking_timeout=0)
+    if not lock.acquire():
+        return 0
+
+    try:
+        return _dispatch_orders(now or timezone.now())
+    finally:
+        lock.release()
+
+
+def _dispatch_orders(now):
+    User = get_model('person', 'User')
+    Order = get_model('shopping', 'Order')
+    Assign = get_model('shopping', 'Assign')
+    AssignTracking = get_model('shopping', 'AssignTracking')
+
+    slot = datetime.timedelta(minutes=DISPATCH_SLOT_MINUTES)
+    until = now + datetime.timedelta(hours=DISPATCH_HORIZON_HOURS)
+
+    orders = list(
+        Order.objects
+        .filter(status=WAITING, is_complete=False, assign__isnull=True,
+                order_schedule__datetime__gte=now, order_schedule__datetime__lt=until)
+        .annotate(
+            latitude=Coalesce('order_delivery__latitude', 'order_delivery__shipping_address__latitude'),
+            longitude=Coalesce('order_delivery__longitude', 'order_delivery__shipping_address__longitude')
+        )
+        .values_list('id', 'basket_id', 'customer_id', 'order_schedule__datetime',
+                     'latitude', 'longitude')
+    )
+    if not orders:
+        return 0
+
+    last_point = AssignTracking.objects \
+        .filter(assign__assistant_id=OuterRef('id')) \
+        .order_by('-recorded_at', '-create_at')
+
+    assistants = list(
+        User.objects
+        .filter(groups__name=ASSISTANT, is_active=True)
+        .annotate(
+            workload=Count('assign_assistant', filter=Q(assign_assistant__is_complete=False),
+                           distinct=True),
+            latitude=Subquery(last_point.values('latitude')[:1]),
+            longitude=Subquery(last_point.values('longitude')[:1])
+        )
+        .values_list('id', 'workload', 'latitude', 'longitude')
+    )
+    if not assistants:
+        return 0
+
+    assistant_index = {x[0]: j for j, x in enumerate(assistants)}
+    busy = [
+        (assistant_index[assistant_id], started_at.timestamp())
+        for assistant_id, started_at in Assign.objects
+        .filter(is_complete=False, assistant_id__in=assistant_index.keys(),
+                started_at__gte=now - slot, started_at__lt=until + slot)
+        .values_list('assistant_id', 'started_at')
+    ]
+
+    pairs = match(
+        [_coordinate(x[4]) for x in orders],
+        [_coordinate(x[5]) for x in orders],
+        [x[3].timestamp() for x in orders],
+        [_coordinate(x[2]) for x in assistants],
+        [_coordinate(x[3]) for x in assistants],
+        [x[1] for x in assistants],
+        busy=busy
+    )
+    if not pairs:
+        return 0
+
+    objs = [
+        Assign(order_id=orders[i][0], basket_id=orders[i][1], customer_id=orders[i][2],
+               started_at=orders[i][3], assistant_id=assistants[j][0])
+        for i, j in pairs
+    ]
+    chosen = {(x.order_id, x.assistant_id) for x in objs}
+
+    with transaction.atomic():
+        # Order assigned by staff meanwhile keep the manual one
+        Assign.objects.bulk_create(objs, batch_size=500, ignore_conflicts=True)
+
+        created = Assign.objects \
+            .select_related('order', 'order__basket', 'basket') \
+            .filter(order_id__in=[x[0] for x in chosen])
+
+        # Same side effect as assign made in admin (purchased, order and basket status)
+        count = 0
+        for instance in created:
+            if (instance.order_id, instance.assistant_id) in chosen:
+                post_save.send(sender=Assign, instance=instance, created=True,
+                               update_fields=None, raw=False, using=Assign.objects.db)
+                count += 1
+
+    return count
@@ -0,0 +1,177 @@
+import io
+import csv
+import json
+import zlib
+import tempfile
+
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.generals import get_model
+from .constants import (
+    EXPORT_BASKET,
+    EXPORT_STUFF,
+    EXPORT_PURCHASED_STUFF,
+    EXPORT_CSV,
+    EXPORT_DONE,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_BUFFER_SIZE
+)
+
+# Dataset: (model name, owner filter, {column: model field})
+EXPORT_DATASETS = {
+    EXPORT_BASKET: (
+        'Basket',
+        lambda user_id: Q(user_id=user_id),
+        {
+            'uuid': 'uuid',
+            'create_at': 'create_at',
+            'name': 'name',
+            'note': 'note',
+            'location': 'location',
+            'complete_at': 'complete_at',
+            'is_complete': 'is_complete',
+            'is_purchased': 'is_purchased',
+            'is_ordered': 'is_ordered',
+        }
+    ),
+    EXPORT_STUFF: (
+        'Stuff',
+        lambda user_id: Q(basket__user_id=user_id),
+        {
+            'uuid': 'uuid',
+            'create_at': 'create_at',
+            'basket': 'basket__uuid',
+            'basket_name': 'basket__name',
+            'name': 'name',
+            'quantity': 'quantity',
+            'metric': 'metric',
+            'note': 'note',
+            'location': 'location',
+            'is_done': 'is_done',
+            'is_additional': 'is_additional',
+        }
+    ),
+    EXPORT_PURCHASED_STUFF: (
+        'PurchasedStuff',
+        lambda user_id: Q(basket__user_id=user_id) | Q(user_id=user_id),
+        {
+            'uuid': 'uuid',
+            'create_at': 'create_at',
+            'basket': 'basket__uuid',
+            'basket_name': 'basket__name',
+            'stuff': 'stuff__uuid',
+            'name': 'name',
+            'stuff_name': 'stuff__name',
+            'quantity': 'quantity',
+            'metric': 'metric',
+            'price': 'price',
+            'amount': 'amount',
+            'location': 'location',
+            'is_found': 'is_found',
+        }
+    ),
+}
+
+
+def export_columns(dataset):
+    return list(EXPORT_DATASETS[dataset][2].keys())
+
+
+def export_rows(dataset, user_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Tuple of every row owned by user, only projected column
+    and fetched chunk by chunk so memory not grow with history
+    """
+    model_name, owner, columns = EXPORT_DATASETS[dataset]
+    queryset = get_model('shopping', model_name).objects \
+        .filter(owner(user_id)) \
+        .order_by('id') \
+        .values_list(*columns.values())
+
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def render_csv(columns, rows, buffer_size=EXPORT_BUFFER_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for row in rows:
+        writer.writerow([_csv_value(x) for x in row])
+        if buffer.tell() >= buffer_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def render_ndjson(columns, rows, buffer_size=EXPORT_BUFFER_SIZE):
+    lines, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder, ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= buffer_size:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines, size = [], 0
+
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    """Compress stream on the fly, gzip container (wbits 31)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(dataset, user_id, output=EXPORT_CSV, is_gzip=False):
+    """Bytes chunk of whole export"""
+    columns = export_columns(dataset)
+    render = render_csv if output == EXPORT_CSV else render_ndjson
+    chunks = render(columns, export_rows(dataset, user_id))
+    return gzip_chunks(chunks) if is_gzip else chunks
+
+
+def export_filename(dataset, output=EXPORT_CSV, is_gzip=False):
+    return '{}.{}{}'.format(dataset, output, '.gz' if is_gzip else '')
+
+
+def export_content_type(output=EXPORT_CSV, is_gzip=False):
+    if is_gzip:
+        return 'application/gzip'
+    return 'text/csv; charset=utf-8' if output == EXPORT_CSV else 'application/x-ndjson'
+
+
+def write_export_job(job):
+    """Stream export to temporary file then move to storage, memory stay flat"""
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in export_stream(job.dataset, job.owner_id, output=job.output, is_gzip=job.is_gzip):
+            tmp.write(chunk)
+
+        size = tmp.tell()
+        tmp.seek(0)
+        name = '{}-{}'.format(job.uuid.hex, export_filename(job.dataset, job.output, job.is_gzip))
+        job.file.save(name, File(tmp), save=False)
+
+    job.size = size
+    job.status = EXPORT_DONE
+    job.complete_at = timezone.now()
+    job.save(update_fields=['file', 'size', 'status', 'complete_at', 'update_at'])
@@ -0,0 +1,176 @@
+import math
+import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from utils.generals import get_model
+from .constants import (
+    HABIT_INTERVAL_ALPHA,
+    HABIT_MIN_GAP_HOURS,
+    HABIT_MIN_COUNT,
+    HABIT_MIN_SCORE,
+    HABIT_SUGGESTION_LIMIT,
+    HABIT_CACHE_TIMEOUT,
+    HABIT_BATCH_SIZE
+)
+
+HABIT_CACHE_PREFIX = 'shopping_habit_suggestions'
+
+
+def habit_cache_key(user_id):
+    return '%s:%s' % (HABIT_CACHE_PREFIX, user_id)
+
+
+def next_habit(count, last_at, interval, at, alpha=HABIT_INTERVAL_ALPHA,
+               min_gap=datetime.timedelta(hours=HABIT_MIN_GAP_HOURS)):
+    """
+    (count, last_at, interval) after product bought again at `at`.
+    Basket shortly after previous one (or older) is same trip, not new purchase
+    """
+    if not count:
+        return 1, at, None
+
+    gap = at - last_at
+    if gap < min_gap:
+        return count, max(last_at, at), interval
+
+    gap = gap.total_seconds()
+    interval = gap if interval is None else alpha * gap + (1 - alpha) * interval
+    return count + 1, at, interval
+
+
+def habit_score(count, last_at, interval, now):
+    """
+    0 to 1, highest when time since last purchase equal the usual interval,
+    fade both way on log scale. Weighted by how sure the interval is
+    """
+    if count < HABIT_MIN_COUNT or not interval:
+        return 0.0
+
+    due = (now - last_at).total_seconds() / interval
+    if due <= 0:
+        return 0.0
+    return (1 - 1 / count) * math.exp(-2 * math.log(due) ** 2)
+
+
+def count_basket(basket_id):
+    """
+    Add completed basket to owner habit, once per basket.
+    Return number of product counted
+    """
+    Basket = get_model('shopping', 'Basket')
+    Stuff = get_model('shopping', 'Stuff')
+    ProductHabit = get_model('shopping', 'ProductHabit')
+    ProductHabitBasket = get_model('shopping', 'ProductHabitBasket')
+
+    with transaction.atomic():
+        basket = Basket.objects.filter(id=basket_id, is_complete=True) \
+            .values('id', 'user_id', 'complete_at') \
+            .first()
+        if basket is None:
+            return 0
+
+        _claim, created = ProductHabitBasket.objects.get_or_create(basket_id=basket_id)
+        if not created:
+            return 0
+
+        at = basket['complete_at'] or timezone.now()
+        rows = Stuff.objects \
+            .filter(basket_id=basket_id, product__isnull=False) \
+            .annotate(item_id=Coalesce('product__canonical_id', 'product_id')) \
+            .order_by('create_at') \
+            .values_list('item_id', 'name', 'quantity', 'metric')
+        items = {x[0]: x[1:] for x in rows}
+
+        habits = ProductHabit.objects.select_for_update() \
+            .filter(user_id=basket['user_id'], product_id__in=list(items))
+        habits = {x.product_id: x for x in habits}
+
+        created_objs, updated_objs = [], []
+        for product_id, (name, quantity, metric) in items.items():
+            habit = habits.get(product_id)
+            if habit is None:
+                created_objs.append(ProductHabit(user_id=basket['user_id'], product_id=product_id,
+                                                 name=name, quantity=quantity, metric=metric,
+                                                 count=1, last_at=at))
+                continue
+
+            habit.count, habit.last_at, habit.interval = next_habit(habit.count, habit.last_at,
+                                                                    habit.interval, at)
+            habit.name, habit.quantity, habit.metric = name, quantity, metric
+            habit.update_at = timezone.now()
+            updated_objs.append(habit)
+
+        # Other basket of same user counted at same time may create it first,
+        # that purchase counted once only
+        ProductHabit.objects.bulk_create(created_objs, batch_size=500, ignore_conflicts=True)
+        ProductHabit.objects.bulk_update(updated_objs, ['name', 'quantity', 'metric', 'count',
+                                                        'last_at', 'interval', 'update_at'],
+                                         batch_size=500)
+
+        user_id = basket['user_id']
+        transaction.on_commit(lambda: cache.delete(habit_cache_key(user_id)))
+
+    return len(items)
+
+
+def count_pending_baskets():
+    """Completed basket not yet counted, oldest first. Return number of basket"""
+    Basket = get_model('shopping', 'Basket')
+
+    queryset = Basket.objects \
+        .filter(is_complete=True, product_habit_basket__isnull=True) \
+        .order_by('complete_at', 'id') \
+        .values_list('id', flat=True)
+
+    total = 0
+    while True:
+        basket_ids = list(queryset[:HABIT_BATCH_SIZE])
+        if not basket_ids:
+            return total
+
+        for basket_id in basket_ids:
+            count_basket(basket_id)
+        total += len(basket_ids)
+
+
+def habit_suggestions(user_id, limit=HABIT_SUGGESTION_LIMIT):
+    """
+    [dict] product user usually buy around now, best first.
+    Only the user habit rows read, result cached until next basket counted
+    """
+    ProductHabit = get_model('shopping', 'ProductHabit')
+
+    key = habit_cache_key(user_id)
+    result = cache.get(key)
+    if result is None:
+        now = timezone.now()
+        rows = ProductHabit.objects \
+            .filter(user_id=user_id, count__gte=HABIT_MIN_COUNT, product__canonical__isnull=True) \
+            .values_list('product_id', 'product__uuid', 'name', 'quantity', 'metric',
+                         'count', 'last_at', 'interval')
+
+        result = []
+        for product_id, product_uuid, name, quantity, metric, count, last_at, interval in rows:
+            score = habit_score(count, last_at, interval, now)
+            if score < HABIT_MIN_SCORE:
+                continue
+
+            result.append({
+                'product_id': product_id,
+                'product': product_uuid,
+                'name': name,
+                'quantity': quantity,
+                'metric': metric,
+                'score': round(score, 4),
+                'due_at': last_at + datetime.timedelta(seconds=interval),
+            })
+
+        result.sort(key=lambda x: (-x['score'], x['name']))
+        result = result[:HABIT_SUGGESTION_LIMIT]
+        cache.set(key, result, HABIT_CACHE_TIMEOUT)
+
+    return result[:limit]
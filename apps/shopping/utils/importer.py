@@ -0,0 +1,205 @@
+import io
+import re
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from utils.generals import get_model
+from .constants import METRIC_CHOICES, PIECE
+from .canonical import resolve_products
+
+# Word people write after quantity, besides metric value and label
+_METRIC_WORDS = {
+    'kg': ['kilo', 'kgs'],
+    'hg': ['ons'],
+    'g': ['gr', 'grm', 'gram', 'grams'],
+    'mg': ['mgr'],
+    'liter': ['l', 'lt', 'ltr', 'litre'],
+    'pack': ['pak', 'pck', 'bks', 'bungkus', 'sachet', 'saset'],
+    'pouch': ['kantong', 'kantung'],
+    'bottle': ['btl', 'botol'],
+    'cup': ['gelas'],
+    'piece': ['pcs', 'pc', 'bh', 'buah', 'biji', 'butir', 'ekor', 'potong'],
+    'bunch': ['ikat', 'ikt'],
+    'sack': ['sak', 'karung'],
+    'box': ['dus', 'kardus', 'kotak'],
+    'cans': ['can', 'klg', 'kaleng'],
+    'jointly': ['renteng', 'rtg'],
+    'sheet': ['lbr', 'lembar'],
+}
+
+
+def _metric_aliases():
+    aliases = dict()
+    for value, label in METRIC_CHOICES:
+        aliases[value.lower()] = value
+        for word in str(label).lower().split('/'):
+            aliases[word.strip()] = value
+        for word in _METRIC_WORDS.get(value, []):
+            aliases[word] = value
+    return aliases
+
+
+METRIC_ALIASES = _metric_aliases()
+
+_BULLET_RE = re.compile(r'^\s*(?:[-*•+]|\d+[.)]|\[[ xX]?\])\s+')
+_NUMBER_RE = re.compile(r'^(?:\d+(?:[.,]\d+)?|\d+/\d+|[½¼¾])$')
+_TIMES_RE = re.compile(r'^(?:[xX](\d+(?:[.,]\d+)?)|(\d+(?:[.,]\d+)?)[xX])$')
+_ATTACHED_RE = re.compile(r'^(\d+(?:[.,]\d+)?)([^\d\s.,]+)$')
+_FRACTIONS = {'½': Decimal('0.5'), '¼': Decimal('0.25'), '¾': Decimal('0.75')}
+# Stuff.quantity max_digits=15 decimal_places=5, more not stored
+_MAX_QUANTITY = Decimal('1e10')
+
+
+def parse_quantity(value):
+    """
+    Decimal from '2', '1,5', '1/2' or '½', None when not a number,
+    not above zero or too big for Stuff.quantity
+    """
+    value = (value or '').strip()
+    if value in _FRACTIONS:
+        return _FRACTIONS[value]
+
+    try:
+        if '/' in value:
+            numerator, denominator = value.split('/', 1)
+            value = Decimal(numerator) / Decimal(denominator)
+        else:
+            value = Decimal(value.replace(',', '.'))
+
+        if not value.is_finite() or not 0 < value < _MAX_QUANTITY:
+            return None
+
+        value = value.quantize(Decimal('0.00001'))
+        # Smaller than 0.00001 rounded to zero
+        return value if value > 0 else None
+    except (InvalidOperation, ValueError, ZeroDivisionError):
+        return None
+
+
+def parse_metric(value):
+    return METRIC_ALIASES.get((value or '').strip().lower().rstrip('.'))
+
+
+def _tokens(line):
+    tokens = []
+    for token in line.split():
+        # 2kg or 500gr written without space
+        match = _ATTACHED_RE.match(token)
+        if match and parse_metric(match.group(2)):
+            tokens.extend(match.groups())
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def parse_line(line):
+    """
+    (name, quantity, metric) from one free text line, None for empty line.
+    Understand '2 kg beras', 'beras 2kg', 'telur x10', '3x sabun', 'garam'
+    """
+    line = _BULLET_RE.sub('', line or '').strip()
+    if not line:
+        return None
+
+    tokens = _tokens(line)
+    quantity, metric = None, None
+
+    # Quantity first
+    if len(tokens) > 1:
+        times = _TIMES_RE.match(tokens[0])
+        if times:
+            quantity = parse_quantity(times.group(1) or times.group(2))
+            tokens = tokens[1:]
+        elif _NUMBER_RE.match(tokens[0]):
+            quantity = parse_quantity(tokens[0])
+            tokens = tokens[1:]
+            if len(tokens) > 1 and parse_metric(tokens[0]):
+                metric = parse_metric(tokens[0])
+                tokens = tokens[1:]
+
+    # Quantity last
+    if quantity is None and len(tokens) > 1:
+        times = _TIMES_RE.match(tokens[-1])
+        if times:
+            quantity = parse_quantity(times.group(1) or times.group(2))
+            tokens = tokens[:-1]
+        elif len(tokens) > 2 and _NUMBER_RE.match(tokens[-2]) and parse_metric(tokens[-1]):
+            quantity = parse_quantity(tokens[-2])
+            metric = parse_metric(tokens[-1])
+            tokens = tokens[:-2]
+        elif _NUMBER_RE.match(tokens[-1]):
+            quantity = parse_quantity(tokens[-1])
+            tokens = tokens[:-1]
+
+    name = ' '.join(tokens).strip(' ,;:-')[:255]
+    if not name:
+        return None
+    return name, quantity or Decimal(1), metric or PIECE
+
+
+def parse_text(content):
+    """(name, quantity, metric, note) of every line"""
+    items = [parse_line(x) for x in (content or '').splitlines()]
+    return [x + (None,) for x in items if x is not None]
+
+
+def parse_csv(content):
+    """
+    (name, quantity, metric, note) of every row. Header optional,
+    indonesian header (nama, jumlah, satuan, catatan) also understood
+    """
+    headers = {
+        'name': 'name', 'nama': 'name',
+        'quantity': 'quantity', 'qty': 'quantity', 'jumlah': 'quantity',
+        'metric': 'metric', 'unit': 'metric', 'satuan': 'metric',
+        'note': 'note', 'catatan': 'note',
+    }
+
+    content = (content or '').lstrip('\ufeff')
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+
+    rows = [x for x in csv.reader(io.StringIO(content), dialect) if any(y.strip() for y in x)]
+    columns = ['name', 'quantity', 'metric', 'note']
+    if rows and all(x.strip().lower() in headers for x in rows[0] if x.strip()):
+        columns = [headers.get(x.strip().lower()) for x in rows[0]]
+        rows = rows[1:]
+
+    items = []
+    for row in rows:
+        values = {k: v.strip() for k, v in zip(columns, row) if k}
+        if not values.get('quantity') and not values.get('metric'):
+            # Single column file is just a list of line
+            item = parse_line(values.get('name'))
+        else:
+            name = values.get('name', '')[:255]
+            item = (name, parse_quantity(values.get('quantity')) or Decimal(1),
+                    parse_metric(values.get('metric')) or PIECE) if name else None
+
+        if item is not None:
+            items.append(item + (values.get('note') or None,))
+    return items
+
+
+def import_stuffs(basket, user, items):
+    """
+    Create Stuff of every parsed item in one transaction.
+    Product matched by name in batch (near duplicate go to canonical),
+    missing one created in bulk, so no product lookup per stuff
+    """
+    Stuff = get_model('shopping', 'Stuff')
+
+    with transaction.atomic():
+        products = resolve_products([x[0] for x in items], user=user)
+        objs = [
+            Stuff(basket=basket, user=user, product=products.get(name.lower()), name=name,
+                  quantity=quantity, metric=metric, note=note, is_additional=basket.is_complete)
+            for name, quantity, metric, note in items
+        ]
+        Stuff.objects.bulk_create(objs, batch_size=500)
+
+    return objs
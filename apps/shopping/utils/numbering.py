@@ -0,0 +1,20 @@
+from utils.generals import get_model
+from utils.sequence import BlockSequence, autonomous
+from .constants import NUMBER_SEQUENCE_BLOCK_SIZE, ORDER_SEQUENCE, INVOICE_SEQUENCE
+
+
+def _lease(name, size):
+    NumberSequence = get_model('shopping', 'NumberSequence')
+    return autonomous(NumberSequence.objects.lease, name, size)
+
+
+_order_sequence = BlockSequence(ORDER_SEQUENCE, _lease, NUMBER_SEQUENCE_BLOCK_SIZE)
+_invoice_sequence = BlockSequence(INVOICE_SEQUENCE, _lease, NUMBER_SEQUENCE_BLOCK_SIZE)
+
+
+def order_number():
+    return '{:010d}'.format(_order_sequence.next())
+
+
+def invoice_number():
+    return 'INV{:010d}'.format(_invoice_sequence.next())
@@ -0,0 +1,196 @@
+import datetime
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.redis import get_redis_connection
+from utils.ewma import ewma_merge
+from .constants import PRICE_HALF_LIFE_DAYS, PRICE_MIN_LOCATION_COUNT, PRICE_BATCH_SIZE
+
+PRICE_LOCK_KEY = 'refresh_prices:lock'
+PRICE_HALF_LIFE = PRICE_HALF_LIFE_DAYS * 24 * 60 * 60
+
+
+def normalize_location(value):
+    return ' '.join((value or '').lower().split())[:255]
+
+
+def merge_rates(rows, prices, rated_at):
+    """
+    Merge rate rows (product id, metric, location, price, create_at) into
+    prices {(product id, metric, location): ProductPrice}, missing one
+    created unsaved. Rate count for its location and for all location.
+    Return ProductPrice changed
+    """
+    ProductPrice = get_model('shopping', 'ProductPrice')
+
+    keys, index = [], dict()
+    groups, times, values = [], [], []
+    for product_id, metric, location, price, create_at in rows:
+        for key in {(product_id, metric, normalize_location(location)), (product_id, metric, '')}:
+            if key not in index:
+                index[key] = len(keys)
+                keys.append(key)
+
+            groups.append(index[key])
+            times.append(create_at.timestamp())
+            values.append(price)
+
+    objs = []
+    for key in keys:
+        if key not in prices:
+            prices[key] = ProductPrice(product_id=key[0], metric=key[1], location=key[2])
+        objs.append(prices[key])
+
+    value_sum, weight_sum, reference = ewma_merge(
+        groups, times, values, PRICE_HALF_LIFE,
+        [x.value_sum for x in objs],
+        [x.weight_sum for x in objs],
+        [x.rated_at.timestamp() if x.count else -np.inf for x in objs]
+    )
+    counts = np.bincount(groups, minlength=len(objs))
+
+    for i, obj in enumerate(objs):
+        obj.value_sum = float(value_sum[i])
+        obj.weight_sum = float(weight_sum[i])
+        obj.rated_at = datetime.datetime.fromtimestamp(reference[i], tz=datetime.timezone.utc)
+        obj.count += int(counts[i])
+        obj.price = int(round(value_sum[i] / weight_sum[i]))
+        obj.last_rate_at = rated_at
+        obj.update_at = timezone.now()
+    return objs
+
+
+def _save_prices(objs):
+    ProductPrice = get_model('shopping', 'ProductPrice')
+
+    fields = ['price', 'value_sum', 'weight_sum', 'rated_at', 'count', 'last_rate_at', 'update_at']
+    with transaction.atomic():
+        ProductPrice.objects.bulk_create([x for x in objs if x.pk is None], batch_size=1000)
+        ProductPrice.objects.bulk_update([x for x in objs if x.pk is not None], fields, batch_size=1000)
+
+
+def refresh_prices(full=False):
+    """
+    Merge ProductRate updated since last refresh into ProductPrice,
+    batch by batch oldest first. Edited rate merged again with new price,
+    daily full refresh recompute from whole history and swap at once.
+    Return number of rate merged, None when other refresh in progress
+    """
+    ProductRate = get_model('shopping', 'ProductRate')
+    ProductPrice = get_model('shopping', 'ProductPrice')
+
+    connection = get_redis_connection()
+    lock = connection.lock(PRICE_LOCK_KEY, timeout=60 * 60, blocking_timeout=0)
+    if not lock.acquire():
+        return None
+
+    try:
+        prices, at, last_id = dict(), None, None
+        if not full:
+            at = ProductPrice.objects.aggregate(at=Max('last_rate_at'))['at']
+
+        queryset = ProductRate.objects \
+            .filter(product__isnull=False, metric__isnull=False, price__gt=0) \
+            .exclude(is_private=True) \
+            .annotate(item_id=Coalesce('product__canonical_id', 'product_id')) \
+            .order_by('update_at', 'id') \
+            .values_list('id', 'item_id', 'metric', 'location', 'price', 'create_at', 'update_at')
+
+        total = 0
+        while True:
+            q_after = Q()
+            if at is not None:
+                q_after = Q(update_at__gt=at)
+                if last_id is not None:
+                    q_after |= Q(update_at=at, id__gt=last_id)
+
+            rows = list(queryset.filter(q_after)[:PRICE_BATCH_SIZE])
+            if not rows:
+                break
+
+            last_id, at = rows[-1][0], rows[-1][6]
+            if not full:
+                prices = {
+                    (x.product_id, x.metric, x.location): x
+                    for x in ProductPrice.objects.filter(product_id__in={x[1] for x in rows})
+                }
+
+            objs = merge_rates([x[1:6] for x in rows], prices, at)
+            if not full:
+                _save_prices(objs)
+            total += len(rows)
+
+        if full:
+            with transaction.atomic():
+                ProductPrice.objects.all().delete()
+                ProductPrice.objects.bulk_create(prices.values(), batch_size=1000)
+        return total
+    finally:
+        lock.release()
+
+
+def estimate_amounts(rows):
+    """
+    Expected amount of every (product id, metric, quantity, location) row,
+    0 when never rated. One query whatever number of row
+    """
+    ProductPrice = get_model('shopping', 'ProductPrice')
+
+    rows = list(rows)
+    keys = [(x[0], x[1], normalize_location(x[3])) for x in rows]
+    if not keys:
+        return np.zeros(0)
+
+    prices = dict()
+    queryset = ProductPrice.objects \
+        .filter(product_id__in={x[0] for x in keys}, location__in={x[2] for x in keys} | {''}) \
+        .values_list('product_id', 'metric', 'location', 'price', 'count')
+    for product_id, metric, location, price, count in queryset:
+        # Few rate at one location less reliable than all location
+        if not location or count >= PRICE_MIN_LOCATION_COUNT:
+            prices[(product_id, metric, location)] = price
+
+    price = np.array([prices.get(x, prices.get((x[0], x[1], ''), 0)) for x in keys], dtype=float)
+    quantity = np.array([float(x[2] or 0) for x in rows], dtype=float)
+    return price * quantity
+
+
+def estimate_basket_amounts(basket_ids):
+    """
+    [int] expected amount of every basket from its stuff,
+    two query whatever number of basket
+    """
+    Stuff = get_model('shopping', 'Stuff')
+
+    basket_ids = list(basket_ids)
+    if not basket_ids:
+        return []
+
+    index = {x: i for i, x in enumerate(basket_ids)}
+    rows = list(
+        Stuff.objects
+        .filter(basket_id__in=list(index), product__isnull=False)
+        .annotate(item_id=Coalesce('product__canonical_id', 'product_id'))
+        .values_list('basket_id', 'item_id', 'metric', 'quantity', 'location', 'basket__location')
+    )
+
+    amounts = estimate_amounts([(x[1], x[2], x[3], x[4] or x[5]) for x in rows])
+    totals = np.bincount([index[x[0]] for x in rows], weights=amounts, minlength=len(basket_ids)) \
+        if rows else np.zeros(len(basket_ids))
+    return [int(round(x)) for x in totals.tolist()]
+
+
+def estimate_baskets(baskets):
+    """Set estimated_amount of every basket from its stuff"""
+    baskets = list(baskets)
+    amounts = estimate_basket_amounts([x.id for x in baskets])
+
+    for basket, amount in zip(baskets, amounts):
+        basket.estimated_amount = amount
+    return baskets
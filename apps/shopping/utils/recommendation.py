@@ -0,0 +1,140 @@
+import datetime
+
+import numpy as np
+
+from django.db import transaction
+from django.db.models import Sum, Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.redis import get_redis_connection
+from utils.cooccurrence import Cooccurrence
+from .constants import (
+    RECOMMENDATION_TOP_K,
+    RECOMMENDATION_MIN_SUPPORT,
+    RECOMMENDATION_MAX_BASKET_SIZE,
+    RECOMMENDATION_BATCH_SIZE,
+    RECOMMENDATION_LIMIT
+)
+
+RECOMMENDATION_LOCK_KEY = 'build_recommendations:lock'
+# Shared by every worker, whichever run the task continue the count
+RECOMMENDATION_STATE_KEY = 'build_recommendations:state'
+
+
+def basket_rows(basket_ids):
+    """
+    (basket id, product id) arrays of stuff in baskets,
+    merged duplicate counted as its canonical product
+    """
+    Stuff = get_model('shopping', 'Stuff')
+
+    rows = Stuff.objects \
+        .filter(basket_id__in=basket_ids, product__isnull=False) \
+        .annotate(item_id=Coalesce('product__canonical_id', 'product_id')) \
+        .values_list('basket_id', 'item_id')
+
+    rows = np.array(list(rows), dtype=np.int64).reshape(-1, 2)
+    return rows[:, 0], rows[:, 1]
+
+
+def _count_baskets(state, queryset):
+    """Feed baskets of queryset in batch, return product touched"""
+    touched, last_id = [], 0
+    while True:
+        basket_ids = list(queryset.filter(id__gt=last_id).order_by('id')
+                          .values_list('id', flat=True)[:RECOMMENDATION_BATCH_SIZE])
+        if not basket_ids:
+            break
+
+        last_id = basket_ids[-1]
+        basket_ids = np.setdiff1d(basket_ids, state.processed)
+        if len(basket_ids):
+            touched.append(state.add_baskets(*basket_rows(basket_ids.tolist()),
+                                             max_size=RECOMMENDATION_MAX_BASKET_SIZE))
+    return np.unique(np.concatenate(touched)) if touched else None
+
+
+def write_relations(state, products=None):
+    """
+    Replace ProductRelation of products (all when None) with top k of state.
+    One transaction, reader see old or new list never empty one
+    """
+    ProductRelation = get_model('shopping', 'ProductRelation')
+
+    product, related, score, support, rank = state.top_k(k=RECOMMENDATION_TOP_K,
+                                                         min_support=RECOMMENDATION_MIN_SUPPORT,
+                                                         products=products)
+
+    objs = [
+        ProductRelation(product_id=a, related_id=b, score=c, support=d, rank=e)
+        for a, b, c, d, e in zip(product.tolist(), related.tolist(), score.tolist(),
+                                 support.tolist(), rank.tolist())
+    ]
+
+    with transaction.atomic():
+        queryset = ProductRelation.objects.all()
+        if products is not None:
+            queryset = queryset.filter(product_id__in=list(products))
+        queryset.delete()
+        ProductRelation.objects.bulk_create(objs, batch_size=1000)
+    return len(objs)
+
+
+def build_recommendations(full=False):
+    """
+    Count product pair of completed basket not yet counted and rewrite
+    relation of product they touched. With full count restart from zero.
+    Count kept in Redis (RECOMMENDATION_STATE_KEY) between run.
+    Return number of relation written, None when other run in progress
+    """
+    Basket = get_model('shopping', 'Basket')
+
+    connection = get_redis_connection()
+    lock = connection.lock(RECOMMENDATION_LOCK_KEY, timeout=60 * 60, blocking_timeout=0)
+    if not lock.acquire():
+        return None
+
+    try:
+        queryset = Basket.objects.filter(is_complete=True)
+        if full:
+            state = Cooccurrence()
+        else:
+            state = Cooccurrence.loads(connection.get(RECOMMENDATION_STATE_KEY))
+            # complete_at move on every update, only recent one can be new
+            if len(state.processed):
+                since = timezone.now() - datetime.timedelta(days=1)
+                queryset = queryset.filter(complete_at__gte=since)
+
+        touched = _count_baskets(state, queryset)
+        if touched is None and not full:
+            return 0
+
+        connection.set(RECOMMENDATION_STATE_KEY, state.dumps())
+
+        # Lift of every pair change with basket total, touched one matter most
+        return write_relations(state, products=None if full else touched)
+    finally:
+        lock.release()
+
+
+def recommend_for_products(product_ids, limit=RECOMMENDATION_LIMIT):
+    """
+    [(product id, score)] best first, relation of every product summed,
+    product already given never recommended
+    """
+    ProductRelation = get_model('shopping', 'ProductRelation')
+
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+
+    rows = ProductRelation.objects \
+        .filter(product_id__in=product_ids, related__is_enabled=True) \
+        .exclude(related_id__in=product_ids) \
+        .values('related_id') \
+        .annotate(total=Sum('score'), support=Max('support')) \
+        .order_by('-total', '-support', 'related_id') \
+        .values_list('related_id', 'total')[:limit]
+    return list(rows)
@@ -0,0 +1,128 @@
+import datetime
+
+import numpy as np
+
+from django.db import transaction
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.geo import haversine_matrix
+from utils.route import plan_route
+from .constants import (
+    ROUTE_WINDOW_MINUTES,
+    ROUTE_HORIZON_HOURS,
+    ROUTE_SPEED_KMH,
+    ROUTE_STOP_MINUTES
+)
+
+
+def window_start(value):
+    window = ROUTE_WINDOW_MINUTES * 60
+    return datetime.datetime.fromtimestamp(value.timestamp() // window * window, tz=timezone.utc)
+
+
+def order_stops(latitudes, longitudes, origin=None):
+    """
+    Visit order of stops, index of latitudes/longitudes.
+    Path start from origin (latitude, longitude) when known,
+    otherwise from the stop farthest from the others.
+    Return (order, distance in meter from previous point for each stop)
+    """
+    latitudes, longitudes = list(latitudes), list(longitudes)
+    if origin is not None:
+        latitudes.insert(0, origin[0])
+        longitudes.insert(0, origin[1])
+
+    distance = haversine_matrix(latitudes, longitudes, latitudes, longitudes)
+    # Without origin start from the outermost stop, path end on other side
+    start = 0 if origin is not None else int(np.argmax(distance.sum(axis=1)))
+    tour = plan_route(distance, start)
+
+    legs = [0.0] + [float(distance[a, b]) for a, b in zip(tour, tour[1:])]
+    if origin is not None:
+        return [x - 1 for x in tour[1:]], legs[1:]
+    return tour, legs
+
+
+def _is_located(latitude, longitude):
+    return latitude is not None and longitude is not None \
+        and (float(latitude) != 0 or float(longitude) != 0)
+
+
+def plan_routes(now=None):
+    """
+    Group upcoming deliveries by courier and schedule window,
+    order each group as short path and save sequence and ETA.
+    Return number of route planned
+    """
+    OrderDelivery = get_model('shopping', 'OrderDelivery')
+    DeliveryRoute = get_model('shopping', 'DeliveryRoute')
+    AssignTracking = get_model('shopping', 'AssignTracking')
+
+    now = now or timezone.now()
+    until = now + datetime.timedelta(hours=ROUTE_HORIZON_HOURS)
+
+    # Courier removed, delivery no longer part of route
+    OrderDelivery.objects \
+        .filter(courier__isnull=True, delivery_route__isnull=False) \
+        .update(delivery_route=None, route_sequence=None, route_eta=None)
+
+    deliveries = OrderDelivery.objects \
+        .filter(courier__isnull=False, order__is_complete=False,
+                order_schedule__datetime__gte=now, order_schedule__datetime__lt=until) \
+        .values_list('id', 'courier_id', 'order_schedule__datetime', 'latitude', 'longitude')
+
+    groups = dict()
+    for delivery_id, courier_id, schedule, latitude, longitude in deliveries:
+        groups.setdefault((courier_id, window_start(schedule)), []) \
+            .append((delivery_id, schedule, latitude, longitude))
+
+    speed = ROUTE_SPEED_KMH * 1000 / 3600
+    stop_time = ROUTE_STOP_MINUTES * 60
+    planned_ids = []
+
+    for (courier_id, start_at), stops in groups.items():
+        located = [x for x in stops if _is_located(x[2], x[3])]
+        unlocated = sorted((x for x in stops if not _is_located(x[2], x[3])), key=lambda x: x[1])
+
+        # Courier who also shop start from last tracked point
+        origin = AssignTracking.objects \
+            .filter(assign__assistant_id=courier_id) \
+            .order_by('-recorded_at', '-create_at') \
+            .values_list('latitude', 'longitude') \
+            .first()
+        origin = (float(origin[0]), float(origin[1])) if origin and _is_located(*origin) else None
+
+        order, legs = [], []
+        if located:
+            order, legs = order_stops([float(x[2]) for x in located],
+                                      [float(x[3]) for x in located], origin=origin)
+
+        objs, elapsed = [], 0.0
+        for sequence, (index, leg) in enumerate(zip(order, legs)):
+            elapsed += leg / speed + (stop_time if sequence else 0)
+            objs.append(OrderDelivery(id=located[index][0], route_sequence=sequence,
+                                      route_eta=start_at + datetime.timedelta(seconds=int(elapsed))))
+
+        # No map pin, put at the end without ETA
+        for sequence, stop in enumerate(unlocated, start=len(objs)):
+            objs.append(OrderDelivery(id=stop[0], route_sequence=sequence, route_eta=None))
+
+        with transaction.atomic():
+            route, _created = DeliveryRoute.objects.update_or_create(
+                courier_id=courier_id, start_at=start_at,
+                defaults={'distance': int(sum(legs)), 'duration': int(elapsed)}
+            )
+
+            for obj in objs:
+                obj.delivery_route_id = route.id
+            OrderDelivery.objects.bulk_update(objs, ['delivery_route', 'route_sequence', 'route_eta'],
+                                              batch_size=500)
+        planned_ids.append(route.id)
+
+    # Route left without delivery, eg. courier changed
+    DeliveryRoute.objects \
+        .filter(start_at__lt=until, order_delivery__isnull=True) \
+        .delete()
+
+    return len(planned_ids)
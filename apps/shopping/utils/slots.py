@@ -0,0 +1,26 @@
+import datetime
+
+from django.utils import timezone
+
+from .constants import SLOT_MINUTES, SLOT_OPEN_HOUR, SLOT_CLOSE_HOUR
+
+
+def slot_start(value):
+    """Start of slot the datetime fall in, aware local time"""
+    value = timezone.localtime(value)
+    minutes = (value.hour * 60 + value.minute) // SLOT_MINUTES * SLOT_MINUTES
+    return value.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+def is_open_slot(start_at):
+    start_at = timezone.localtime(start_at)
+    return SLOT_OPEN_HOUR * 60 <= start_at.hour * 60 + start_at.minute \
+        and start_at.hour * 60 + start_at.minute + SLOT_MINUTES <= SLOT_CLOSE_HOUR * 60
+
+
+def day_slots(date):
+    """All slot start of one local date"""
+    tz = timezone.get_current_timezone()
+    first = timezone.make_aware(datetime.datetime.combine(date, datetime.time(SLOT_OPEN_HOUR)), tz)
+    count = (SLOT_CLOSE_HOUR - SLOT_OPEN_HOUR) * 60 // SLOT_MINUTES
+    return [first + datetime.timedelta(minutes=SLOT_MINUTES * x) for x in range(count)]
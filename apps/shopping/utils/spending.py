@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.utils import timezone
+
+from utils.generals import get_model
+
+# Column of PurchasedStuff the rollup depend on
+SPENDING_FIELDS = ['create_at', 'name', 'location', 'amount', 'is_found']
+
+
+def month_of(value):
+    """First day of month in local time, the rollup period"""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def contribution(user_id, create_at, name, product_id, location, amount, is_found):
+    """
+    What one purchased stuff add to rollup,
+    None when nothing (not found or no price yet)
+    """
+    if not is_found or not amount or amount <= 0 or user_id is None or create_at is None:
+        return None
+
+    return {
+        'user_id': user_id,
+        'month': month_of(create_at),
+        'name': (name or '').strip()[:255],
+        'product_id': product_id,
+        'location': (location or '').strip()[:255],
+        'amount': amount,
+    }
+
+
+def _instance_contribution(instance, values):
+    stuff = instance.stuff
+    return contribution(instance.basket.user_id, values['create_at'],
+                        values['name'] or stuff.name, stuff.product_id,
+                        values['location'], values['amount'], values['is_found'])
+
+
+def rollup_changes(old, new):
+    """
+    Difference between old and new contribution as list of
+    (model name, key, product_id, amount, count), nothing for unchanged row
+    """
+    changes = dict()
+    for item, sign in ((old, -1), (new, 1)):
+        if item is None:
+            continue
+
+        keys = [('SpendingProduct', (item['user_id'], item['month'], 'name', item['name']))]
+        if item['location']:
+            keys.append(('SpendingLocation', (item['user_id'], item['month'], 'location', item['location'])))
+
+        for key in keys:
+            value = changes.setdefault(key, [None, 0, 0])
+            value[0] = value[0] or item['product_id']
+            value[1] += sign * item['amount']
+            value[2] += sign
+
+    return [
+        (model_name, key, product_id, amount, count)
+        for (model_name, key), (product_id, amount, count) in changes.items()
+        if amount or count
+    ]
+
+
+def update_spending(instance, created=False, deleted=False):
+    """
+    Move contribution of purchased stuff in rollup from value
+    when loaded (or last applied) to current value
+    """
+    if created:
+        old = None
+    elif hasattr(instance, '_spending'):
+        old = instance._spending
+    else:
+        loaded = getattr(instance, '_loaded_values', None) or {}
+        # Deferred when loaded, can't know what to take back
+        if not all(x in loaded for x in SPENDING_FIELDS):
+            return
+        old = _instance_contribution(instance, loaded)
+
+    new = None
+    if not deleted:
+        new = _instance_contribution(instance, {x: getattr(instance, x) for x in SPENDING_FIELDS})
+
+    for model_name, (user_id, month, column, label), product_id, amount, count in rollup_changes(old, new):
+        defaults = {'product_id': product_id} if model_name == 'SpendingProduct' else None
+        get_model('shopping', model_name).objects \
+            .add(amount, count=count, defaults=defaults, user_id=user_id, month=month, **{column: label})
+
+    # Saved again from same instance start from here
+    instance._spending = new
+
+
+def rebuild_spending(user_ids, chunk_size=2000):
+    """
+    Recompute rollup of users from whole history.
+    Old row deleted first in same transaction, lock held on rollup
+    of these users make live update wait and apply on top of rebuild
+    """
+    PurchasedStuff = get_model('shopping', 'PurchasedStuff')
+    SpendingProduct = get_model('shopping', 'SpendingProduct')
+    SpendingLocation = get_model('shopping', 'SpendingLocation')
+
+    with transaction.atomic():
+        SpendingProduct.objects.filter(user_id__in=user_ids).delete()
+        SpendingLocation.objects.filter(user_id__in=user_ids).delete()
+
+        rows = PurchasedStuff.objects \
+            .filter(basket__user_id__in=user_ids, is_found=True, amount__gt=0) \
+            .order_by() \
+            .values_list('basket__user_id', 'create_at', 'name', 'stuff__name', 'stuff__product_id',
+                         'location', 'amount', 'is_found')
+
+        totals = dict()
+        for user_id, create_at, name, stuff_name, product_id, location, amount, is_found \
+                in rows.iterator(chunk_size=chunk_size):
+            item = contribution(user_id, create_at, name or stuff_name, product_id,
+                                location, amount, is_found)
+            for model_name, key, product_id, amount, count in rollup_changes(None, item):
+                value = totals.setdefault((model_name, key), [product_id, 0, 0])
+                value[1] += amount
+                value[2] += count
+
+        objs = {'SpendingProduct': [], 'SpendingLocation': []}
+        for (model_name, (user_id, month, column, label)), (product_id, amount, count) in totals.items():
+            extra = {'product_id': product_id} if model_name == 'SpendingProduct' else {}
+            objs[model_name].append(get_model('shopping', model_name)(
+                user_id=user_id, month=month, amount=amount, count=count, **{column: label}, **extra))
+
+        SpendingProduct.objects.bulk_create(objs['SpendingProduct'], batch_size=500)
+        SpendingLocation.objects.bulk_create(objs['SpendingLocation'], batch_size=500)
+
+    return len(objs['SpendingProduct']) + len(objs['SpendingLocation'])
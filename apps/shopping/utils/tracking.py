@@ -0,0 +1,147 @@
+import json
+import datetime
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from utils.generals import get_model
+from utils.redis import get_redis_connection
+from utils.geo import geohash_encode, drop_stationary, douglas_peucker
+from .constants import (
+    TRACKING_GEOHASH_PRECISION,
+    TRACKING_STATIONARY_DISTANCE,
+    TRACKING_SIMPLIFY_TOLERANCE,
+    LIVE_LOCATION_TIMEOUT
+)
+
+BUFFER_KEY = 'assign_tracking:buffer:{}'
+PENDING_KEY = 'assign_tracking:pending'
+LAST_POINT_KEY = 'assign_tracking:last:{}'
+LAST_POINT_TIMEOUT = 60 * 60 * 24
+LIVE_LOCATION_KEY = 'assign_location:{}'
+
+
+def live_location_group(assign_uuid):
+    return 'assign_location_%s' % assign_uuid
+
+
+def buffer_points(assign_id, points):
+    """
+    Append points of one assign to redis list, point is
+    (latitude, longitude, recorded_at timestamp, location).
+    Return buffer length so caller can flush early
+    """
+    connection = get_redis_connection()
+    pipe = connection.pipeline()
+    pipe.rpush(BUFFER_KEY.format(assign_id), *[json.dumps(x) for x in points])
+    pipe.sadd(PENDING_KEY, assign_id)
+    length, _added = pipe.execute()
+    return length
+
+
+def pending_assigns():
+    connection = get_redis_connection()
+    return [int(x) for x in connection.smembers(PENDING_KEY)]
+
+
+def take_points(assign_id):
+    """Read and clear buffer in one transaction, point never taken twice"""
+    connection = get_redis_connection()
+    key = BUFFER_KEY.format(assign_id)
+
+    connection.srem(PENDING_KEY, assign_id)
+    pipe = connection.pipeline(transaction=True)
+    pipe.lrange(key, 0, -1)
+    pipe.delete(key)
+    raw, _deleted = pipe.execute()
+    return raw
+
+
+def restore_points(assign_id, raw):
+    """Put back points when insert failed, kept in front of newer one"""
+    connection = get_redis_connection()
+    pipe = connection.pipeline()
+    pipe.lpush(BUFFER_KEY.format(assign_id), *reversed(raw))
+    pipe.sadd(PENDING_KEY, assign_id)
+    pipe.execute()
+
+
+def flush_points(assign_id):
+    """
+    Move buffered points of one assign to database with one bulk insert.
+    Stationary point dropped then the line simplified by Douglas-Peucker
+    """
+    AssignTracking = get_model('shopping', 'AssignTracking')
+    connection = get_redis_connection()
+
+    raw = take_points(assign_id)
+    if not raw:
+        return 0
+
+    points = sorted((json.loads(x) for x in raw), key=lambda x: x[2])
+    last_key = LAST_POINT_KEY.format(assign_id)
+    last = connection.get(last_key)
+    last = json.loads(last) if last else None
+
+    points = drop_stationary(points, TRACKING_STATIONARY_DISTANCE, last=last)
+    points = douglas_peucker(points, TRACKING_SIMPLIFY_TOLERANCE)
+    if not points:
+        return 0
+
+    objs = [
+        AssignTracking(
+            assign_id=assign_id,
+            latitude=round(latitude, 6),
+            longitude=round(longitude, 6),
+            geohash=geohash_encode(latitude, longitude, TRACKING_GEOHASH_PRECISION),
+            recorded_at=datetime.datetime.fromtimestamp(recorded_at, tz=timezone.utc),
+            location=location
+        )
+        for latitude, longitude, recorded_at, location in points
+    ]
+
+    try:
+        AssignTracking.objects.bulk_create(objs, batch_size=500)
+    except Exception:
+        restore_points(assign_id, raw)
+        raise
+
+    connection.set(last_key, json.dumps(points[-1]), ex=LAST_POINT_TIMEOUT)
+    return len(objs)
+
+
+def get_live_location(assign_uuid):
+    connection = get_redis_connection()
+    value = connection.get(LIVE_LOCATION_KEY.format(assign_uuid))
+    return json.loads(value) if value else None
+
+
+def publish_live_location(assign_uuid, point):
+    """
+    Latest point of the batch to customer watching the assign.
+    Saved to redis first so new subscriber get it without database
+    """
+    latitude, longitude, recorded_at, _location = point
+    location = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'recorded_at': datetime.datetime.fromtimestamp(recorded_at, tz=timezone.utc).isoformat(timespec='microseconds'),
+    }
+
+    connection = get_redis_connection()
+    key = LIVE_LOCATION_KEY.format(assign_uuid)
+    current = connection.get(key)
+
+    # Batch sent late from offline device older than what already shown
+    if current and json.loads(current)['recorded_at'] >= location['recorded_at']:
+        return
+
+    connection.set(key, json.dumps(location), ex=LIVE_LOCATION_TIMEOUT)
+    async_to_sync(get_channel_layer().group_send)(
+        live_location_group(assign_uuid),
+        {
+            'type': 'assign_location_handler',
+            'location': location
+        }
+    )
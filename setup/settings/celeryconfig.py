@@ -4,3 +4,58 @@ broker_url = settings.REDIS_URL
 broker_transport_options = {'visibility_timeout': 3600} 
 result_backend = settings.REDIS_URL
 task_serializer = 'json'
+
+beat_schedule = {
+    'clean-upload-sessions': {
+        'task': 'apps.shopping.tasks.clean_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    'collect-orphan-blobs': {
+        'task': 'apps.shopping.tasks.collect_orphan_blobs',
+        'schedule': 60 * 60 * 6,
+    },
+    'process-pending-payment-notifications': {
+        'task': 'apps.shopping.tasks.process_pending_payment_notifications',
+        'schedule': 60 * 5,
+    },
+    'flush-assign-trackings': {
+        'task': 'apps.shopping.tasks.flush_assign_trackings',
+        'schedule': 30,
+    },
+    'dispatch-waiting-orders': {
+        'task': 'apps.shopping.tasks.dispatch_waiting_orders',
+        'schedule': 60 * 5,
+    },
+    'plan-delivery-routes': {
+        'task': 'apps.shopping.tasks.plan_delivery_routes',
+        'schedule': 60 * 15,
+    },
+    'flush-assign-logs': {
+        'task': 'apps.shopping.tasks.flush_assign_logs',
+        'schedule': 10,
+    },
+    'clean-export-jobs': {
+        'task': 'apps.shopping.tasks.clean_export_jobs',
+        'schedule': 60 * 60,
+    },
+    'update-recommendations': {
+        'task': 'apps.shopping.tasks.update_recommendations',
+        'schedule': 60 * 15,
+    },
+    'rebuild-recommendations': {
+        'task': 'apps.shopping.tasks.rebuild_recommendations',
+        'schedule': 60 * 60 * 24,
+    },
+    'count-habit-baskets': {
+        'task': 'apps.shopping.tasks.count_habit_baskets',
+        'schedule': 60 * 15,
+    },
+    'update-product-prices': {
+        'task': 'apps.shopping.tasks.update_product_prices',
+        'schedule': 60 * 15,
+    },
+    'rebuild-product-prices': {
+        'task': 'apps.shopping.tasks.rebuild_product_prices',
+        'schedule': 60 * 60 * 24,
+    },
+}
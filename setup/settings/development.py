@@ -112,3 +112,11 @@ if DEBUG and not IS_UNIX:
     DEBUG_TOOLBAR_CONFIG = {
         'INTERCEPT_REDIRECTS': False,
     }
+
+
+# Django Rest Framework (DRF)
+# ------------------------------------------------------------------------------
+# Browsable API on local still need session login
+REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+    'rest_framework.authentication.SessionAuthentication',
+] + REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES']
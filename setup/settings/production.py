@@ -3,6 +3,8 @@ from .project import *
 
 import sentry_sdk
 
+from django.core.exceptions import ImproperlyConfigured
+
 from sentry_sdk.integrations.django import DjangoIntegration
 from corsheaders.defaults import default_headers
 
@@ -76,6 +78,14 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 ]
 
 
+# Django Rest Framework (DRF)
+# ------------------------------------------------------------------------------
+# Browsable API not needed by app client, json only
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+    'utils.renderers.ORJSONRenderer',
+]
+
+
 # Static files (CSS, JavaScript, Images)
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
@@ -85,6 +95,14 @@ STATIC_ROOT = os.path.join(PROJECT_PATH, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(PROJECT_PATH, 'media')
 
+# nginx:
+# location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+SENDFILE_BACKEND = 'nginx'
+
+MIDTRANS_IS_PRODUCTION = True
+if not MIDTRANS_SERVER_KEY:
+    raise ImproperlyConfigured("MIDTRANS_SERVER_KEY is required to verify payment notification")
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -94,6 +94,14 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(PROJECT_PATH, 'media/')
 
 
+# Protected media
+# ------------------------------------------------------------------------------
+# Authorization in django, transfer by front proxy. See utils/sendfile.py
+# None stream from python (development), 'nginx' or 'apache'
+SENDFILE_BACKEND = None
+SENDFILE_URL = '/protected-media/'
+
+
 # Django Simple JWT
 # ------------------------------------------------------------------------------
 # https://github.com/davesque/django-rest-framework-simplejwt
@@ -106,12 +114,13 @@ SIMPLE_JWT = {
 # ------------------------------------------------------------------------------
 # https://www.django-rest-framework.org/
 REST_FRAMEWORK = {
+    # orjson, much faster than stdlib json on big list
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'utils.renderers.ORJSONParser',
         'rest_framework.parsers.FormParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'utils.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     # Use Django's standard `django.contrib.auth` permissions,
@@ -120,9 +129,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication'
+        'apps.person.utils.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.NamespaceVersioning',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -141,6 +148,14 @@ REDIS_PORT = '6379'
 REDIS_URL = 'redis://' + REDIS_HOST + ':' + REDIS_PORT
 
 
+# Midtrans
+# ------------------------------------------------------------------------------
+# Server key also used to verify notification signature
+MIDTRANS_IS_PRODUCTION = False
+MIDTRANS_SERVER_KEY = os.environ.get('MIDTRANS_SERVER_KEY', '')
+MIDTRANS_CLIENT_KEY = os.environ.get('MIDTRANS_CLIENT_KEY', '')
+
+
 # Firebase configuration
 FIREBASE_CRED_FILE = '%s/%s' % (PROJECT_PATH, 'firebase-cred.json')
 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = FIREBASE_CRED_FILE
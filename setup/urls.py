@@ -10,6 +10,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
 ]
 
+# Only when DEBUG, production media served by web server. Attachment url given
+# by serializers always point to shopping_api:customer:media (access checked)
 urlpatterns += static(settings.MEDIA_URL,
                       document_root=settings.MEDIA_ROOT)
 urlpatterns += static(settings.STATIC_URL,
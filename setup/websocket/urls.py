@@ -1,8 +1,9 @@
 from django.urls import path
 
 # Channels
-from apps.shopping.consumers import BasketConsumer
+from apps.shopping.consumers import BasketConsumer, AssignLocationConsumer
 
 websocket_urlpatterns = [
     path('ws/basket/<uuid:basket_uuid>/', BasketConsumer.as_asgi()),
+    path('ws/assign/<uuid:assign_uuid>/location/', AssignLocationConsumer.as_asgi()),
 ]
@@ -0,0 +1,92 @@
+import math
+import hashlib
+
+from utils.redis import get_redis_connection
+
+# Set bits to the filter, and to the one being rebuilt if any, in one step
+# so a value added while rebuild never lost by the swap
+_ADD_SCRIPT = """
+local rebuilding = redis.call('EXISTS', KEYS[2])
+for _, offset in ipairs(ARGV) do
+    redis.call('SETBIT', KEYS[1], offset, 1)
+    if rebuilding == 1 then
+        redis.call('SETBIT', KEYS[2], offset, 1)
+    end
+end
+return rebuilding
+"""
+
+
+class BloomFilter:
+    """
+    Bloom filter on top of redis bitmap (SETBIT/GETBIT), no redis module needed.
+    False mean definitely not added, True mean maybe added.
+    """
+    def __init__(self, key, capacity=1000000, error_rate=0.001):
+        self.key = key
+        self.rebuild_key = '%s_rebuild' % key
+        self.size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+
+    @property
+    def connection(self):
+        return get_redis_connection()
+
+    def offsets(self, value):
+        # Double hashing (Kirsch-Mitzenmacher), two 64-bit from one digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def exists(self):
+        return bool(self.connection.exists(self.key))
+
+    def add(self, value):
+        self.add_many([value])
+
+    def add_many(self, values, key=None):
+        offsets = [offset for value in values for offset in self.offsets(value)]
+        if not offsets:
+            return
+
+        if key is None:
+            self.connection.eval(_ADD_SCRIPT, 2, self.key, self.rebuild_key, *offsets)
+            return
+
+        pipe = self.connection.pipeline(transaction=False)
+        for offset in offsets:
+            pipe.setbit(key, offset, 1)
+        pipe.execute()
+
+    def contains(self, value):
+        pipe = self.connection.pipeline(transaction=False)
+        for offset in self.offsets(value):
+            pipe.getbit(self.key, offset)
+        return all(pipe.execute())
+
+    def rebuild(self, values, chunk_size=1000):
+        """
+        Fill new bitmap then swap, reader never see half built filter.
+        Value added meanwhile set on both (see _ADD_SCRIPT)
+        """
+        tmp_key = self.rebuild_key
+        connection = self.connection
+
+        # Set last bit so the key exist even no values, add start using it
+        pipe = connection.pipeline(transaction=True)
+        pipe.delete(tmp_key)
+        pipe.setbit(tmp_key, self.size - 1, 0)
+        pipe.execute()
+
+        chunk = []
+        for value in values:
+            chunk.append(value)
+            if len(chunk) >= chunk_size:
+                self.add_many(chunk, key=tmp_key)
+                chunk = []
+
+        if chunk:
+            self.add_many(chunk, key=tmp_key)
+
+        connection.rename(tmp_key, self.key)
@@ -0,0 +1,134 @@
+import io
+
+import numpy as np
+
+_ID_BITS = 32
+_ID_MASK = (1 << _ID_BITS) - 1
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def _merge(keys, counts, new_keys, new_counts):
+    """Sum counts of same key, result sorted by key"""
+    keys = np.concatenate([keys, new_keys])
+    counts = np.concatenate([counts, new_counts])
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse, weights=counts, minlength=len(keys)).astype(np.int64)
+
+
+def _pairs(size, cache={}):
+    if size not in cache:
+        cache[size] = np.triu_indices(size, k=1)
+    return cache[size]
+
+
+class Cooccurrence:
+    """
+    Sparse symmetric count of product bought in same basket.
+
+    Pair stored both way as key (a << 32 | b) in sorted array so every
+    pair of one product is a contiguous slice, item count is number of
+    basket containing the product, processed basket never counted twice
+    """
+    def __init__(self):
+        self.keys, self.counts = _EMPTY, _EMPTY
+        self.items, self.item_counts = _EMPTY, _EMPTY
+        self.processed = _EMPTY
+        self.baskets = 0
+
+    def add_baskets(self, basket_ids, product_ids, max_size=100):
+        """
+        Count rows of (basket, product), return product touched.
+        Basket bigger than max_size (stock up, not a real combination) skipped
+        """
+        basket_ids = np.asarray(basket_ids, dtype=np.int64)
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+
+        rows = np.unique((basket_ids << _ID_BITS) | product_ids)
+        rows = rows[~np.isin(rows >> _ID_BITS, self.processed)]
+        if not len(rows):
+            return _EMPTY
+
+        baskets, products = rows >> _ID_BITS, rows & _ID_MASK
+        starts = np.flatnonzero(np.r_[True, baskets[1:] != baskets[:-1]])
+        ends = np.r_[starts[1:], len(rows)]
+
+        firsts, seconds, kept = [], [], []
+        for start, end in zip(starts, ends):
+            size = end - start
+            if size > max_size:
+                continue
+
+            kept.append(products[start:end])
+            if size > 1:
+                i, j = _pairs(size)
+                firsts.append(products[start:end][i])
+                seconds.append(products[start:end][j])
+
+        if kept:
+            touched = np.unique(np.concatenate(kept))
+            self.items, self.item_counts = _merge(self.items, self.item_counts,
+                                                  *np.unique(np.concatenate(kept), return_counts=True))
+        else:
+            touched = _EMPTY
+
+        if firsts:
+            a, b = np.concatenate(firsts), np.concatenate(seconds)
+            keys = np.concatenate([(a << _ID_BITS) | b, (b << _ID_BITS) | a])
+            self.keys, self.counts = _merge(self.keys, self.counts,
+                                            *np.unique(keys, return_counts=True))
+
+        self.baskets += len(kept)
+        self.processed = np.union1d(self.processed, np.unique(baskets))
+        return touched
+
+    def top_k(self, k=20, min_support=3, products=None):
+        """
+        Best k related product per product by lift
+        lift(a, b) = P(a and b) / (P(a) P(b)), above 1 mean bought together
+        more than chance. Pair seen less than min_support ignored as noise.
+        Return arrays (product, related, lift, support, rank), product
+        ascending then lift descending, rank from zero per product
+        """
+        keys, counts = self.keys, self.counts
+        mask = counts >= min_support
+        if products is not None:
+            mask &= np.isin(keys >> _ID_BITS, np.asarray(products, dtype=np.int64))
+        keys, counts = keys[mask], counts[mask]
+        if not len(keys):
+            return _EMPTY, _EMPTY, np.zeros(0), _EMPTY, _EMPTY
+
+        a, b = keys >> _ID_BITS, keys & _ID_MASK
+        count_a = self.item_counts[np.searchsorted(self.items, a)]
+        count_b = self.item_counts[np.searchsorted(self.items, b)]
+        lift = counts * float(self.baskets) / (count_a * count_b)
+
+        order = np.lexsort((b, -lift, a))
+        a, b, lift, counts = a[order], b[order], lift[order], counts[order]
+
+        starts = np.flatnonzero(np.r_[True, a[1:] != a[:-1]])
+        sizes = np.diff(np.r_[starts, len(a)])
+        rank = np.arange(len(a)) - np.repeat(starts, sizes)
+        keep = rank < k
+        return a[keep], b[keep], lift[keep], counts[keep], rank[keep]
+
+    def dumps(self):
+        """Compressed bytes of the state, kept in shared storage between run"""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, keys=self.keys, counts=self.counts, items=self.items,
+                            item_counts=self.item_counts, processed=self.processed,
+                            baskets=np.int64(self.baskets))
+        return buffer.getvalue()
+
+    @classmethod
+    def loads(cls, data):
+        """State from dumps() bytes, empty state when data empty"""
+        instance = cls()
+        if not data:
+            return instance
+
+        with np.load(io.BytesIO(data)) as data:
+            instance.keys, instance.counts = data['keys'], data['counts']
+            instance.items, instance.item_counts = data['items'], data['item_counts']
+            instance.processed = data['processed']
+            instance.baskets = int(data['baskets'])
+        return instance
@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def decay(elapsed, half_life):
+    """Weight left after elapsed time, half every half_life"""
+    return np.exp2(-np.asarray(elapsed, dtype=float) / half_life)
+
+
+def ewma_merge(groups, times, values, half_life, value_sum, weight_sum, time):
+    """
+    Add observations to exponentially weighted average of every group at once.
+
+    State of group n is (value_sum, weight_sum, time), sums weighted as seen
+    from time so state merged later without the old observations.
+    New group start with zero sums and time -inf.
+    groups is index of group of each observation.
+    Return new (value_sum, weight_sum, time), average is value_sum / weight_sum
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    size = len(value_sum)
+
+    reference = np.array(time, dtype=float)
+    np.maximum.at(reference, groups, times)
+
+    # New group has nothing to carry, avoid inf - inf
+    time = np.asarray(time, dtype=float)
+    old = decay(reference - np.where(np.isfinite(time), time, reference), half_life)
+    weight = decay(reference[groups] - times, half_life)
+
+    value_sum = np.asarray(value_sum, dtype=float) * old \
+        + np.bincount(groups, weights=weight * values, minlength=size)
+    weight_sum = np.asarray(weight_sum, dtype=float) * old \
+        + np.bincount(groups, weights=weight, minlength=size)
+    return value_sum, weight_sum, reference
@@ -1,11 +1,15 @@
 import os
+import uuid
+import hashlib
 import calendar
 import time
 
+from django.core.files import File
 from django.core.files.storage import FileSystemStorage
 from django.template.defaultfilters import slugify
 
 ALLOWED_EXTENSIONS = ['.jpeg', '.jpg', '.png', '.pdf', '.docx']
+BLOB_DIR = 'blobs'
 
 
 class FileSystemStorageExtend(FileSystemStorage):
@@ -27,6 +31,68 @@ class FileSystemStorageExtend(FileSystemStorage):
                 dirname, self.get_valid_name(slugify(filename)+file_ext)))
 
 
+class HashingFile(File):
+    """Update SHA-256 digest while storage reading the chunks"""
+    def __init__(self, content):
+        super().__init__(content, content.name)
+        self.digest = hashlib.sha256()
+
+    def chunks(self, chunk_size=None):
+        for chunk in self.file.chunks(chunk_size):
+            self.digest.update(chunk)
+            yield chunk
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store file once by SHA-256 of content.
+    Output: blobs/ab/cd/abcd...ef.jpg, same content always same name
+    so the second upload share the file.
+    """
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+        content = HashingFile(content)
+
+        # Single pass, write to temporary name then move by hash
+        tmp_name = super()._save(os.path.join(BLOB_DIR, 'tmp', uuid.uuid4().hex + ext), content)
+        checksum = content.digest.hexdigest()
+        name = os.path.join(BLOB_DIR, checksum[:2], checksum[2:4], checksum + ext)
+
+        # Always move the fresh copy in place, existing one may be removed by
+        # collect_orphan_blobs right now. New mtime keep it away until referenced
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        os.replace(self.path(tmp_name), self.path(name))
+        return name
+
+    def blob_names(self):
+        """Name of every stored blob, same as Blob.path, temporary file excluded"""
+        root = self.path(BLOB_DIR)
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == root:
+                dirnames[:] = [x for x in dirnames if x != 'tmp']
+
+            for filename in filenames:
+                name = os.path.relpath(os.path.join(dirpath, filename), self.location)
+                yield name.replace(os.sep, '/')
+
+    def clean_tmp(self, before):
+        """Remove temporary file of failed save older than before (datetime), return count"""
+        tmp_dir = os.path.join(BLOB_DIR, 'tmp')
+        if not self.exists(tmp_dir):
+            return 0
+
+        total = 0
+        for filename in self.listdir(tmp_dir)[1]:
+            name = os.path.join(tmp_dir, filename)
+            if self.get_modified_time(name) < before:
+                self.delete(name)
+                total += 1
+        return total
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
 def handle_upload_attachment(instance, file):
     if instance and file:
         name, ext = os.path.splitext(file.name)
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS = 6371000.0
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    """Distance in meter between two coordinate"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 \
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(min(1.0, a)))
+
+
+def haversine_matrix(lat1, lng1, lat2, lng2):
+    """
+    Distance in meter from every point of first set (rows)
+    to every point of second set (columns), arrays in degree
+    """
+    lat1 = np.radians(np.asarray(lat1, dtype=float))[:, None]
+    lng1 = np.radians(np.asarray(lng1, dtype=float))[:, None]
+    lat2 = np.radians(np.asarray(lat2, dtype=float))[None, :]
+    lng2 = np.radians(np.asarray(lng2, dtype=float))[None, :]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 \
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+
+def geohash_encode(latitude, longitude, precision=9):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    result, bits, bit, is_lng = [], 0, 0, True
+
+    while len(result) < precision:
+        value, span = (longitude, lng_range) if is_lng else (latitude, lat_range)
+        middle = (span[0] + span[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            span[0] = middle
+        else:
+            bits = bits * 2
+            span[1] = middle
+
+        is_lng = not is_lng
+        bit += 1
+        if bit == 5:
+            result.append(GEOHASH_BASE32[bits])
+            bits, bit = 0, 0
+    return ''.join(result)
+
+
+def geohash_cell_size(precision):
+    """(height, width) in degree of one cell"""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lng_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def geohash_cover(south, west, north, east, max_cells=32):
+    """
+    Geohash prefixes covering the bounding box, as long as possible
+    but not more than max_cells, used for `geohash__startswith` lookup
+    """
+    for precision in range(9, 0, -1):
+        height, width = geohash_cell_size(precision)
+        rows = int(math.floor(north / height) - math.floor(south / height)) + 1
+        columns = int(math.floor(east / width) - math.floor(west / width)) + 1
+        if rows * columns > max_cells and precision > 1:
+            continue
+
+        cells = set()
+        for row in range(rows):
+            latitude = min(south + row * height, north)
+            for column in range(columns):
+                longitude = min(west + column * width, east)
+                cells.add(geohash_encode(latitude, longitude, precision))
+        return sorted(cells)
+
+
+def drop_stationary(points, min_distance, last=None):
+    """
+    Remove point closer than min_distance meter from previous kept point.
+    `points` is list of (latitude, longitude, ...) already sorted by time
+    """
+    kept = []
+    for point in points:
+        if last is not None and haversine(last[0], last[1], point[0], point[1]) < min_distance:
+            continue
+        kept.append(point)
+        last = point
+    return kept
+
+
+def _cross_track_distance(point, start, end):
+    """Approximate distance in meter from point to segment, fine for short segment"""
+    scale = math.cos(math.radians(start[0]))
+    ax, ay = 0.0, 0.0
+    bx, by = (end[1] - start[1]) * scale, end[0] - start[0]
+    px, py = (point[1] - start[1]) * scale, point[0] - start[0]
+
+    length = bx * bx + by * by
+    t = 0.0 if length == 0 else max(0.0, min(1.0, (px * bx + py * by) / length))
+    dx, dy = px - (ax + t * bx), py - (ay + t * by)
+    return math.sqrt(dx * dx + dy * dy) * math.pi / 180.0 * EARTH_RADIUS
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Simplify polyline, keep point deviate more than tolerance meter.
+    Iterative so long trip not hit recursion limit
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        index, distance = None, tolerance
+        for i in range(first + 1, last):
+            d = _cross_track_distance(points[i], points[first], points[last])
+            if d > distance:
+                index, distance = i, d
+
+        if index is not None:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [point for point, is_kept in zip(points, keep) if is_kept]
@@ -0,0 +1,43 @@
+import io
+
+from PIL import Image, ImageOps
+
+from django.core.files.base import ContentFile
+
+# Pillow format name and file extension
+THUMBNAIL_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+
+
+def prepare_image(image):
+    """
+    Upright RGB/RGBA copy of opened PIL image, done once per source image
+    before make_thumbnail of every size and format
+    """
+    # Apply orientation before EXIF gone
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    return image
+
+
+def make_thumbnail(image, size, fmt, quality=82):
+    """
+    Square thumbnail from prepare_image() output, all metadata (EXIF, ICC,
+    comment) dropped so the output only contains pixels
+    """
+    # JPEG no alpha channel
+    if fmt == 'jpeg' and image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+
+    thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    thumbnail.info = {}
+
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format=THUMBNAIL_FORMATS[fmt], quality=quality, optimize=True)
+    return ContentFile(buffer.getvalue())
@@ -1,5 +1,10 @@
 from .snap import Snap
 from .core_api import CoreApi
+from .async_client import AsyncSnap, AsyncCoreApi
 
 from .error_midtrans import MidtransAPIError
-from .error_midtrans import JSONDecodeError
\ No newline at end of file
+from .error_midtrans import JSONDecodeError
+from .error_midtrans import CircuitOpenError
+
+from .http_client import HttpClient, CircuitBreaker
+from .async_client import AsyncHttpClient
@@ -0,0 +1,245 @@
+import asyncio
+import sys
+import json
+
+import httpx
+
+from .config import ApiConfig
+from .error_midtrans import JSONDecodeError
+from .http_client import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_POOL_MAXSIZE,
+    RETRY_STATUS_CODES,
+    shared_circuit_breaker,
+    prepare_payload,
+    parse_response
+)
+
+DEFAULT_STATUS_CONCURRENCY = 10
+
+
+class AsyncHttpClient(object):
+    """
+    asyncio version of `HttpClient` on top of `httpx.AsyncClient` connection pool.
+    Same retry rule: connect error for all method, read error and 5xx only for GET.
+    Use as async context manager or call `aclose()` when done.
+    """
+    def __init__(self, client=None, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 circuit_breaker=None):
+        connect_timeout, read_timeout = timeout
+        self.http_client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize,
+                                max_keepalive_connections=pool_maxsize)
+        )
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.circuit_breaker = circuit_breaker or shared_circuit_breaker
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+    def is_retryable(self, method, error=None, response_object=None):
+        if isinstance(error, httpx.ConnectError) or isinstance(error, httpx.ConnectTimeout):
+            return True
+        if method != 'get':
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return response_object.status_code in RETRY_STATUS_CODES
+
+    async def send(self, method, server_key, request_url, payload, headers):
+        attempt = 0
+        while True:
+            error = None
+            response_object = None
+
+            try:
+                response_object = await self.http_client.request(
+                    method.upper(),
+                    request_url,
+                    auth=(server_key, ''),
+                    content=payload if method != 'get' else None,
+                    params=payload if method == 'get' else None,
+                    headers=headers,
+                    follow_redirects=True
+                )
+            except httpx.TransportError as e:
+                error = e
+
+            if attempt >= self.max_retries or not self.is_retryable(method, error, response_object):
+                if error is not None:
+                    raise error
+                return response_object
+
+            attempt += 1
+            await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    async def request(self, method, server_key, request_url, parameters=dict()):
+        """
+        Same as `HttpClient.request` but awaitable
+
+        :return: tuple of:
+        response_dict: Dictionary from JSON decoded response
+        response_object: Response object from `httpx`
+        """
+        payload, headers = prepare_payload(method, parameters)
+
+        self.circuit_breaker.before_request()
+
+        try:
+            response_object = await self.send(method, server_key, request_url, payload, headers)
+        except httpx.TransportError:
+            self.circuit_breaker.record_failure()
+            raise
+
+        if response_object.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+        response_dict = parse_response(response_object)
+        return response_dict, response_object
+
+
+class AsyncTransactions:
+    """
+    Awaitable version of `Transactions`
+    """
+
+    def __init__(self, parent):
+        self.parent = parent
+
+    async def _request(self, method, path, parameters=dict()):
+        api_url = self.parent.api_config.get_core_api_base_url()+'/'+path
+        response_dict, response_object = await self.parent.http_client.request(
+            method,
+            self.parent.api_config.server_key,
+            api_url,
+            parameters)
+        return response_dict
+
+    async def status(self, transaction_id):
+        return await self._request('get', transaction_id+'/status')
+
+    async def statusb2b(self, transaction_id):
+        return await self._request('get', transaction_id+'/status/b2b')
+
+    async def approve(self, transaction_id):
+        return await self._request('post', transaction_id+'/approve')
+
+    async def deny(self, transaction_id):
+        return await self._request('post', transaction_id+'/deny')
+
+    async def cancel(self, transaction_id):
+        return await self._request('post', transaction_id+'/cancel')
+
+    async def expire(self, transaction_id):
+        return await self._request('post', transaction_id+'/expire')
+
+    async def refund(self, transaction_id, parameters=dict()):
+        return await self._request('post', transaction_id+'/refund', parameters)
+
+    async def notification(self, notification=dict()):
+        is_notification_string = isinstance(notification, str if sys.version_info[0] >= 3 else basestring)
+        if is_notification_string:
+            try:
+                notification = json.loads(notification)
+            except Exception as e:
+                raise JSONDecodeError('fail to parse `notification` string as JSON. Use JSON string or Dict as `notification`. with message: `{0}`'.format(repr(e)))
+
+        return await self.status(notification['transaction_id'])
+
+    async def status_many(self, transaction_ids, concurrency=DEFAULT_STATUS_CONCURRENCY):
+        """
+        Check status of many transaction at once, at most `concurrency` in flight.
+        :return: dict of transaction_id to response dict or the raised exception
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def check(transaction_id):
+            async with semaphore:
+                try:
+                    return await self.status(transaction_id)
+                except Exception as e:
+                    return e
+
+        results = await asyncio.gather(*[check(x) for x in transaction_ids])
+        return dict(zip(transaction_ids, results))
+
+
+class AsyncBaseApi:
+    def __init__(self,
+            is_production=False,
+            server_key='',
+            client_key='',
+            http_client=None):
+
+        self.api_config = ApiConfig(is_production,server_key,client_key)
+        self.http_client = http_client or AsyncHttpClient()
+        self.transactions = AsyncTransactions(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.http_client.aclose()
+
+    async def _request(self, method, api_url, parameters=dict()):
+        response_dict, response_object = await self.http_client.request(
+            method,
+            self.api_config.server_key,
+            api_url,
+            parameters)
+        return response_dict
+
+
+class AsyncSnap(AsyncBaseApi):
+    """
+    Awaitable version of `Snap`
+    """
+
+    async def create_transaction(self,parameters=dict()):
+        api_url = self.api_config.get_snap_base_url()+'/transactions'
+        return await self._request('post', api_url, parameters)
+
+    async def create_transaction_token(self,parameters=dict()):
+        return (await self.create_transaction(parameters))['token']
+
+    async def create_transaction_redirect_url(self,parameters=dict()):
+        return (await self.create_transaction(parameters))['redirect_url']
+
+
+class AsyncCoreApi(AsyncBaseApi):
+    """
+    Awaitable version of `CoreApi`
+    """
+
+    async def charge(self,parameters=dict()):
+        api_url = self.api_config.get_core_api_base_url()+'/charge'
+        return await self._request('post', api_url, parameters)
+
+    async def capture(self,parameters=dict()):
+        api_url = self.api_config.get_core_api_base_url()+'/capture'
+        return await self._request('post', api_url, parameters)
+
+    async def card_register(self,parameters=dict()):
+        api_url = self.api_config.get_core_api_base_url()+'/card/register'
+        return await self._request('get', api_url, parameters)
+
+    async def card_token(self,parameters=dict()):
+        api_url = self.api_config.get_core_api_base_url()+'/token'
+        return await self._request('get', api_url, parameters)
+
+    async def card_point_inquiry(self,token_id):
+        api_url = self.api_config.get_core_api_base_url()+'/point_inquiry/'+token_id
+        return await self._request('get', api_url)
@@ -10,3 +10,15 @@ class MidtransAPIError(Exception):
 
     def __str__(self):
         return self.message
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling Midtrans when too many recent calls failed,
+    caller should fail fast (eg; show payment unavailable) and try later
+    """
+    def __init__(self, message, retry_after=None):
+        self.message = message
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return self.message
@@ -1,17 +1,180 @@
 import requests
 import json
 import sys
+import time
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .error_midtrans import MidtransAPIError
 from .error_midtrans import JSONDecodeError
+from .error_midtrans import CircuitOpenError
+
+# (connect, read) in seconds
+DEFAULT_TIMEOUT = (3.05, 15)
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.3
+DEFAULT_POOL_MAXSIZE = 10
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class CircuitBreaker(object):
+    """
+    Simple circuit breaker shared by all client in one process.
+    closed: call go through, count consecutive failures
+    open: after `failure_threshold` failures, reject call for `recovery_timeout` seconds
+    half-open: after timeout let one call go, success close it, failure open again
+    """
+    def __init__(self, failure_threshold=5, recovery_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_count = 0
+        self.opened_at = None
+        self._half_open_call = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_request(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+
+            if state == 'half-open' and not self._half_open_call:
+                self._half_open_call = True
+                return
+
+            retry_after = self.recovery_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError('Midtrans API circuit is open, too many failed request. '
+                                   'Retry after `{0:.0f}` seconds'.format(max(0, retry_after)),
+                                   retry_after=max(0, retry_after))
+
+    def record_success(self):
+        with self._lock:
+            self.failure_count = 0
+            self.opened_at = None
+            self._half_open_call = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failure_count += 1
+            if self._half_open_call or self.failure_count >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._half_open_call = False
+
+
+def build_session(max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                  pool_maxsize=DEFAULT_POOL_MAXSIZE):
+    """
+    `requests.Session` with keep-alive pool and retry policy.
+    Connect error retried for all method (request never sent),
+    read error and 5xx only retried for idempotent GET so charge never duplicated
+    """
+    retry_kwargs = dict(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    try:
+        retry = Retry(allowed_methods=frozenset(['GET']), **retry_kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        retry = Retry(method_whitelist=frozenset(['GET']), **retry_kwargs)
+
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_shared_session = None
+shared_circuit_breaker = CircuitBreaker()
+_shared_lock = threading.Lock()
+
+
+def get_shared_session():
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = build_session()
+    return _shared_session
+
+
+def prepare_payload(method, parameters):
+    """Return (payload, headers) for a Midtrans API call"""
+    # allow string of JSON to be used as parameters
+    is_parameters_string = isinstance(parameters, str if sys.version_info[0] >= 3 else basestring)
+    if is_parameters_string:
+        try:
+            parameters = json.loads(parameters)
+        except Exception as e:
+            raise JSONDecodeError('fail to parse `parameters` string as JSON. Use JSON string or Dict as `parameters`. with message: `{0}`'.format(repr(e)))
+
+    payload = json.dumps(parameters) if method != 'get' else parameters
+    headers = {
+        'content-type': 'application/json',
+        'accept': 'application/json',
+        'user-agent': 'midtransclient-python/1.0.2'
+    }
+    return payload, headers
+
+
+def parse_response(response_object):
+    """
+    Decode JSON and raise on API error,
+    work for `requests` and `httpx` response object
+    """
+    # catch response JSON decode error
+    try:
+        response_dict = response_object.json()
+    except ValueError as e:
+        raise JSONDecodeError('Fail to decode API response as JSON, API response is not JSON: `{0}`. with message: `{1}`'.format(response_object.text,repr(e)))
+
+    # raise API error HTTP status code
+    if response_object.status_code >= 300:
+        raise MidtransAPIError(
+            message='Midtrans API is returning API error. HTTP status code: `{0}`. '
+            'API response: `{1}`'.format(response_object.status_code,response_object.text),
+            api_response_dict=response_dict,
+            http_status_code=response_object.status_code,
+            raw_http_client_data=response_object
+        )
+    # raise core API error status code
+    if 'status_code' in response_dict.keys() and int(response_dict['status_code']) >= 300 and int(response_dict['status_code']) != 407:
+        raise MidtransAPIError(
+            'Midtrans API is returning API error. API status code: `{0}`. '
+            'API response: `{1}`'.format(response_dict['status_code'],response_object.text),
+            api_response_dict=response_dict,
+            http_status_code=response_object.status_code,
+            raw_http_client_data=response_object
+        )
+
+    return response_dict
+
 
 class HttpClient(object):
     """
     Http Client Class that is wrapper to Python's `requests` module
     Used to do API call to Midtrans API urls.
     Capable of doing http :request:
+    All instances share one pooled session and circuit breaker by default,
+    so keep-alive connection reused between Snap and CoreApi call.
     """
-    def __init__(self):
-        self.http_client = requests
+    def __init__(self, session=None, timeout=DEFAULT_TIMEOUT, circuit_breaker=None):
+        self.http_client = session or get_shared_session()
+        self.timeout = timeout
+        self.circuit_breaker = circuit_breaker or shared_circuit_breaker
 
     def request(self, method, server_key, request_url, parameters=dict()):
         """
@@ -25,54 +188,30 @@ class HttpClient(object):
         response_dict: Dictionary from JSON decoded response
         response_object: Response object from `requests`
         """
+        payload, headers = prepare_payload(method, parameters)
+
+        self.circuit_breaker.before_request()
 
-        # allow string of JSON to be used as parameters
-        is_parameters_string = isinstance(parameters, str if sys.version_info[0] >= 3 else basestring)
-        if is_parameters_string:
-            try:
-                parameters = json.loads(parameters)
-            except Exception as e:
-                raise JSONDecodeError('fail to parse `parameters` string as JSON. Use JSON string or Dict as `parameters`. with message: `{0}`'.format(repr(e)))
-
-        payload = json.dumps(parameters) if method != 'get' else parameters
-        headers = {
-            'content-type': 'application/json',
-            'accept': 'application/json',
-            'user-agent': 'midtransclient-python/1.0.2'
-        }
-
-        response_object = self.http_client.request(
-            method,
-            request_url,
-            auth=requests.auth.HTTPBasicAuth(server_key, ''),
-            data=payload if method != 'get' else None,
-            params=payload if method == 'get' else None,
-            headers=headers,
-            allow_redirects=True
-        )
-        # catch response JSON decode error
         try:
-            response_dict = response_object.json()
-        except json.decoder.JSONDecodeError as e:
-            raise JSONDecodeError('Fail to decode API response as JSON, API response is not JSON: `{0}`. with message: `{1}`'.format(response_object.text,repr(e)))
-
-        # raise API error HTTP status code
-        if response_object.status_code >= 300:
-            raise MidtransAPIError(
-                message='Midtrans API is returning API error. HTTP status code: `{0}`. '
-                'API response: `{1}`'.format(response_object.status_code,response_object.text),
-                api_response_dict=response_dict,
-                http_status_code=response_object.status_code,
-                raw_http_client_data=response_object
-            )
-        # raise core API error status code
-        if 'status_code' in response_dict.keys() and int(response_dict['status_code']) >= 300 and int(response_dict['status_code']) != 407:
-            raise MidtransAPIError(
-                'Midtrans API is returning API error. API status code: `{0}`. '
-                'API response: `{1}`'.format(response_dict['status_code'],response_object.text),
-                api_response_dict=response_dict,
-                http_status_code=response_object.status_code,
-                raw_http_client_data=response_object
+            response_object = self.http_client.request(
+                method,
+                request_url,
+                auth=requests.auth.HTTPBasicAuth(server_key, ''),
+                data=payload if method != 'get' else None,
+                params=payload if method == 'get' else None,
+                headers=headers,
+                allow_redirects=True,
+                timeout=self.timeout
             )
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.record_failure()
+            raise
+
+        # gateway degraded, client error (4xx) still count as healthy
+        if response_object.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
 
+        response_dict = parse_response(response_object)
         return response_dict, response_object
@@ -10,10 +10,11 @@ class Snap:
     def __init__(self, 
             is_production=False,
             server_key='',
-            client_key=''):
+            client_key='',
+            http_client=None):
 
         self.api_config = ApiConfig(is_production,server_key,client_key)
-        self.http_client = HttpClient()
+        self.http_client = http_client or HttpClient()
         self.transactions = Transactions(self)
 
     @property
@@ -0,0 +1,170 @@
+import json
+import time
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import requests
+
+from .http_client import HttpClient, CircuitBreaker, build_session
+from .async_client import AsyncHttpClient, AsyncCoreApi
+from .error_midtrans import MidtransAPIError, CircuitOpenError
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for Midtrans API
+    /ok         200 JSON
+    /slow       sleep longer than client read timeout
+    /flaky      503 for first `flaky_failures` call then 200
+    /error      always 500
+    /<id>/status  200 after short delay, track concurrent request
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body):
+        content = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def handle_any(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        with server.lock:
+            server.hits[self.path.split('?')[0]] = server.hits.get(self.path.split('?')[0], 0) + 1
+            server.connections.add(self.client_address)
+            hits = server.hits[self.path.split('?')[0]]
+
+        path = self.path.split('?')[0]
+        if path.endswith('/status'):
+            with server.lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            time.sleep(0.05)
+            with server.lock:
+                server.in_flight -= 1
+            self.respond(200, {'status_code': '200', 'order_id': path.split('/')[1]})
+        elif path == '/slow':
+            time.sleep(server.slow_seconds)
+            self.respond(200, {'status_code': '200'})
+        elif path == '/flaky' and hits <= server.flaky_failures:
+            self.respond(503, {'status_code': '503', 'status_message': 'unavailable'})
+        elif path == '/error':
+            self.respond(500, {'status_code': '500', 'status_message': 'error'})
+        else:
+            self.respond(200, {'status_code': '200', 'token': 'abc'})
+
+    do_GET = handle_any
+    do_POST = handle_any
+
+
+class HttpClientTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.slow_seconds = 1
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = 'http://127.0.0.1:%d' % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.hits = dict()
+        self.server.connections = set()
+        self.server.flaky_failures = 0
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.client = HttpClient(session=build_session(backoff_factor=0),
+                                 timeout=(1, 0.3),
+                                 circuit_breaker=CircuitBreaker(failure_threshold=3, recovery_timeout=0.5))
+
+    def test_connection_reused(self):
+        for _i in range(5):
+            response_dict, _response = self.client.request('get', 'key', self.base_url + '/ok')
+            self.assertEqual(response_dict['token'], 'abc')
+
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_read_timeout(self):
+        start = time.monotonic()
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.client.request('post', 'key', self.base_url + '/slow', {'a': 1})
+
+        # POST not retried on read timeout
+        self.assertLess(time.monotonic() - start, self.server.slow_seconds)
+        self.assertEqual(self.server.hits['/slow'], 1)
+
+    def test_get_retried_on_503(self):
+        self.server.flaky_failures = 2
+        response_dict, _response = self.client.request('get', 'key', self.base_url + '/flaky')
+
+        self.assertEqual(response_dict['status_code'], '200')
+        self.assertEqual(self.server.hits['/flaky'], 3)
+
+    def test_post_not_retried_on_503(self):
+        self.server.flaky_failures = 1
+        with self.assertRaises(MidtransAPIError):
+            self.client.request('post', 'key', self.base_url + '/flaky', {'a': 1})
+
+        self.assertEqual(self.server.hits['/flaky'], 1)
+
+    def test_circuit_breaker(self):
+        for _i in range(3):
+            with self.assertRaises(MidtransAPIError):
+                self.client.request('post', 'key', self.base_url + '/error', {'a': 1})
+
+        # open, gateway not called
+        with self.assertRaises(CircuitOpenError):
+            self.client.request('post', 'key', self.base_url + '/ok', {'a': 1})
+        self.assertNotIn('/ok', self.server.hits)
+
+        # half-open, one success close it
+        time.sleep(0.6)
+        self.client.request('post', 'key', self.base_url + '/ok', {'a': 1})
+        self.assertEqual(self.client.circuit_breaker.state, 'closed')
+
+    def test_async_retry_and_timeout(self):
+        async def run():
+            async with AsyncHttpClient(timeout=(1, 0.3), backoff_factor=0,
+                                       circuit_breaker=CircuitBreaker()) as client:
+                response_dict, _response = await client.request('get', 'key', self.base_url + '/flaky')
+                self.assertEqual(response_dict['status_code'], '200')
+
+                with self.assertRaises(httpx.TimeoutException):
+                    await client.request('post', 'key', self.base_url + '/slow', {'a': 1})
+
+        self.server.flaky_failures = 1
+        asyncio.run(run())
+        self.assertEqual(self.server.hits['/flaky'], 2)
+        self.assertEqual(self.server.hits['/slow'], 1)
+
+    def test_async_status_many_bounded(self):
+        async def run():
+            http_client = AsyncHttpClient(circuit_breaker=CircuitBreaker())
+            async with AsyncCoreApi(server_key='key', http_client=http_client) as core_api:
+                core_api.api_config.CORE_SANDBOX_BASE_URL = self.base_url
+                return await core_api.transactions.status_many(['order-%d' % i for i in range(20)],
+                                                               concurrency=4)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results['order-7']['order_id'], 'order-7')
+        self.assertLessEqual(self.server.max_in_flight, 4)
+        self.assertGreater(self.server.max_in_flight, 1)
@@ -0,0 +1,207 @@
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import force_str
+
+from rest_framework import serializers
+
+# Field plan of every (values serializer, serializer kwargs), built once
+_PLANS = dict()
+# Serializer class -> values serializer, used for nested serializer
+_REGISTRY = dict()
+
+_LOOKUP_SENTINEL = '__lookup__'
+
+# to_representation of these is plain type cast
+_CASTS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+}
+
+
+def _same(value):
+    return value
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(value))
+    return value
+
+
+class ValuesListSerializer:
+    """
+    Read only list of `serializer_class` output from queryset.values() row,
+    same JSON without model instance or serializer field per row.
+
+    Fields of serializer_class (with same kwargs, eg: exclude_fields) compiled
+    once to plan of (field name, values path, to_representation).
+    Field not read from one column (property, method field) given in
+    `computed_fields` {field name: (values paths, method name)}, method
+    called with the row. Extra key of serializer to_representation added by
+    `extra_representation`, column it read given in `extra_values`.
+
+    serializer = StuffValuesSerializer(context=context, exclude_fields=['basket'])
+    serializer.instance = paginator.paginate_queryset(serializer.values(queryset), request)
+    serializer.data
+    """
+    serializer_class = None
+    computed_fields = dict()
+    extra_values = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.serializer_class is not None:
+            _REGISTRY[cls.serializer_class] = cls
+
+    def __init__(self, instance=None, context=None, prefix='', **kwargs):
+        self.instance = instance
+        self.context = context or dict()
+        self.prefix = prefix
+        self.steps, self.values_fields = self.bind(self.get_plan(**kwargs))
+
+    @classmethod
+    def get_plan(cls, **kwargs):
+        key = (cls, tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        plan = _PLANS.get(key)
+        if plan is None:
+            plan = _PLANS[key] = cls.compile(**kwargs)
+        return plan
+
+    @classmethod
+    def compile(cls, **kwargs):
+        """[(kind, field name, spec)] of readable field in output order"""
+        serializer = cls.serializer_class(context=dict(), **kwargs)
+
+        plan = []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            path = '__'.join(field.source_attrs)
+            convert = _CASTS.get(type(field), field.to_representation)
+
+            if name in cls.computed_fields:
+                paths, method = cls.computed_fields[name]
+                if isinstance(field, serializers.SerializerMethodField):
+                    convert = None
+                plan.append(('computed', name, (paths, method, convert)))
+
+            elif isinstance(field, serializers.HyperlinkedIdentityField):
+                plan.append(('url', name, field))
+
+            elif isinstance(field, serializers.BaseSerializer):
+                child_class = _REGISTRY.get(type(field))
+                if child_class is None or getattr(field, 'many', False):
+                    raise ImproperlyConfigured("Nested %s not supported in %s" % (name, cls.__name__))
+
+                # Serializer kwargs not kept on field, so excluded fields read from it
+                child_kwargs = dict()
+                excluded = set(child_class.serializer_class(context=dict()).fields) - set(field.fields)
+                if excluded:
+                    child_kwargs['exclude_fields'] = excluded
+                plan.append(('nested', name, (path, child_class, child_kwargs)))
+
+            elif isinstance(field, serializers.SlugRelatedField):
+                plan.append(('column', name, ('%s__%s' % (path, field.slug_field), None)))
+
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                convert = field.pk_field.to_representation if field.pk_field is not None else None
+                plan.append(('column', name, (path, convert)))
+
+            elif isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField,
+                                    serializers.SerializerMethodField, serializers.FileField)) \
+                    or field.source == '*':
+                raise ImproperlyConfigured("Field %s not supported in %s" % (name, cls.__name__))
+
+            else:
+                plan.append(('column', name, (path, convert)))
+        return plan
+
+    def bind(self, plan):
+        """
+        Steps (field name, row key, convert) for this request and values paths.
+        Without key convert take the row
+        """
+        steps, paths = [], []
+        for kind, name, spec in plan:
+            if kind == 'column':
+                path, convert = spec
+                key = self.prefix + path
+                steps.append((name, key, convert or _same))
+                paths.append(key)
+
+            elif kind == 'computed':
+                keys, method, convert = spec
+                steps.append((name, None, self.computed(getattr(self, method), convert)))
+                paths.extend(self.prefix + x for x in keys)
+
+            elif kind == 'url':
+                key = self.prefix + spec.lookup_field
+                steps.append((name, None, self.url(spec, key)))
+                paths.append(key)
+
+            elif kind == 'nested':
+                path, child_class, child_kwargs = spec
+                child = child_class(context=self.context, prefix='%s%s__' % (self.prefix, path),
+                                    **child_kwargs)
+                key = child.prefix + 'id'
+                steps.append((name, None, self.nested(child, key)))
+                paths.append(key)
+                paths.extend(child.values_fields)
+
+        paths.extend(self.prefix + x for x in self.extra_values)
+        return steps, list(dict.fromkeys(paths))
+
+    def computed(self, method, convert):
+        def get(row):
+            value = method(row)
+            if value is None or convert is None:
+                return value
+            return convert(value)
+        return get
+
+    def url(self, field, key):
+        # Reverse once, lookup value put in the url each row
+        request = self.context.get('request')
+        format = self.context.get('format')
+        if format and field.format and field.format != format:
+            format = field.format
+
+        url = field.get_url(SimpleNamespace(pk=0, **{field.lookup_field: _LOOKUP_SENTINEL}),
+                            field.view_name, request, format)
+        start, end = url.split(_LOOKUP_SENTINEL, 1)
+        return lambda row: '%s%s%s' % (start, row[key], end)
+
+    def nested(self, child, key):
+        return lambda row: None if row[key] is None else child.to_representation(row)
+
+    def values(self, queryset):
+        """Queryset of row needed by the plan"""
+        return queryset.prefetch_related(None).values(*self.values_fields)
+
+    def choices_display(self, model, field_name):
+        """{value: display} same as get_FOO_display(), in active language"""
+        field = model._meta.get_field(field_name)
+        return {k: force_str(v, strings_only=True) for k, v in field.flatchoices}
+
+    def prepare(self, rows):
+        """Called once with all row before representation"""
+        pass
+
+    def extra_representation(self, ret, row):
+        return ret
+
+    def to_representation(self, row):
+        ret = dict()
+        for name, key, convert in self.steps:
+            if key is None:
+                ret[name] = convert(row)
+            else:
+                value = row[key]
+                ret[name] = None if value is None else convert(value)
+        return self.extra_representation(ret, row)
+
+    @property
+    def data(self):
+        rows = list(self.instance or [])
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
@@ -0,0 +1,14 @@
+import redis
+
+from django.conf import settings
+
+_CONNECTION_POOL = None
+
+
+def get_redis_connection():
+    """Shared connection pool per process, build from settings.REDIS_URL"""
+    global _CONNECTION_POOL
+
+    if _CONNECTION_POOL is None:
+        _CONNECTION_POOL = redis.ConnectionPool.from_url(settings.REDIS_URL)
+    return redis.Redis(connection_pool=_CONNECTION_POOL)
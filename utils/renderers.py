@@ -0,0 +1,68 @@
+import orjson
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+
+from utils.generals import LazyEncoder
+
+_ENCODER = LazyEncoder()
+
+
+def orjson_default(obj):
+    """
+    Type orjson not know, formatted same as LazyEncoder
+    (datetime cut to millisecond, Decimal as string, lazy text)
+    """
+    try:
+        return _ENCODER.default(obj)
+    except TypeError:
+        if isinstance(obj, QuerySet):
+            return list(obj)
+        if isinstance(obj, bytes):
+            return obj.decode()
+        if hasattr(obj, 'tolist'):
+            return obj.tolist()
+        if hasattr(obj, '__iter__'):
+            return list(obj)
+        raise
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer output with orjson, compact utf-8"""
+    # Datetime left to LazyEncoder so format not change
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # orjson only indent by two
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=orjson_default, option=options)
+
+        # Same as JSONRenderer, valid json but not valid javascript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(parsers.JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
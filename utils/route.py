@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def nearest_neighbor(distance, start=0):
+    """Tour visit closest unvisited node first, begin from start"""
+    size = len(distance)
+    visited = np.zeros(size, dtype=bool)
+    tour = [start]
+    visited[start] = True
+
+    for _i in range(size - 1):
+        row = np.where(visited, np.inf, distance[tour[-1]])
+        node = int(np.argmin(row))
+        tour.append(node)
+        visited[node] = True
+    return tour
+
+
+def two_opt(distance, tour, max_rounds=50):
+    """
+    Improve open path by reversing segment while it get shorter.
+    First node fixed as start, path not return to it
+    """
+    tour = np.asarray(tour)
+    size = len(tour)
+
+    for _round in range(max_rounds):
+        improved = False
+        for i in range(1, size - 1):
+            a, b = tour[i - 1], tour[i]
+            c = tour[i + 1:]
+            # node after each candidate end, last one has no next edge
+            d = np.append(tour[i + 2:], -1)
+            has_next = d >= 0
+            d_safe = np.where(has_next, d, 0)
+
+            delta = distance[a, c] - distance[a, b] \
+                + np.where(has_next, distance[b, d_safe] - distance[c, d_safe], 0)
+
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                tour[i:i + j + 2] = tour[i:i + j + 2][::-1]
+                improved = True
+
+        if not improved:
+            break
+    return tour.tolist()
+
+
+def or_opt(distance, tour, max_segment=3, max_rounds=50):
+    """
+    Move segment of 1 to max_segment node to better place, catch
+    stop 2-opt leave on wrong side of the path. First node fixed.
+    Cost change of every place computed at once from the edges touched
+    """
+    tour = list(tour)
+
+    for _round in range(max_rounds):
+        improved = False
+        for length in range(1, max_segment + 1):
+            for i in range(1, len(tour) - length + 1):
+                first, last = tour[i], tour[i + length - 1]
+                before = tour[i - 1]
+                after = tour[i + length] if i + length < len(tour) else None
+
+                # Saved by taking segment out
+                gain = distance[before, first]
+                if after is not None:
+                    gain += distance[last, after] - distance[before, after]
+
+                # Paid by putting it after rest[k], reversed or not
+                rest = tour[:i] + tour[i + length:]
+                a = np.asarray(rest)
+                b = np.append(a[1:], -1)
+                has_next = b >= 0
+                b_safe = np.where(has_next, b, 0)
+                base = np.where(has_next, distance[a, b_safe], 0)
+                forward = distance[a, first] + np.where(has_next, distance[last, b_safe], 0) - base
+                backward = distance[a, last] + np.where(has_next, distance[first, b_safe], 0) - base
+
+                cost = np.minimum(forward, backward)
+                k = int(np.argmin(cost))
+                if cost[k] < gain - 1e-9:
+                    segment = tour[i:i + length]
+                    if backward[k] < forward[k]:
+                        segment = segment[::-1]
+                    tour = rest[:k + 1] + segment + rest[k + 1:]
+                    improved = True
+
+        if not improved:
+            break
+    return tour
+
+
+def path_length(distance, tour):
+    return float(sum(distance[a, b] for a, b in zip(tour, tour[1:])))
+
+
+def plan_route(distance, start=0):
+    """Short open path over all node from distance matrix"""
+    if len(distance) < 3:
+        return list(range(len(distance)))[start:] + list(range(len(distance)))[:start]
+    tour = two_opt(distance, nearest_neighbor(distance, start))
+    return two_opt(distance, or_opt(distance, tour))
@@ -0,0 +1,113 @@
+import os
+import re
+import mimetypes
+
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def _parse_range(header, size):
+    """Only single range supported, return (start, end) or None"""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+
+    if start == '':
+        # bytes=-500 mean last 500 bytes
+        start = max(0, size - int(end))
+        end = size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def sendfile(request, name):
+    """
+    Serve file under MEDIA_ROOT after authorization done by the caller.
+
+    SENDFILE_BACKEND:
+    - nginx, X-Accel-Redirect to SENDFILE_URL (location must be `internal`)
+    - apache, X-Sendfile with absolute path (mod_xsendfile)
+    - None, stream from python with Range support, only for development
+
+    Conditional request (If-None-Match, If-Modified-Since) handled here
+    so 304 never touch the proxy.
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except ValueError:
+        raise Http404()
+
+    if not os.path.isfile(path):
+        raise Http404()
+
+    stat = os.stat(path)
+    etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+    last_modified = http_date(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=stat.st_mtime)
+    if response is not None:
+        return response
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(os.path.join(settings.SENDFILE_URL, name))
+    elif backend == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        byte_range = None
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header and request.META.get('HTTP_IF_RANGE', etag) in (etag, last_modified):
+            byte_range = _parse_range(range_header, stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % stat.st_size
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(_read_range(path, start, end - start + 1),
+                                             status=206, content_type=content_type)
+            response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, stat.st_size)
+            response['Content-Length'] = str(end - start + 1)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+            response['Content-Length'] = str(stat.st_size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
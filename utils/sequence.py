@@ -0,0 +1,74 @@
+import os
+import threading
+
+DEFAULT_BLOCK_SIZE = 100
+
+
+class BlockSequence(object):
+    """
+    Unique increasing number without database round trip for each call.
+
+    Process lease a block of `block_size` numbers by calling
+    `lease(name, block_size)` which return first number of the block,
+    next() hand them out from memory. Number always increase in one process,
+    across process it follow block order. Unused rest of block lost
+    when process stop, so number can have gap but never duplicate.
+    """
+    def __init__(self, name, lease, block_size=DEFAULT_BLOCK_SIZE):
+        self.name = name
+        self.lease = lease
+        self.block_size = block_size
+        self._reset()
+
+        # Child process must not continue parent block
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._next = 0
+        self._end = 0
+
+    def next(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+        with self._lock:
+            if self._next >= self._end:
+                start = self.lease(self.name, self.block_size)
+                self._next, self._end = start, start + self.block_size
+
+            value = self._next
+            self._next += 1
+            return value
+
+
+def autonomous(func, *args, **kwargs):
+    """
+    Run func in own database transaction even called inside atomic block,
+    eg; leased block must stay committed when the caller roll back.
+    Done in short thread because django connection is per thread.
+    """
+    from django.db import connection
+
+    if not connection.in_atomic_block:
+        return func(*args, **kwargs)
+
+    result = dict()
+
+    def target():
+        try:
+            result['value'] = func(*args, **kwargs)
+        except Exception as e:
+            result['error'] = e
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+
+    if 'error' in result:
+        raise result['error']
+    return result['value']
@@ -0,0 +1,270 @@
+import array
+import random
+import itertools
+import threading
+import unittest
+import multiprocessing
+
+from utils.sequence import BlockSequence
+from utils.geo import (
+    haversine,
+    geohash_encode,
+    geohash_cover,
+    drop_stationary,
+    douglas_peucker,
+    haversine_matrix
+)
+from utils.route import plan_route, nearest_neighbor, path_length
+from utils.trigram import normalize, trigrams, similarity, edit_distance, is_typo, TrigramIndex
+from utils.cooccurrence import Cooccurrence
+from utils.ewma import ewma_merge
+
+PROCESSES = 4
+THREADS = 2
+PER_THREAD = 250000
+
+
+def make_lease(counter):
+    """Lease shared by all process, same contract as NumberSequence.objects.lease"""
+    def lease(name, size):
+        with counter.get_lock():
+            counter.value += size
+            return counter.value - size + 1
+    return lease
+
+
+def draw(sequence, count, output):
+    values = array.array('q')
+    for _i in range(count):
+        values.append(sequence.next())
+    output.append(values)
+
+
+def worker(sequence, connection):
+    output = list()
+    threads = [threading.Thread(target=draw, args=(sequence, PER_THREAD, output))
+               for _i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    connection.send_bytes(b''.join(x.tobytes() for x in output))
+    connection.close()
+
+
+class BlockSequenceTestCase(unittest.TestCase):
+    def test_increasing_in_process(self):
+        counter = multiprocessing.get_context('fork').Value('q', 0)
+        sequence = BlockSequence('order', make_lease(counter), block_size=7)
+        values = [sequence.next() for _i in range(100)]
+
+        self.assertEqual(values, list(range(1, 101)))
+        self.assertEqual(counter.value, 105)
+
+    @unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'fork not available')
+    def test_unique_across_process(self):
+        # Millions number from forked process and thread, none duplicate
+        context = multiprocessing.get_context('fork')
+        counter = context.Value('q', 0)
+        sequence = BlockSequence('order', make_lease(counter), block_size=1000)
+
+        # Parent hold a partly used block before fork
+        first = sequence.next()
+
+        pipes, processes = list(), list()
+        for _i in range(PROCESSES):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=worker, args=(sequence, sender))
+            process.start()
+            sender.close()
+            pipes.append(receiver)
+            processes.append(process)
+
+        values = array.array('q', [first])
+        for receiver in pipes:
+            values.frombytes(receiver.recv_bytes())
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(len(values), 1 + PROCESSES * THREADS * PER_THREAD)
+        self.assertEqual(len(set(values)), len(values))
+
+
+class GeoTestCase(unittest.TestCase):
+    def test_haversine(self):
+        # Monas to Bundaran HI, about 2.2 km
+        distance = haversine(-6.175392, 106.827153, -6.194941, 106.823036)
+        self.assertAlmostEqual(distance, 2220, delta=50)
+
+    def test_geohash(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_geohash_cover(self):
+        south, west, north, east = -6.20, 106.80, -6.17, 106.84
+        prefixes = geohash_cover(south, west, north, east)
+
+        self.assertLessEqual(len(prefixes), 32)
+        for latitude in (south, -6.185, north):
+            for longitude in (west, 106.82, east):
+                point = geohash_encode(latitude, longitude)
+                self.assertTrue(any(point.startswith(x) for x in prefixes))
+
+    def test_drop_stationary(self):
+        points = [(-6.2, 106.8), (-6.20001, 106.80001), (-6.201, 106.8)]
+        self.assertEqual(drop_stationary(points, 10), [points[0], points[2]])
+
+    def test_douglas_peucker(self):
+        # Almost straight line with one corner
+        points = [(-6.2, 106.8 + i * 0.0001) for i in range(50)] \
+            + [(-6.2 + i * 0.0001, 106.8049) for i in range(1, 50)]
+        simplified = douglas_peucker(points, 5)
+
+        self.assertEqual(simplified, [points[0], points[49], points[-1]])
+
+
+class RouteTestCase(unittest.TestCase):
+    def random_matrix(self, rand, size):
+        latitudes = [-6.2 + rand.random() * 0.1 for _i in range(size)]
+        longitudes = [106.8 + rand.random() * 0.1 for _i in range(size)]
+        return haversine_matrix(latitudes, longitudes, latitudes, longitudes)
+
+    def test_close_to_optimal(self):
+        rand = random.Random(1)
+        for _i in range(20):
+            distance = self.random_matrix(rand, 7)
+            tour = plan_route(distance)
+            best = min(path_length(distance, [0] + list(x)) for x in itertools.permutations(range(1, 7)))
+
+            self.assertEqual(tour[0], 0)
+            self.assertEqual(sorted(tour), list(range(7)))
+            self.assertLessEqual(path_length(distance, tour), best * 1.15)
+
+    def test_two_opt_not_worse(self):
+        rand = random.Random(2)
+        distance = self.random_matrix(rand, 30)
+        self.assertLessEqual(path_length(distance, plan_route(distance)),
+                             path_length(distance, nearest_neighbor(distance)))
+
+
+class TrigramTestCase(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize('  Téh-Botol  SOSRO!! '), 'teh botol sosro')
+
+    def test_similarity(self):
+        self.assertGreaterEqual(similarity(trigrams('telur'), trigrams('telur ayam')), 0.5)
+        self.assertLess(similarity(trigrams('gula pasir'), trigrams('gula merah')), 0.5)
+        self.assertEqual(edit_distance('telur', 'telor'), 1)
+        self.assertEqual(edit_distance('kitten', 'sitting'), 3)
+
+    def test_index_search(self):
+        index = TrigramIndex()
+        for key, name in enumerate(['telur', 'gula pasir', 'gula merah', 'minyak goreng']):
+            index.add(key, name)
+
+        self.assertEqual([x[0] for x in index.search('telor', 0.5)], [0])
+        # Added word is other product
+        self.assertEqual(index.search('telur ayam', 0.5), [])
+        self.assertEqual([x[0] for x in index.search('gula pasir', 0.5, exclude=1)], [])
+
+        index.remove(0)
+        self.assertEqual(index.search('telur', 0.5), [])
+
+    def test_variant_not_duplicate(self):
+        index = TrigramIndex()
+        for key, name in enumerate(['minyak goreng 1 liter', 'beras', 'teh botol', 'susu 1 kg']):
+            index.add(key, name)
+
+        for name in ['minyak goreng 2 liter', 'beras merah', 'teh botol sosro', 'susu 2 kg']:
+            self.assertEqual(index.search(name, 0.5), [])
+
+        self.assertTrue(is_typo('minyak goreng', 'minyak gorent'))
+        self.assertFalse(is_typo('susu 1 kg', 'susu 2 kg'))
+        self.assertFalse(is_typo('kopi bubuk', 'kopi bubuk a'))
+
+
+class CooccurrenceTestCase(unittest.TestCase):
+    def build(self):
+        state = Cooccurrence()
+        # basket 1..4 contain bread and butter, milk everywhere
+        state.add_baskets([1, 1, 1, 2, 2, 2, 3, 3, 4, 4, 4, 5, 5, 6],
+                          [10, 20, 30, 10, 20, 30, 10, 20, 10, 20, 30, 30, 40, 30])
+        return state
+
+    def test_count(self):
+        state = self.build()
+        self.assertEqual(state.baskets, 6)
+        self.assertEqual(dict(zip(state.items.tolist(), state.item_counts.tolist())),
+                         {10: 4, 20: 4, 30: 5, 40: 1})
+
+        pairs = dict(zip(state.keys.tolist(), state.counts.tolist()))
+        self.assertEqual(pairs[(10 << 32) | 20], 4)
+        self.assertEqual(pairs[(20 << 32) | 10], 4)
+        self.assertEqual(pairs[(30 << 32) | 40], 1)
+
+    def test_processed_basket_ignored(self):
+        state = self.build()
+        touched = state.add_baskets([1, 1, 7, 7], [10, 20, 10, 20])
+        self.assertEqual(touched.tolist(), [10, 20])
+        self.assertEqual(state.baskets, 7)
+        self.assertEqual(dict(zip(state.keys.tolist(), state.counts.tolist()))[(10 << 32) | 20], 5)
+
+    def test_top_k(self):
+        state = self.build()
+        product, related, lift, support, rank = state.top_k(k=1, min_support=2)
+
+        self.assertEqual(product.tolist(), [10, 20, 30])
+        self.assertEqual(related.tolist(), [20, 10, 10])
+        self.assertEqual(rank.tolist(), [0, 0, 0])
+        self.assertAlmostEqual(lift[0], 4 * 6 / (4 * 4))
+
+        product, related, lift, support, rank = state.top_k(k=5, min_support=1, products=[30])
+        # Rare pair win on lift, min_support keep it out in practice
+        self.assertEqual(related.tolist(), [40, 10, 20])
+        self.assertTrue((lift[:-1] >= lift[1:]).all())
+
+    def test_big_basket_skipped(self):
+        state = Cooccurrence()
+        state.add_baskets([1] * 5 + [2, 2], [1, 2, 3, 4, 5, 1, 2], max_size=3)
+        self.assertEqual(state.baskets, 1)
+        self.assertEqual(state.processed.tolist(), [1, 2])
+
+    def test_dumps_loads(self):
+        state = self.build()
+        loaded = Cooccurrence.loads(state.dumps())
+
+        self.assertEqual(loaded.keys.tolist(), state.keys.tolist())
+        self.assertEqual(loaded.counts.tolist(), state.counts.tolist())
+        self.assertEqual(loaded.processed.tolist(), state.processed.tolist())
+        self.assertEqual(loaded.baskets, state.baskets)
+        self.assertEqual(Cooccurrence.loads(None).baskets, 0)
+
+
+class EwmaTestCase(unittest.TestCase):
+    def empty(self, size):
+        return [0.0] * size, [0.0] * size, [float('-inf')] * size
+
+    def test_weight_halved(self):
+        value_sum, weight_sum, time = ewma_merge([0, 0, 1], [0, 10, 5], [100, 200, 50], 10,
+                                                 *self.empty(2))
+        # 100 seen one half life before 200
+        self.assertAlmostEqual(value_sum[0] / weight_sum[0], (50 + 200) / 1.5)
+        self.assertAlmostEqual(value_sum[1] / weight_sum[1], 50)
+        self.assertEqual(time.tolist(), [10, 5])
+
+    def test_incremental_same_as_once(self):
+        rand = random.Random(3)
+        groups = [rand.randrange(5) for _ in range(200)]
+        times = [rand.uniform(0, 100) for _ in range(200)]
+        values = [rand.uniform(1000, 2000) for _ in range(200)]
+
+        once = ewma_merge(groups, times, values, 30, *self.empty(5))
+        state = self.empty(5)
+        for start in range(0, 200, 40):
+            end = start + 40
+            state = ewma_merge(groups[start:end], times[start:end], values[start:end], 30, *state)
+
+        for a, b in zip(once, state):
+            for x, y in zip(a, b):
+                self.assertAlmostEqual(x, y)
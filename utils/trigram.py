@@ -0,0 +1,129 @@
+import re
+import unicodedata
+
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+_DIGIT_RE = re.compile(r'[0-9]+')
+
+
+def normalize(name):
+    """Lowercase ascii word separated by single space, '  Téh-Botol ' -> 'teh botol'"""
+    name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    return _NON_WORD_RE.sub(' ', name.lower()).strip()
+
+
+def trigrams(normalized):
+    """
+    Character trigram of every word, padded like pg_trgm
+    (two space before and one after) so word start weight more
+    """
+    result = set()
+    for word in normalized.split():
+        word = '  %s ' % word
+        result.update(word[i:i + 3] for i in range(len(word) - 2))
+    return result
+
+
+def similarity(a, b):
+    """Jaccard of two trigram set, 0 to 1"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance, stop early once all of row above limit"""
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def same_kind(a, b):
+    """
+    Same number of word and same number in it, 'susu 1 kg' is not
+    'susu 2 kg' and 'beras merah' is not 'beras' whatever the similarity
+    """
+    return len(a.split()) == len(b.split()) and _DIGIT_RE.findall(a) == _DIGIT_RE.findall(b)
+
+
+def is_typo(a, b):
+    """
+    Only one misspelled word, one wrong letter in word of 5+, two in
+    word of 10+ ('telur' and 'telor'). Word with digit never a typo
+    """
+    if not same_kind(a, b):
+        return False
+
+    changed = [(x, y) for x, y in zip(a.split(), b.split()) if x != y]
+    if len(changed) != 1:
+        return False
+
+    x, y = changed[0]
+    if not x.isalpha() or not y.isalpha():
+        return False
+
+    shortest = min(len(x), len(y))
+    if shortest < 5:
+        return False
+    limit = 2 if shortest >= 10 else 1
+    return edit_distance(x, y, limit=limit) <= limit
+
+
+class TrigramIndex:
+    """
+    In memory inverted index trigram -> key, candidate lookup
+    touch only key sharing trigram with the query
+    """
+    def __init__(self):
+        self.postings = dict()
+        self.grams = dict()
+        self.names = dict()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, key, normalized):
+        grams = trigrams(normalized)
+        self.grams[key] = grams
+        self.names[key] = normalized
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        for gram in self.grams.pop(key, ()):
+            self.postings[gram].discard(key)
+        self.names.pop(key, None)
+
+    def search(self, normalized, threshold, exclude=None):
+        """
+        [(key, score)] best first, match when trigram similarity
+        reach threshold or only differ by typo, never name
+        with other number or other number of word (see same_kind)
+        """
+        grams = trigrams(normalized)
+        counts = dict()
+        for gram in grams:
+            for key in self.postings.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+
+        results = []
+        for key, shared in counts.items():
+            if key == exclude or not same_kind(normalized, self.names[key]):
+                continue
+
+            score = shared / (len(grams) + len(self.grams[key]) - shared)
+            if score >= threshold or is_typo(normalized, self.names[key]):
+                results.append((key, score))
+
+        results.sort(key=lambda x: -x[1])
+        return results